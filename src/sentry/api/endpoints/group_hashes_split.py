@@ -13,6 +13,7 @@ from sentry import eventstore, features
 from sentry.api.base import region_silo_endpoint
 from sentry.api.bases import GroupEndpoint
 from sentry.api.serializers import EventSerializer, serialize
+from sentry.grouping.grouphash_cache import invalidate_grouphash_cache
 from sentry.grouping.variants import ComponentVariant
 from sentry.models import Group, GroupHash
 from sentry.utils import snuba
@@ -134,6 +135,7 @@ def _split_group(group: Group, hash: str, hierarchical_hashes: Optional[Sequence
     grouphash.state = GroupHash.State.SPLIT
     grouphash.group_id = group.id
     grouphash.save()
+    invalidate_grouphash_cache(group.project_id)
 
 
 def _get_full_hierarchical_hashes(group: Group, hash: str) -> Optional[Sequence[str]]:
@@ -207,6 +209,8 @@ def _unsplit_group(group: Group, hash: str, hierarchical_hashes: Optional[Sequen
         if grouphash_to_delete is not None:
             grouphash_to_delete.delete()
 
+    invalidate_grouphash_cache(group.project_id)
+
 
 def _get_group_filters(group: Group):
     return [
@@ -9,6 +9,7 @@ from rest_framework.response import Response
 
 from sentry import eventstream
 from sentry.api.base import audit_logger
+from sentry.grouping.grouphash_cache import invalidate_grouphash_cache
 from sentry.models import Group, GroupHash, GroupInbox, GroupStatus, Project
 from sentry.signals import issue_deleted
 from sentry.tasks.deletion import delete_groups as delete_groups_task
@@ -49,6 +50,7 @@ def delete_group_list(
     GroupHash.objects.filter(project_id=project.id, group__id__in=group_ids).exclude(
         state=GroupHash.State.SPLIT
     ).delete()
+    invalidate_grouphash_cache(project.id)
 
     # We remove `GroupInbox` rows here so that they don't end up influencing queries for
     # `Group` instances that are pending deletion
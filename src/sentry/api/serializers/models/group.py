@@ -1,14 +1,19 @@
 from __future__ import annotations
 
+import functools
 import itertools
 import logging
 from abc import ABC, abstractmethod
 from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from typing import (
     Any,
     Callable,
+    Dict,
     Iterable,
+    Iterator,
     List,
     Mapping,
     MutableMapping,
@@ -23,8 +28,9 @@ import pytz
 import sentry_sdk
 from django.conf import settings
 from django.db.models import Min, prefetch_related_objects
+from sentry_sdk import Hub
 
-from sentry import tagstore
+from sentry import options, tagstore
 from sentry.api.serializers import Serializer, register, serialize
 from sentry.api.serializers.models.actor import ActorSerializer
 from sentry.api.serializers.models.plugin import is_plugin_deprecated
@@ -70,6 +76,7 @@ from sentry.tagstore.types import GroupTagValue
 from sentry.tsdb.snuba import SnubaTSDB
 from sentry.types.issues import GroupCategory
 from sentry.utils.cache import cache
+from sentry.utils.concurrent import run_in_worker_thread
 from sentry.utils.json import JSONData
 from sentry.utils.safe import safe_execute
 from sentry.utils.snuba import Dataset, aliased_query, raw_query
@@ -80,6 +87,9 @@ snuba_tsdb = SnubaTSDB(**settings.SENTRY_TSDB_OPTIONS)
 
 logger = logging.getLogger(__name__)
 
+# Runs the Snuba queries of serializers concurrently, see `SnubaQueryPlan`.
+_snuba_query_pool = ThreadPoolExecutor(max_workers=10)
+
 
 def merge_list_dictionaries(
     dict1: MutableMapping[Any, List[Any]], dict2: Mapping[Any, Sequence[Any]]
@@ -802,6 +812,32 @@ SKIP_SNUBA_FIELDS = frozenset(
 )
 
 
+class SnubaQueryPlan:
+    """
+    The independent Snuba queries of a page of serialized groups, by key.
+
+    Queries start running on a thread pool as soon as they are added, so that
+    serializing a page waits for its slowest query rather than for all of
+    them one after another.
+    """
+
+    def __init__(self) -> None:
+        self._queries: Dict[Tuple[str, Any], Future[Any]] = {}
+
+    def __contains__(self, key: Tuple[str, Any]) -> bool:
+        return key in self._queries
+
+    def add(self, prefix: str, queries: Mapping[Any, Callable[[], Any]]) -> None:
+        hub = Hub(Hub.current)
+        for key, query in queries.items():
+            self._queries[(prefix, key)] = _snuba_query_pool.submit(
+                run_in_worker_thread, hub, query
+            )
+
+    def result(self, key: Tuple[str, Any]) -> Any:
+        return self._queries[key].result()
+
+
 class GroupSerializerSnuba(GroupSerializerBase):
     skip_snuba_fields = {
         *SKIP_SNUBA_FIELDS,
@@ -830,6 +866,7 @@ class GroupSerializerSnuba(GroupSerializerBase):
         from sentry.search.snuba.executors import get_search_filter
 
         self.environment_ids = environment_ids
+        self._snuba_queries: Optional[SnubaQueryPlan] = None
 
         # XXX: We copy this logic from `PostgresSnubaQueryExecutor.query`. Ideally we
         # should try and encapsulate this logic, but if you're changing this, change it
@@ -861,17 +898,88 @@ class GroupSerializerSnuba(GroupSerializerBase):
             else []
         )
 
+    def get_attrs(
+        self, item_list: Sequence[Group], user: Any, **kwargs: Any
+    ) -> MutableMapping[Group, MutableMapping[str, Any]]:
+        with self._snuba_query_plan(item_list):
+            return super().get_attrs(item_list, user, **kwargs)
+
+    @contextmanager
+    def _snuba_query_plan(self, item_list: Sequence[Group]) -> Iterator[None]:
+        """
+        Starts the independent Snuba queries for ``item_list`` up front, if
+        enabled, and serves their results within the block.
+        """
+        if self._snuba_queries is not None or not options.get(
+            "serializers.group.concurrent-snuba-queries"
+        ):
+            yield
+            return
+
+        self._snuba_queries = SnubaQueryPlan()
+        try:
+            self._plan_snuba_queries(self._snuba_queries, item_list)
+            yield
+        finally:
+            self._snuba_queries = None
+
+    def _plan_snuba_queries(self, plan: SnubaQueryPlan, item_list: Sequence[Group]) -> None:
+        if self._collapse("stats"):
+            return
+
+        error_issues = [group for group in item_list if GroupCategory.ERROR == group.issue_category]
+        perf_issues = [
+            group for group in item_list if GroupCategory.PERFORMANCE == group.issue_category
+        ]
+        if error_issues:
+            plan.add(
+                "seen_stats:error",
+                self._get_seen_stats_queries(error_issues, self._execute_error_seen_stats_query),
+            )
+        if perf_issues:
+            plan.add(
+                "seen_stats:performance",
+                self._get_seen_stats_queries(perf_issues, self._execute_perf_seen_stats_query),
+            )
+
+    def _run_snuba_queries(
+        self, prefix: str, queries: Mapping[Any, Callable[[], Any]]
+    ) -> Mapping[Any, Any]:
+        """
+        Returns the results of ``queries`` by key, running those that have
+        not been planned.
+        """
+        plan = self._snuba_queries
+        return {
+            key: plan.result((prefix, key))
+            if plan is not None and (prefix, key) in plan
+            else query()
+            for key, query in queries.items()
+        }
+
+    def _get_seen_stats_queries(
+        self, issue_list: Sequence[Group], seen_stats_func: Callable[..., Any]
+    ) -> Mapping[str, Callable[[], Any]]:
+        return {
+            "time_range": functools.partial(
+                seen_stats_func,
+                item_list=issue_list,
+                start=self.start,
+                end=self.end,
+                conditions=list(self.conditions),
+                environment_ids=self.environment_ids,
+            )
+        }
+
     def _seen_stats_error(
         self, error_issue_list: Sequence[Group], user
     ) -> Mapping[Group, SeenStats]:
+        results = self._run_snuba_queries(
+            "seen_stats:error",
+            self._get_seen_stats_queries(error_issue_list, self._execute_error_seen_stats_query),
+        )
         return self._parse_seen_stats_results(
-            self._execute_error_seen_stats_query(
-                item_list=error_issue_list,
-                start=self.start,
-                end=self.end,
-                conditions=self.conditions,
-                environment_ids=self.environment_ids,
-            ),
+            results["time_range"],
             error_issue_list,
             bool(self.start or self.end or self.conditions),
             self.environment_ids,
@@ -880,14 +988,12 @@ class GroupSerializerSnuba(GroupSerializerBase):
     def _seen_stats_performance(
         self, perf_issue_list: Sequence[Group], user
     ) -> Mapping[Group, SeenStats]:
+        results = self._run_snuba_queries(
+            "seen_stats:performance",
+            self._get_seen_stats_queries(perf_issue_list, self._execute_perf_seen_stats_query),
+        )
         return self._parse_seen_stats_results(
-            self._execute_perf_seen_stats_query(
-                item_list=perf_issue_list,
-                start=self.start,
-                end=self.end,
-                conditions=self.conditions,
-                environment_ids=self.environment_ids,
-            ),
+            results["time_range"],
             perf_issue_list,
             bool(self.start or self.end or self.conditions),
             self.environment_ids,
@@ -4,7 +4,7 @@ import functools
 from abc import abstractmethod
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Any, Callable, Mapping, MutableMapping, Optional, Sequence
+from typing import Any, Callable, Iterable, Mapping, MutableMapping, Optional, Sequence
 
 from django.utils import timezone
 
@@ -14,6 +14,7 @@ from sentry.api.serializers.models.group import (
     GroupSerializer,
     GroupSerializerSnuba,
     SeenStats,
+    SnubaQueryPlan,
     snuba_tsdb,
 )
 from sentry.constants import StatsPeriod
@@ -59,6 +60,13 @@ class GroupStatsMixin:
     def get_stats(
         self, item_list: Sequence[Group], user, stats_query_args: GroupStatsQueryArgs, **kwargs
     ):
+        query_params = self.get_stats_query_params(stats_query_args)
+        if query_params is not None:
+            return self.query_tsdb(item_list, query_params, **kwargs)
+
+    def get_stats_query_params(
+        self, stats_query_args: GroupStatsQueryArgs
+    ) -> Optional[MutableMapping[str, Any]]:
         if stats_query_args and stats_query_args.stats_period:
             # we need to compute stats at 1d (1h resolution), and 14d or a custom given period
             if stats_query_args.stats_period == "auto":
@@ -99,7 +107,8 @@ class GroupStatsMixin:
                     "rollup": int(interval.total_seconds()),
                 }
 
-            return self.query_tsdb(item_list, query_params, **kwargs)
+            return query_params
+        return None
 
 
 class StreamGroupSerializer(GroupSerializer, GroupStatsMixin):
@@ -198,6 +207,46 @@ class StreamGroupSerializerSnuba(GroupSerializerSnuba, GroupStatsMixin):
 
     def get_attrs(
         self, item_list: Sequence[Group], user: Any, **kwargs: Any
+    ) -> MutableMapping[Group, MutableMapping[str, Any]]:
+        with self._snuba_query_plan(item_list):
+            return self._get_attrs(item_list, user)
+
+    def _plan_snuba_queries(self, plan: SnubaQueryPlan, item_list: Sequence[Group]) -> None:
+        super()._plan_snuba_queries(plan, item_list)
+
+        if not self.stats_period or self._collapse("stats"):
+            return
+
+        query_params = self.get_stats_query_params(
+            GroupStatsQueryArgs(self.stats_period, self.stats_period_start, self.stats_period_end)
+        )
+        plan.add(
+            "stats",
+            self._get_tsdb_queries(item_list, query_params, environment_ids=self.environment_ids),
+        )
+        if self.conditions and not self._collapse("filtered"):
+            plan.add(
+                "filtered_stats",
+                self._get_tsdb_queries(
+                    item_list,
+                    query_params,
+                    conditions=self.conditions,
+                    environment_ids=self.environment_ids,
+                ),
+            )
+
+        if self._expand("sessions"):
+            uniq_project_ids = {item.project_id for item in item_list}
+            cache_keys = {pid: self._build_session_cache_key(pid) for pid in uniq_project_ids}
+            cache_data = cache.get_many(cache_keys.values())
+            missed_project_ids = [
+                pid for pid, cache_key in cache_keys.items() if cache_data.get(cache_key) is None
+            ]
+            if missed_project_ids:
+                plan.add("sessions", self._get_session_queries(missed_project_ids))
+
+    def _get_attrs(
+        self, item_list: Sequence[Group], user: Any
     ) -> MutableMapping[Group, MutableMapping[str, Any]]:
         if not self._collapse("base"):
             attrs = super().get_attrs(item_list, user)
@@ -249,13 +298,10 @@ class StreamGroupSerializerSnuba(GroupSerializerSnuba, GroupStatsMixin):
                     metrics.incr(f"group.get_session_counts.{found}")
 
                 if missed_items:
-                    project_ids = list({item.project_id for item in missed_items})
-                    project_sessions = release_health.get_num_sessions_per_project(
-                        project_ids,
-                        self.start,
-                        self.end,
-                        self.environment_ids,
-                    )
+                    project_ids = {item.project_id for item in missed_items}
+                    (project_sessions,) = self._run_snuba_queries(
+                        "sessions", self._get_session_queries(project_ids)
+                    ).values()
 
                     results = {}
                     for project_id, count in project_sessions:
@@ -332,81 +378,132 @@ class StreamGroupSerializerSnuba(GroupSerializerSnuba, GroupStatsMixin):
     def query_tsdb(
         self, groups: Sequence[Group], query_params, conditions=None, environment_ids=None, **kwargs
     ):
+        results = {}
+        for result in self._run_snuba_queries(
+            "filtered_stats" if conditions else "stats",
+            self._get_tsdb_queries(groups, query_params, conditions, environment_ids),
+        ).values():
+            results.update(result)
+        return results
+
+    def _get_tsdb_queries(
+        self, groups: Sequence[Group], query_params, conditions=None, environment_ids=None
+    ) -> Mapping[str, Callable[[], Any]]:
         error_issue_ids = [
             group.id for group in groups if GroupCategory.ERROR == group.issue_category
         ]
         perf_issue_ids = [
             group.id for group in groups if GroupCategory.PERFORMANCE == group.issue_category
         ]
-        results = {}
+        # `get_range` extends the conditions it is given, so every query gets a copy
         get_range = functools.partial(
-            snuba_tsdb.get_range,
-            environment_ids=environment_ids,
-            conditions=conditions,
-            **query_params,
+            snuba_tsdb.get_range, environment_ids=environment_ids, **query_params
         )
+        queries = {}
         if error_issue_ids:
-            results.update(get_range(model=snuba_tsdb.models.group, keys=error_issue_ids))
+            queries["error"] = functools.partial(
+                get_range,
+                model=snuba_tsdb.models.group,
+                keys=error_issue_ids,
+                conditions=conditions and list(conditions),
+            )
         if perf_issue_ids:
-            results.update(
-                get_range(model=snuba_tsdb.models.group_performance, keys=perf_issue_ids)
+            queries["performance"] = functools.partial(
+                get_range,
+                model=snuba_tsdb.models.group_performance,
+                keys=perf_issue_ids,
+                conditions=conditions and list(conditions),
             )
-        return results
+        return queries
+
+    def _get_session_queries(self, project_ids: Iterable[int]) -> Mapping[Any, Callable[[], Any]]:
+        project_ids = sorted(project_ids)
+        return {
+            tuple(project_ids): functools.partial(
+                release_health.get_num_sessions_per_project,
+                project_ids,
+                self.start,
+                self.end,
+                self.environment_ids,
+            )
+        }
 
     def _seen_stats_error(
         self, error_issue_list: Sequence[Group], user
     ) -> Mapping[Group, SeenStats]:
-        return self.__seen_stats_impl(error_issue_list, self._execute_error_seen_stats_query)
+        return self.__seen_stats_impl(
+            error_issue_list, "error", self._execute_error_seen_stats_query
+        )
 
     def _seen_stats_performance(
         self, perf_issue_list: Sequence[Group], user
     ) -> Mapping[Group, SeenStats]:
-        return self.__seen_stats_impl(perf_issue_list, self._execute_perf_seen_stats_query)
+        return self.__seen_stats_impl(
+            perf_issue_list, "performance", self._execute_perf_seen_stats_query
+        )
 
-    def __seen_stats_impl(
-        self,
-        error_issue_list: Sequence[Group],
-        seen_stats_func: Callable[[Any, Any, Any, Any, Any], Mapping[str, Any]],
-    ) -> Mapping[Any, SeenStats]:
+    def _get_seen_stats_queries(
+        self, issue_list: Sequence[Group], seen_stats_func: Callable[..., Any]
+    ) -> Mapping[str, Callable[[], Any]]:
         partial_execute_seen_stats_query = functools.partial(
             seen_stats_func,
-            item_list=error_issue_list,
+            item_list=issue_list,
             environment_ids=self.environment_ids,
             start=self.start,
             end=self.end,
         )
+        queries = {"time_range": partial_execute_seen_stats_query}
+        if self.conditions and not self._collapse("filtered"):
+            queries["filtered"] = functools.partial(
+                partial_execute_seen_stats_query, conditions=list(self.conditions)
+            )
+        if (self.start or self.end) and not self._collapse("lifetime"):
+            queries["lifetime"] = functools.partial(
+                partial_execute_seen_stats_query, start=None, end=None
+            )
+        return queries
+
+    def __seen_stats_impl(
+        self,
+        issue_list: Sequence[Group],
+        category: str,
+        seen_stats_func: Callable[..., Mapping[str, Any]],
+    ) -> Mapping[Any, SeenStats]:
+        results = self._run_snuba_queries(
+            f"seen_stats:{category}", self._get_seen_stats_queries(issue_list, seen_stats_func)
+        )
         time_range_result = self._parse_seen_stats_results(
-            partial_execute_seen_stats_query(),
-            error_issue_list,
+            results["time_range"],
+            issue_list,
             self.start or self.end or self.conditions,
             self.environment_ids,
         )
         filtered_result = (
             self._parse_seen_stats_results(
-                partial_execute_seen_stats_query(conditions=self.conditions),
-                error_issue_list,
+                results["filtered"],
+                issue_list,
                 self.start or self.end or self.conditions,
                 self.environment_ids,
             )
-            if self.conditions and not self._collapse("filtered")
+            if "filtered" in results
             else None
         )
         lifetime_result = (
             (
                 self._parse_seen_stats_results(
-                    partial_execute_seen_stats_query(start=None, end=None),
-                    error_issue_list,
+                    results["lifetime"],
+                    issue_list,
                     False,
                     self.environment_ids,
                 )
-                if self.start or self.end
+                if "lifetime" in results
                 else time_range_result
             )
             if not self._collapse("lifetime")
             else None
         )
 
-        for item in error_issue_list:
+        for item in issue_list:
             time_range_result[item].update(
                 {
                     "filtered": filtered_result.get(item) if filtered_result else None,
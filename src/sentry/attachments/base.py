@@ -1,3 +1,4 @@
+import io
 import zlib
 
 from sentry.utils import metrics
@@ -9,11 +10,40 @@ ATTACHMENT_DATA_CHUNK_KEY = "{key}:a:{id}:{chunk_index}"
 
 UNINITIALIZED_DATA = object()
 
+# Number of chunks that are fetched with one round trip when streaming.
+STREAM_CHUNK_BATCH_SIZE = 16
+
 
 class MissingAttachmentChunks(Exception):
     pass
 
 
+class AttachmentChunkReader(io.RawIOBase):
+    """
+    A readable raw stream over the decompressed chunks of an attachment. Only
+    the chunk that is currently being read is held in memory.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = memoryview(b"")
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buffer:
+            try:
+                self._buffer = memoryview(next(self._chunks))
+            except StopIteration:
+                return 0
+
+        size = min(len(b), len(self._buffer))
+        b[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
 class CachedAttachment:
     def __init__(
         self,
@@ -63,6 +93,17 @@ class CachedAttachment:
         assert self._data is not UNINITIALIZED_DATA
         return self._data
 
+    def open(self):
+        """
+        Returns a file-like object to read the data of the attachment. Unlike
+        ``data``, cached chunks are fetched and decompressed while reading.
+        Raises ``MissingAttachmentChunks`` while reading if a chunk is missing.
+        """
+        if self._data is not UNINITIALIZED_DATA or self._cache is None:
+            return io.BytesIO(self.data)
+
+        return io.BufferedReader(AttachmentChunkReader(self._cache.iter_chunks(self)))
+
     def delete(self):
         for key in self.chunk_keys:
             self._cache.inner.delete(key)
@@ -152,15 +193,22 @@ class BaseAttachmentCache:
             yield CachedAttachment(cache=self, **attachment)
 
     def get_data(self, attachment):
-        data = []
-
-        for key in attachment.chunk_keys:
-            raw_data = self.inner.get(key, raw=True)
+        return b"".join(self._decompress_chunks(list(attachment.chunk_keys)))
+
+    def iter_chunks(self, attachment, batch_size=STREAM_CHUNK_BATCH_SIZE):
+        """
+        Yields the decompressed chunks of an attachment, fetching
+        ``batch_size`` chunks at a time.
+        """
+        chunk_keys = list(attachment.chunk_keys)
+        for i in range(0, len(chunk_keys), batch_size):
+            yield from self._decompress_chunks(chunk_keys[i : i + batch_size])
+
+    def _decompress_chunks(self, chunk_keys):
+        for raw_data in self.inner.get_many(chunk_keys, raw=True):
             if raw_data is None:
                 raise MissingAttachmentChunks()
-            data.append(zlib.decompress(raw_data))
-
-        return b"".join(data)
+            yield zlib.decompress(raw_data)
 
     def delete(self, key):
         for attachment in self.get(key):
@@ -1,14 +1,20 @@
 import pickle
 import threading
+from collections import defaultdict
 from datetime import datetime
+from itertools import chain
 from time import time
 
-from django.db import models
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections, models, router
 from django.utils import timezone
 from django.utils.encoding import force_bytes, force_text
+from psycopg2.extras import execute_values
 
+from sentry import options
 from sentry.buffer import Buffer
 from sentry.exceptions import InvalidConfiguration
+from sentry.signals import buffer_incr_complete
 from sentry.tasks.process_buffer import process_incr, process_pending
 from sentry.utils import json, metrics
 from sentry.utils.compat import crc32
@@ -51,12 +57,14 @@ class RedisBuffer(Buffer):
     key_expire = 60 * 60  # 1 hour
     pending_key = "b:p"
 
-    def __init__(self, pending_partitions=1, incr_batch_size=2, **options):
+    def __init__(self, pending_partitions=1, incr_batch_size=2, bulk_batch_size=1000, **options):
         self.cluster, options = get_cluster_from_options("SENTRY_BUFFER_OPTIONS", options)
         self.pending_partitions = pending_partitions
         self.incr_batch_size = incr_batch_size
+        self.bulk_batch_size = bulk_batch_size
         assert self.pending_partitions > 0
         assert self.incr_batch_size > 0
+        assert self.bulk_batch_size > 0
 
     def validate(self):
         try:
@@ -118,7 +126,7 @@ class RedisBuffer(Buffer):
         elif isinstance(value, datetime):
             type_ = "d"
             value = value.strftime("%s.%f")
-        elif isinstance(value, int):
+        elif isinstance(value, int) and not isinstance(value, bool):
             type_ = "i"
         elif isinstance(value, float):
             type_ = "f"
@@ -126,6 +134,26 @@ class RedisBuffer(Buffer):
             raise TypeError(type(value))
         return (type_, str(value))
 
+    def _encode_filters(self, filters, typed_encoding):
+        if typed_encoding:
+            try:
+                return json.dumps(self._dump_values(filters))
+            except TypeError:
+                # e.g. model instances, which only pickle can round-trip
+                pass
+        # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
+        return pickle.dumps(filters)
+
+    def _encode_value(self, value, typed_encoding):
+        if typed_encoding:
+            try:
+                return json.dumps(self._dump_value(value))
+            except TypeError:
+                # e.g. the event data of a group
+                pass
+        # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
+        return pickle.dumps(value)
+
     def _load_values(self, payload):
         result = {}
         for k, (t, v) in payload.items():
@@ -179,13 +207,13 @@ class RedisBuffer(Buffer):
         # We can't use conn.map() due to wanting to support multiple pending
         # keys (one per Redis partition)
         conn = self.cluster.get_local_client_for_key(key)
+        # Readers accept both encodings, so the typed encoding can be rolled out
+        # (and back) at any time.
+        typed_encoding = options.get("buffer.typed-encoding")
 
         pipe = conn.pipeline()
         pipe.hsetnx(key, "m", f"{model.__module__}.{model.__name__}")
-        # TODO(dcramer): once this goes live in production, we can kill the pickle path
-        # (this is to ensure a zero downtime deploy where we can transition event processing)
-        pipe.hsetnx(key, "f", pickle.dumps(filters))
-        # pipe.hsetnx(key, 'f', json.dumps(self._dump_values(filters)))
+        pipe.hsetnx(key, "f", self._encode_filters(filters, typed_encoding))
         for column, amount in columns.items():
             pipe.hincrby(key, "i+" + column, amount)
 
@@ -194,10 +222,7 @@ class RedisBuffer(Buffer):
             # hook here
             # e.g. "update score if last_seen or times_seen is changed"
             for column, value in extra.items():
-                # TODO(dcramer): once this goes live in production, we can kill the pickle path
-                # (this is to ensure a zero downtime deploy where we can transition event processing)
-                pipe.hset(key, "e+" + column, pickle.dumps(value))
-                # pipe.hset(key, 'e+' + column, json.dumps(self._dump_value(value)))
+                pipe.hset(key, "e+" + column, self._encode_value(value, typed_encoding))
 
         if signal_only is True:
             pipe.hset(key, "s", "1")
@@ -229,7 +254,10 @@ class RedisBuffer(Buffer):
         if not client.set(lock_key, "1", nx=True, ex=60):
             return
 
-        pending_buffer = PendingBuffer(self.incr_batch_size)
+        if options.get("buffer.bulk-flush"):
+            pending_buffer = PendingBuffer(self.bulk_batch_size)
+        else:
+            pending_buffer = PendingBuffer(self.incr_batch_size)
 
         try:
             keycount = 0
@@ -262,6 +290,10 @@ class RedisBuffer(Buffer):
         if key is not None:
             batch_keys = [key]
 
+        if options.get("buffer.bulk-flush"):
+            self._process_batch(batch_keys)
+            return
+
         for key in batch_keys:
             self._process_single_incr(key)
 
@@ -298,32 +330,206 @@ class RedisBuffer(Buffer):
                 self.logger.debug("buffer.revoked.empty", extra={"redis_key": key})
                 return
 
-            # XXX(py3): Note that ``import_string`` explicitly wants a str in
-            # python2, so we'll decode (for python3) and then translate back to
-            # a byte string (in python2) for import_string.
-            model = import_string(str(values.pop("m").decode("utf-8")))
-
-            if values["f"].startswith(b"{"):
-                filters = self._load_values(json.loads(values.pop("f").decode("utf-8")))
-            else:
-                # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
-                filters = pickle.loads(values.pop("f"))
-
-            incr_values = {}
-            extra_values = {}
-            signal_only = None
-            for k, v in values.items():
-                if k.startswith("i+"):
-                    incr_values[k[2:]] = int(v)
-                elif k.startswith("e+"):
-                    if v.startswith(b"["):
-                        extra_values[k[2:]] = self._load_value(json.loads(v.decode("utf-8")))
-                    else:
-                        # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
-                        extra_values[k[2:]] = pickle.loads(v)
-                elif k == "s":
-                    signal_only = bool(int(v))  # Should be 1 if set
-
-            self._process(model, incr_values, filters, extra_values, signal_only)
+            self._process(*self._load_buffered_values(values))
         finally:
             client.delete(lock_key)
+
+    def _load_buffered_values(self, values):
+        """
+        Decodes the hash of a buffered key into the arguments of ``Buffer.process``.
+        """
+        # XXX(py3): Note that ``import_string`` explicitly wants a str in
+        # python2, so we'll decode (for python3) and then translate back to
+        # a byte string (in python2) for import_string.
+        model = import_string(str(values.pop("m").decode("utf-8")))
+
+        if values["f"].startswith(b"{"):
+            filters = self._load_values(json.loads(values.pop("f").decode("utf-8")))
+        else:
+            # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
+            filters = pickle.loads(values.pop("f"))
+
+        incr_values = {}
+        extra_values = {}
+        signal_only = None
+        for k, v in values.items():
+            if k.startswith("i+"):
+                incr_values[k[2:]] = int(v)
+            elif k.startswith("e+"):
+                if v.startswith(b"["):
+                    extra_values[k[2:]] = self._load_value(json.loads(v.decode("utf-8")))
+                else:
+                    # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
+                    extra_values[k[2:]] = pickle.loads(v)
+            elif k == "s":
+                signal_only = bool(int(v))  # Should be 1 if set
+
+        return model, incr_values, filters, extra_values, signal_only
+
+    def _drain_keys(self, keys):
+        """
+        Reads and deletes the given keys, with one transaction per host.
+        Returns the (possibly empty) hash of every key.
+        """
+        # Remove the keys from the pending sets first, an increment that races
+        # with us is either drained below or marks its key as pending again.
+        keys_by_pending_key = defaultdict(list)
+        for key in keys:
+            keys_by_pending_key[self._make_pending_key_from_key(key)].append(key)
+        with self.cluster.map() as conn:
+            for pending_key, pending_keys in keys_by_pending_key.items():
+                conn.zrem(pending_key, *pending_keys)
+
+        router = self.cluster.get_router()
+        keys_by_host = defaultdict(list)
+        for key in keys:
+            keys_by_host[router.get_host_for_key(key)].append(key)
+
+        rv = {}
+        for host, host_keys in keys_by_host.items():
+            pipe = self.cluster.get_local_client(host).pipeline(transaction=True)
+            for key in host_keys:
+                pipe.hgetall(key)
+                pipe.delete(key)
+            results = pipe.execute()
+            for key, values in zip(host_keys, results[::2]):
+                rv[key] = {force_text(k): v for k, v in values.items()}
+        return rv
+
+    def _get_bulk_update_pk(self, model, columns, filters, extra, signal_only):
+        """
+        Returns the primary key of the row a buffered update applies to, or
+        ``None`` if the update cannot be part of a bulk update.
+        """
+        if signal_only or not columns or len(filters) != 1:
+            return None
+        if not (isinstance(model, type) and issubclass(model, models.Model)):
+            return None
+
+        opts = model._meta
+        ((name, value),) = filters.items()
+        if name not in ("pk", opts.pk.name):
+            return None
+        if not isinstance(value, int) or isinstance(value, bool):
+            return None
+
+        for name in chain(columns, extra):
+            try:
+                field = opts.get_field(name)
+            except FieldDoesNotExist:
+                return None
+            if not field.concrete or field.is_relation or field.primary_key:
+                return None
+
+        return value
+
+    def _process_batch(self, batch_keys):
+        """
+        Flushes a batch of keys at once, without a lock per key.
+
+        Every key is read and deleted in a single transaction, so flushes that
+        race for the same key apply disjoint increments. Updates of a row by
+        primary key are grouped by model and column set and applied with one
+        multi-row ``UPDATE`` per group, anything else goes through
+        ``Buffer.process`` one by one.
+        """
+        updates = defaultdict(dict)
+
+        for key, values in self._drain_keys(batch_keys).items():
+            if not values:
+                metrics.incr("buffer.revoked", tags={"reason": "empty"}, skip_internal=False)
+                self.logger.debug("buffer.revoked.empty", extra={"redis_key": key})
+                continue
+
+            model, columns, filters, extra, signal_only = self._load_buffered_values(values)
+            pk = self._get_bulk_update_pk(model, columns, filters, extra, signal_only)
+            rows = updates[(model, tuple(sorted(columns)), tuple(sorted(extra)))]
+            # Filters by `pk` and by `id` address the same row from different keys
+            if pk is None or pk in rows:
+                self._process(model, columns, filters, extra, signal_only)
+            else:
+                rows[pk] = (columns, filters, extra)
+
+        for (model, column_names, extra_names), rows in updates.items():
+            if rows:
+                self._bulk_update(model, column_names, extra_names, rows)
+
+    def _bulk_update(self, model, column_names, extra_names, rows):
+        """
+        Applies the buffered updates of ``rows`` (by primary key) with a single
+        ``UPDATE ... FROM (VALUES ...)`` statement, equivalent to calling
+        ``Buffer.process`` for each of them.
+        """
+        from sentry.models import Group
+
+        opts = model._meta
+        connection = connections[router.db_for_write(model)]
+        qn = connection.ops.quote_name
+        table = qn(opts.db_table)
+        pk_column = qn(opts.pk.column)
+        incr_fields = [opts.get_field(name) for name in column_names]
+        extra_fields = [opts.get_field(name) for name in extra_names]
+
+        assignments = [
+            f"{qn(field.column)} = {table}.{qn(field.column)} + data.{qn(field.column)}"
+            for field in incr_fields
+        ]
+        assignments.extend(
+            "{column} = CAST(data.{column} AS {type})".format(
+                column=qn(field.column), type=field.cast_db_type(connection)
+            )
+            for field in extra_fields
+        )
+        # See `ScoreClause`, the score is computed from the times_seen before the update
+        if model is Group and "times_seen" in column_names and "last_seen" in extra_names:
+            assignments.append(
+                f"{qn('score')} = log({table}.{qn('times_seen')} + data.{qn('times_seen')}) * 600"
+                f" + floor(extract(epoch from CAST(data.{qn('last_seen')} AS timestamptz)))"
+            )
+
+        data_columns = [pk_column] + [qn(field.column) for field in incr_fields + extra_fields]
+        sql = (
+            f"UPDATE {table} SET {', '.join(assignments)} "
+            f"FROM (VALUES %s) AS data ({', '.join(data_columns)}) "
+            f"WHERE {table}.{pk_column} = data.{pk_column} "
+            f"RETURNING {table}.{pk_column}"
+        )
+        values = [
+            (
+                pk,
+                *(columns[field.name] for field in incr_fields),
+                *(field.get_db_prep_save(extra[field.name], connection) for field in extra_fields),
+            )
+            for pk, (columns, _, extra) in rows.items()
+        ]
+
+        with connection.cursor() as cursor:
+            result = execute_values(cursor, sql, values, page_size=len(values), fetch=True)
+        updated = {row[0] for row in result}
+
+        metrics.incr(
+            "buffer.bulk-update",
+            amount=len(updated),
+            skip_internal=True,
+            tags={"module": model.__module__, "model": model.__name__},
+        )
+
+        if updated and getattr(model.objects, "cache_fields", None):
+            # Updates do not go through `post_save`, drop the cached instances
+            model.objects.uncache_objects(list(updated))
+
+        for pk, (columns, filters, extra) in rows.items():
+            if pk not in updated and model is not Group:
+                # The row does not exist yet, `create_or_update` creates it. Deleted
+                # groups are skipped, like in `Buffer.process`.
+                self._process(model, columns, filters, extra, None)
+                continue
+
+            buffer_incr_complete.send_robust(
+                model=model,
+                columns=columns,
+                filters=filters,
+                extra=extra,
+                created=False,
+                sender=model,
+            )
@@ -32,12 +32,26 @@ class BaseCache(local):
     def set(self, key, value, timeout, version=None, raw=False):
         raise NotImplementedError
 
+    def set_many(self, items, timeout, version=None, raw=False):
+        """
+        Sets the values of multiple ``(key, value)`` pairs.
+        """
+        for key, value in items:
+            self.set(key, value, timeout, version=version, raw=raw)
+
     def delete(self, key, version=None):
         raise NotImplementedError
 
     def get(self, key, version=None, raw=False):
         raise NotImplementedError
 
+    def get_many(self, keys, version=None, raw=False):
+        """
+        Returns the values of ``keys`` in the same order, ``None`` for keys
+        that are missing.
+        """
+        return [self.get(key, version=version, raw=raw) for key in keys]
+
     def _mark_transaction(self, op):
         """
         Mark transaction with a tag so we can identify system components that rely
@@ -8,6 +8,10 @@ class DjangoCache(BaseCache):
         cache.set(key, value, timeout, version=version or self.version)
         self._mark_transaction("set")
 
+    def set_many(self, items, timeout, version=None, raw=False):
+        cache.set_many(dict(items), timeout, version=version or self.version)
+        self._mark_transaction("set")
+
     def delete(self, key, version=None):
         cache.delete(key, version=version or self.version)
         self._mark_transaction("delete")
@@ -16,3 +20,8 @@ class DjangoCache(BaseCache):
         result = cache.get(key, version=version or self.version)
         self._mark_transaction("get")
         return result
+
+    def get_many(self, keys, version=None, raw=False):
+        result = cache.get_many(keys, version=version or self.version)
+        self._mark_transaction("get")
+        return [result.get(key) for key in keys]
@@ -28,6 +28,29 @@ class CommonRedisCache(BaseCache):
 
         self._mark_transaction("set")
 
+    def set_many(self, items, timeout, version=None, raw=False):
+        values = []
+        for key, value in items:
+            key = self.make_key(key, version=version)
+            v = json.dumps(value) if not raw else value
+            if len(v) > self.max_size:
+                raise ValueTooLarge(f"Cache key too large: {key!r} {len(v)!r}")
+            values.append((key, v))
+
+        if values:
+            self._set_many(values, timeout)
+
+        self._mark_transaction("set")
+
+    def _set_many(self, values, timeout):
+        pipe = self.client.pipeline(transaction=False)
+        for key, v in values:
+            if timeout:
+                pipe.setex(key, int(timeout), v)
+            else:
+                pipe.set(key, v)
+        pipe.execute()
+
     def delete(self, key, version=None):
         key = self.make_key(key, version=version)
         self.client.delete(key)
@@ -44,6 +67,25 @@ class CommonRedisCache(BaseCache):
 
         return result
 
+    def get_many(self, keys, version=None, raw=False):
+        if not keys:
+            return []
+
+        results = self._get_many([self.make_key(key, version=version) for key in keys])
+        if not raw:
+            results = [json.loads(result) if result is not None else None for result in results]
+
+        self._mark_transaction("get")
+
+        return results
+
+    def _get_many(self, keys):
+        # Keys are not necessarily on the same node, so this cannot use MGET.
+        pipe = self.client.pipeline(transaction=False)
+        for key in keys:
+            pipe.get(key)
+        return pipe.execute()
+
 
 class RbCache(CommonRedisCache):
     def __init__(self, **options):
@@ -51,6 +93,19 @@ class RbCache(CommonRedisCache):
         client = cluster.get_routing_client()
         CommonRedisCache.__init__(self, client, **options)
 
+    def _get_many(self, keys):
+        with self.client.map() as client:
+            promises = [client.get(key) for key in keys]
+        return [promise.value for promise in promises]
+
+    def _set_many(self, values, timeout):
+        with self.client.map() as client:
+            for key, v in values:
+                if timeout:
+                    client.setex(key, int(timeout), v)
+                else:
+                    client.set(key, v)
+
 
 # Confusing legacy name for RbCache.  We don't actually have a pure redis cache
 RedisCache = RbCache
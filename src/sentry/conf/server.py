@@ -1482,6 +1482,19 @@ SENTRY_DEFAULT_MAX_EVENTS_PER_MINUTE = "90%"
 SENTRY_SNUBA = os.environ.get("SNUBA", "http://127.0.0.1:1218")
 SENTRY_SNUBA_TIMEOUT = 30
 SENTRY_SNUBA_CACHE_TTL_SECONDS = 60
+# Coalescing of concurrent identical queries, see `snuba.query-cache.coalesce`.
+# The lock should outlive the slowest query, waiting workers give up and run
+# the query themselves after the wait time.
+SENTRY_SNUBA_CACHE_LOCK_TTL_SECONDS = SENTRY_SNUBA_TIMEOUT
+SENTRY_SNUBA_CACHE_COALESCE_WAIT_SECONDS = 10
+SENTRY_SNUBA_CACHE_COALESCE_POLL_SECONDS = 0.1
+# How long results stay available for stale-while-revalidate serving, see
+# `snuba.query-cache.stale-referrers`.
+SENTRY_SNUBA_CACHE_STALE_TTL_SECONDS = 60 * 10
+# Time-series results by bucket, see `sentry.snuba.timeseries_cache`. Buckets
+# are cached once they ended this long ago, data arriving later is missed.
+SENTRY_SNUBA_TIMESERIES_CACHE_TTL_SECONDS = 60 * 60 * 24
+SENTRY_SNUBA_TIMESERIES_CACHE_SETTLE_SECONDS = 60 * 5
 
 # Node storage backend
 SENTRY_NODESTORE = "sentry.nodestore.django.DjangoNodeStorage"
@@ -1530,6 +1543,9 @@ SENTRY_METRICS_SKIP_INTERNAL_PREFIXES = []  # Order this by most frequent prefix
 SENTRY_METRICS_INDEXER = "sentry.sentry_metrics.indexer.postgres.postgres_v2.PostgresIndexer"
 SENTRY_METRICS_INDEXER_OPTIONS = {}
 SENTRY_METRICS_INDEXER_CACHE_TTL = 3600 * 2
+# Entries per direction in the in-process cache in front of the shared
+# indexer cache, see `sentry-metrics.indexer.local-cache`.
+SENTRY_METRICS_INDEXER_LOCAL_CACHE_SIZE = 50_000
 
 SENTRY_METRICS_INDEXER_SPANNER_OPTIONS = {}
 
@@ -1897,6 +1913,17 @@ SENTRY_ATTACHMENT_BLOB_SIZE = 8 * 1024 * 1024  # 8MB
 # store. MUST be a power of two.
 SENTRY_CHUNK_UPLOAD_BLOB_SIZE = 8 * 1024 * 1024  # 8MB
 
+# A directory in which file blobs that are read are cached on disk, shared
+# between processes. Blobs are evicted least recently used first once the
+# cache exceeds its size. Disabled if not set.
+SENTRY_FILEBLOB_CACHE_DIR = None
+SENTRY_FILEBLOB_CACHE_SIZE = 1024 * 1024 * 1024  # 1GB
+
+# The total size of release artifacts whose parsed source and sourcemap views
+# are kept in memory by every JavaScript processing worker, to be reused by
+# all events of a release. Disabled if 0.
+SENTRY_JS_PARSED_ARTIFACT_CACHE_SIZE = 0
+
 # This flag tell DEVSERVICES to start the ingest-metrics-consumer in order to work on
 # metrics in the development environment. Note: this is "metrics" the product
 SENTRY_USE_METRICS_DEV = False
@@ -2659,6 +2686,9 @@ SENTRY_MAIL_ADAPTER_BACKEND = "sentry.mail.adapter.MailAdapter"
 # observed mainly for producing stable metrics.
 SENTRY_SYNTHETIC_MONITORING_PROJECT_ID = None
 
+# Which cluster is used to count events per group for event frequency conditions.
+SENTRY_RULE_FREQUENCY_COUNTERS_REDIS_CLUSTER = "default"
+
 # Similarity cluster to use
 # Similarity-v1: uses hardcoded set of event properties for diffing
 SENTRY_SIMILARITY_INDEX_REDIS_CLUSTER = "default"
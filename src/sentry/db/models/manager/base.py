@@ -454,6 +454,13 @@ class BaseManager(DjangoBaseManager.from_queryset(BaseQuerySet), Generic[M]):  #
         cache_key = self.__get_lookup_cache_key(**{pk_name: instance_id})
         cache.delete(cache_key, version=self.cache_version)
 
+    def uncache_objects(self, instance_ids: Sequence[int]) -> None:
+        pk_name = self.model._meta.pk.name
+        cache_keys = [
+            self.__get_lookup_cache_key(**{pk_name: instance_id}) for instance_id in instance_ids
+        ]
+        cache.delete_many(cache_keys, version=self.cache_version)
+
     def post_save(self, instance: M, **kwargs: Any) -> None:
         """
         Triggered when a model bound to this manager is saved.
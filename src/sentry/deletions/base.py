@@ -1,8 +1,13 @@
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor
 
+from sentry_sdk import Hub
+
+from sentry import options
 from sentry.constants import ObjectStatus
 from sentry.utils import metrics
+from sentry.utils.concurrent import run_in_worker_thread
 from sentry.utils.query import bulk_delete_objects
 
 _leaf_re = re.compile(r"^(UserReport|Event|Group)(.+)")
@@ -125,26 +130,54 @@ class BaseDeletionTask:
         for instance in instance_list:
             self.delete_instance(instance)
 
+    def get_child_relation_stages(self, relations):
+        """
+        Splits child relations into stages, which are deleted one after the
+        other. The relations of a stage do not depend on each other and may be
+        deleted concurrently. By default every relation is its own stage.
+        """
+        return [[relation] for relation in relations]
+
     def delete_children(self, relations):
         # Ideally this runs through the deletion manager
-        for relation in relations:
-            task = self.manager.get(
-                transaction_id=self.transaction_id,
-                actor_id=self.actor_id,
-                task=relation.task,
-                **relation.params,
-            )
-
-            # If we want smaller tasks then this also has to return when has_more is true.
-            # This could significant increase the number of tasks we spawn. Get better estimates
-            # by collecting metrics.
-            has_more = True
-            while has_more:
-                has_more = task.chunk()
-                if has_more:
-                    metrics.incr("deletions.should_spawn", tags={"task": type(task).__name__})
+        max_workers = options.get("deletions.max-concurrent-relations")
+        if max_workers > 1:
+            stages = self.get_child_relation_stages(relations)
+        else:
+            stages = [[relation] for relation in relations]
+
+        for stage in stages:
+            if len(stage) == 1:
+                self.delete_relation(stage[0])
+            else:
+                hub = Hub(Hub.current)
+                with ThreadPoolExecutor(max_workers=min(max_workers, len(stage))) as pool:
+                    futures = [
+                        pool.submit(run_in_worker_thread, hub, self.delete_relation, relation)
+                        for relation in stage
+                    ]
+                    for future in futures:
+                        future.result()
         return False
 
+    def delete_relation(self, relation):
+        task = self.manager.get(
+            transaction_id=self.transaction_id,
+            actor_id=self.actor_id,
+            task=relation.task,
+            **relation.params,
+        )
+
+        # If we want smaller tasks then this also has to return when has_more is true.
+        # This could significant increase the number of tasks we spawn. Get better estimates
+        # by collecting metrics.
+        has_more = True
+        while has_more:
+            has_more = task.chunk()
+            if has_more:
+                metrics.incr("deletions.should_spawn", tags={"task": type(task).__name__})
+        metrics.incr("deletions.relations.completed", tags={"task": type(task).__name__})
+
     def mark_deletion_in_progress(self, instance_list):
         pass
 
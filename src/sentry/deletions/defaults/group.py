@@ -1,7 +1,8 @@
 import os
 
-from sentry import eventstore, models, nodestore
+from sentry import eventstore, models, nodestore, options
 from sentry.eventstore.models import Event
+from sentry.utils import metrics
 
 from ..base import BaseDeletionTask, BaseRelation, ModelDeletionTask, ModelRelation
 
@@ -41,14 +42,17 @@ _GROUP_RELATED_MODELS = DIRECT_GROUP_RELATED_MODELS + (
 
 class EventDataDeletionTask(BaseDeletionTask):
     """
-    Deletes nodestore data, EventAttachment and UserReports for group
+    Deletes nodestore data, EventAttachment and UserReports for one or more
+    groups
     """
 
     DEFAULT_CHUNK_SIZE = 10000
 
-    def __init__(self, manager, group_id, project_id, **kwargs):
-        self.group_id = group_id
-        self.project_id = project_id
+    def __init__(
+        self, manager, group_id=None, project_id=None, group_ids=None, project_ids=None, **kwargs
+    ):
+        self.group_ids = group_ids if group_ids is not None else [group_id]
+        self.project_ids = project_ids if project_ids is not None else [project_id]
         self.last_event = None
         super().__init__(manager, **kwargs)
 
@@ -67,7 +71,7 @@ class EventDataDeletionTask(BaseDeletionTask):
 
         events = eventstore.get_unfetched_events(
             filter=eventstore.Filter(
-                conditions=conditions, project_ids=[self.project_id], group_ids=[self.group_id]
+                conditions=conditions, project_ids=self.project_ids, group_ids=self.group_ids
             ),
             limit=self.DEFAULT_CHUNK_SIZE,
             referrer="deletions.group",
@@ -78,9 +82,10 @@ class EventDataDeletionTask(BaseDeletionTask):
             return False
 
         self.last_event = events[-1]
+        metrics.incr("deletions.group.events_deleted", amount=len(events))
 
         # Remove from nodestore
-        node_ids = [Event.generate_node_id(self.project_id, event.event_id) for event in events]
+        node_ids = [Event.generate_node_id(event.project_id, event.event_id) for event in events]
         nodestore.delete_multi(node_ids)
 
         # Remove EventAttachment and UserReport *again* as those may not have a
@@ -88,17 +93,24 @@ class EventDataDeletionTask(BaseDeletionTask):
         # deletion.
         event_ids = [event.event_id for event in events]
         models.EventAttachment.objects.filter(
-            event_id__in=event_ids, project_id=self.project_id
+            event_id__in=event_ids, project_id__in=self.project_ids
         ).delete()
         models.UserReport.objects.filter(
-            event_id__in=event_ids, project_id=self.project_id
+            event_id__in=event_ids, project_id__in=self.project_ids
         ).delete()
 
         return True
 
 
 class GroupDeletionTask(ModelDeletionTask):
+    def __init__(self, manager, *args, **kwargs):
+        super().__init__(manager, *args, **kwargs)
+        self.bulk_relations = options.get("deletions.groups.bulk-relations")
+
     def get_child_relations(self, instance):
+        if self.bulk_relations:
+            return []
+
         relations = []
 
         relations.extend(
@@ -118,6 +130,43 @@ class GroupDeletionTask(ModelDeletionTask):
 
         return relations
 
+    def get_child_relations_bulk(self, instance_list):
+        if not self.bulk_relations:
+            return []
+
+        # Delete the rows of all groups in the batch with one query per model,
+        # and their events with one paginated query.
+        group_ids = [instance.id for instance in instance_list]
+        relations = [ModelRelation(m, {"group_id__in": group_ids}) for m in _GROUP_RELATED_MODELS]
+
+        # Skip EventDataDeletionTask if this is being called from cleanup.py
+        if not os.environ.get("_SENTRY_CLEANUP"):
+            relations.append(
+                BaseRelation(
+                    {
+                        "group_ids": group_ids,
+                        "project_ids": sorted({instance.project_id for instance in instance_list}),
+                    },
+                    EventDataDeletionTask,
+                )
+            )
+
+        return relations
+
+    def get_child_relation_stages(self, relations):
+        # GroupHash is still deleted first, so that no new events are grouped
+        # into the groups. The rows of the other group related models are
+        # independent of each other. Event data is deleted after them, as it
+        # deletes attachments and user reports that are left over.
+        group_hashes = [r for r in relations if r.params.get("model") is models.GroupHash]
+        independent = [
+            r
+            for r in relations
+            if r.params.get("model") in _GROUP_RELATED_MODELS and r not in group_hashes
+        ]
+        stages = [stage for stage in (group_hashes, independent) if stage]
+        return stages + [[r] for r in relations if r not in group_hashes and r not in independent]
+
     def delete_instance(self, instance):
         from sentry import similarity
 
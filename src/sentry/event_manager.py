@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import copy
 import ipaddress
+import itertools
 import logging
 import random
 import re
@@ -9,7 +10,6 @@ import time
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from hashlib import md5
-from io import BytesIO
 from typing import TYPE_CHECKING, Any, Mapping, Optional, Sequence, TypedDict
 
 import sentry_sdk
@@ -39,6 +39,7 @@ from sentry.constants import (
     DataCategory,
 )
 from sentry.culprit import generate_culprit
+from sentry.db.models.fields.node import NodeData
 from sentry.dynamic_sampling.feature_multiplexer import DynamicSamplingFeatureMultiplexer
 from sentry.dynamic_sampling.latest_release_booster import (
     TooManyBoostedReleasesException,
@@ -57,6 +58,7 @@ from sentry.grouping.api import (
     get_grouping_config_dict_for_project,
     load_grouping_config,
 )
+from sentry.grouping.grouphash_cache import get_grouphashes_many, invalidate_grouphash_cache
 from sentry.grouping.result import CalculatedHashes
 from sentry.ingest.inbound_filters import FilterStatKeys
 from sentry.killswitches import killswitch_matches_context
@@ -401,113 +403,179 @@ class EventManager:
 
             return jobs[0]["event"]
 
-        with metrics.timer("event_manager.save.organization.get_from_cache"):
-            project.set_cached_field_value(
-                "organization", Organization.objects.get_from_cache(id=project.organization_id)
-            )
+        job["cache_key"] = cache_key
 
-        jobs = [job]
+        jobs = save_error_events([job], projects)
+        if job.get("hash_discarded") is not None:
+            raise job["hash_discarded"]
+        if job.get("save_error") is not None:
+            raise job["save_error"]
 
-        is_reprocessed = is_reprocessed_event(job["data"])
+        if not jobs:
+            return job["event"]
 
-        with sentry_sdk.start_span(op="event_manager.save.pull_out_data"):
-            _pull_out_data(jobs, projects)
+        self._data = job["event"].data.data
 
-        with sentry_sdk.start_span(op="event_manager.save.get_or_create_release_many"):
-            _get_or_create_release_many(jobs, projects)
+        # Check if the project is configured for auto upgrading and we need to upgrade
+        # to the latest grouping config.
+        if auto_upgrade_grouping and _project_should_update_grouping(project):
+            _auto_update_grouping(project)
 
-        with sentry_sdk.start_span(op="event_manager.save.get_event_user_many"):
-            _get_event_user_many(jobs, projects)
+        return job["event"]
 
-        job["project_key"] = None
-        if job["key_id"] is not None:
-            with metrics.timer("event_manager.load_project_key"):
-                try:
-                    job["project_key"] = ProjectKey.objects.get_from_cache(id=job["key_id"])
-                except ProjectKey.DoesNotExist:
-                    pass
 
-        _derive_plugin_tags_many(jobs, projects)
-        _derive_interface_tags_many(jobs)
+def _project_should_update_grouping(project):
+    should_update_org = (
+        project.organization_id % 1000 < float(settings.SENTRY_GROUPING_AUTO_UPDATE_ENABLED) * 1000
+    )
+    return project.get_option("sentry:grouping_auto_update") and should_update_org
 
-        do_background_grouping_before = options.get("store.background-grouping-before")
-        if do_background_grouping_before:
-            _run_background_grouping(project, job)
 
-        secondary_hashes = None
+def _auto_update_grouping(project):
+    old_grouping = project.get_option("sentry:grouping_config")
+    new_grouping = DEFAULT_GROUPING_CONFIG
 
-        try:
-            secondary_grouping_config = project.get_option("sentry:secondary_grouping_config")
-            secondary_grouping_expiry = project.get_option("sentry:secondary_grouping_expiry")
-            if secondary_grouping_config and (secondary_grouping_expiry or 0) >= time.time():
-                with metrics.timer("event_manager.secondary_grouping"):
-                    secondary_event = copy.deepcopy(job["event"])
-                    loader = SecondaryGroupingConfigLoader()
-                    secondary_grouping_config = loader.get_config_dict(project)
-                    secondary_hashes = _calculate_event_grouping(
-                        project, secondary_event, secondary_grouping_config
-                    )
-        except Exception:
-            sentry_sdk.capture_exception()
+    # update to latest grouping config but not if a user is already on
+    # beta.
+    if old_grouping == new_grouping or old_grouping == BETA_GROUPING_CONFIG:
+        return
 
-        with metrics.timer("event_manager.load_grouping_config"):
-            # At this point we want to normalize the in_app values in case the
-            # clients did not set this appropriately so far.
-            if is_reprocessed:
-                # The customer might have changed grouping enhancements since
-                # the event was ingested -> make sure we get the fresh one for reprocessing.
-                grouping_config = get_grouping_config_dict_for_project(project)
-                # Write back grouping config because it might have changed since the
-                # event was ingested.
-                # NOTE: We could do this unconditionally (regardless of `is_processed`).
-                job["data"]["grouping_config"] = grouping_config
-            else:
-                grouping_config = get_grouping_config_dict_for_event_data(
-                    job["event"].data.data, project
-                )
+    # Because the way the auto grouping upgrading happening is racy, we want to
+    # try to write the audit log entry only and project option change just once.
+    # For this a cache key is used.  That's not perfect, but should reduce the
+    # risk significantly.
+    cache_key = f"grouping-config-update:{project.id}:{old_grouping}"
+    lock = f"grouping-update-lock:{project.id}"
+    if cache.get(cache_key) is not None:
+        return
 
-        with sentry_sdk.start_span(op="event_manager.save.calculate_event_grouping"), metrics.timer(
-            "event_manager.calculate_event_grouping"
-        ):
-            hashes = _calculate_event_grouping(project, job["event"], grouping_config)
+    with locks.get(lock, duration=60, name="grouping-update-lock").acquire():
+        if cache.get(cache_key) is None:
+            cache.set(cache_key, "1", 60 * 5)
+        else:
+            return
 
-        hashes = CalculatedHashes(
-            hashes=hashes.hashes + (secondary_hashes and secondary_hashes.hashes or []),
-            hierarchical_hashes=hashes.hierarchical_hashes,
-            tree_labels=hashes.tree_labels,
+        from sentry import audit_log
+        from sentry.utils.audit import create_system_audit_entry
+
+        expiry = int(time.time()) + settings.SENTRY_GROUPING_UPDATE_MIGRATION_PHASE
+        changes = {
+            "sentry:secondary_grouping_config": old_grouping,
+            "sentry:secondary_grouping_expiry": expiry,
+            "sentry:grouping_config": new_grouping,
+        }
+        for (key, value) in changes.items():
+            project.update_option(key, value)
+        create_system_audit_entry(
+            organization=project.organization,
+            target_object=project.id,
+            event=audit_log.get_event_id("PROJECT_EDIT"),
+            data={**changes, **project.get_audit_log_data()},
         )
 
-        if not do_background_grouping_before:
-            _run_background_grouping(project, job)
 
-        if hashes.tree_labels:
-            job["finest_tree_label"] = hashes.finest_tree_label
+@metrics.wraps("event_manager.background_grouping")
+def _calculate_background_grouping(project, event, config):
+    return _calculate_event_grouping(project, event, config)
 
-        _materialize_metadata_many(jobs)
 
-        kwargs = _create_kwargs(job)
+def _run_background_grouping(project, job):
+    """Optionally run a fraction of events with a third grouping config
+    This can be helpful to measure its performance impact.
+    This does not affect actual grouping.
+    """
+    try:
+        sample_rate = options.get("store.background-grouping-sample-rate")
+        if sample_rate and random.random() <= sample_rate:
+            config = BackgroundGroupingConfigLoader().get_config_dict(project)
+            if config["id"]:
+                copied_event = copy.deepcopy(job["event"])
+                _calculate_background_grouping(project, copied_event, config)
+    except Exception:
+        sentry_sdk.capture_exception()
+
+
+def _get_job_category(data):
+    event_type = data.get("type")
+    if event_type == "transaction":
+        # TODO: This logic should move into sentry-relay, but I'm not sure
+        # about the consequences of making `from_event_type` return
+        # `TRANSACTION_INDEXED` unconditionally.
+        # https://github.com/getsentry/relay/blob/d77c489292123e53831e10281bd310c6a85c63cc/relay-server/src/envelope.rs#L121
+        return DataCategory.TRANSACTION_INDEXED
+
+    return DataCategory.from_event_type(event_type)
 
-        kwargs["culprit"] = job["culprit"]
 
+@metrics.wraps("event_manager.save_error_events")
+def save_error_events(jobs, projects):
+    """
+    Save a batch of error events in one go. Every job needs ``data``,
+    ``project_id``, ``raw``, ``start_time`` and ``cache_key`` set, and
+    ``projects`` maps the ids of all involved projects to their instances.
+
+    Grouping is calculated per event, while grouphashes, environments,
+    releases and group releases are resolved with one query per distinct
+    value, and nodestore is written in one batch.
+
+    Events that match a discarded hash are dropped from the batch and get
+    ``job["hash_discarded"]`` set to the raised ``HashDiscarded``. Events that
+    fail to be grouped are dropped as well and get ``job["save_error"]`` set
+    to the raised exception, which callers have to raise or report. Returns the
+    list of jobs that were saved.
+    """
+
+    _set_organization_cache(projects)
+
+    for job in jobs:
+        job["is_reprocessed"] = is_reprocessed_event(job["data"])
+
+    with sentry_sdk.start_span(op="event_manager.save.pull_out_data"):
+        _pull_out_data(jobs, projects)
+
+    with sentry_sdk.start_span(op="event_manager.save.get_or_create_release_many"):
+        _get_or_create_release_many(jobs, projects)
+
+    with sentry_sdk.start_span(op="event_manager.save.get_event_user_many"):
+        _get_event_user_many(jobs, projects)
+
+    _get_project_keys_many(jobs)
+    _derive_plugin_tags_many(jobs, projects)
+    _derive_interface_tags_many(jobs)
+
+    with sentry_sdk.start_span(op="event_manager.save.calculate_event_grouping"):
+        _calculate_event_grouping_many(jobs, projects)
+
+    _materialize_metadata_many(jobs)
+
+    for job in jobs:
         # Load attachments first, but persist them at the very last after
         # posting to eventstream to make sure all counters and eventstream are
         # incremented for sure. Also wait for grouping to remove attachments
         # based on the group counter.
         with metrics.timer("event_manager.get_attachments"):
             with sentry_sdk.start_span(op="event_manager.save.get_attachments"):
-                attachments = get_attachments(cache_key, job)
+                job["attachments"] = get_attachments(job["cache_key"], job)
+
+    with sentry_sdk.start_span(op="event_manager.save.get_or_create_grouphashes_many"):
+        _get_or_create_grouphashes_many(jobs, projects)
+
+    saved_jobs = []
+    for job in jobs:
+        kwargs = _create_kwargs(job)
+        kwargs["culprit"] = job["culprit"]
 
         try:
             with sentry_sdk.start_span(op="event_manager.save.save_aggregate_fn"):
                 group_info = _save_aggregate(
                     event=job["event"],
-                    hashes=hashes,
+                    hashes=job["hashes"],
                     release=job["release"],
                     metadata=dict(job["event_metadata"]),
                     received_timestamp=job["received_timestamp"],
+                    grouphashes=job["grouphashes"],
                     **kwargs,
                 )
-                job["groups"] = [group_info]
         except HashDiscarded as err:
             logger.info(
                 "event_manager.save.discard",
@@ -516,72 +584,86 @@ class EventManager:
                     "tombstone_id": err.tombstone_id,
                 },
             )
-            discard_event(job, attachments)
-            raise
+            discard_event(job, job["attachments"])
+            job["hash_discarded"] = err
+            continue
+        except Exception as err:
+            # Don't fail the other events of the batch, the caller reports the error.
+            job["save_error"] = err
+            continue
 
         if not group_info:
-            return job["event"]
+            continue
 
+        job["groups"] = [group_info]
         job["event"].group = group_info.group
 
         # store a reference to the group id to guarantee validation of isolation
         # XXX(markus): No clue what this does
         job["event"].data.bind_ref(job["event"])
 
-        _get_or_create_environment_many(jobs, projects)
-        _get_or_create_group_environment_many(jobs, projects)
-        _get_or_create_release_associated_models(jobs, projects)
-        _get_or_create_group_release_many(jobs, projects)
-        _tsdb_record_all_metrics(jobs)
+        saved_jobs.append(job)
 
-        UserReport.objects.filter(project_id=project.id, event_id=job["event"].event_id).update(
-            group_id=group_info.group.id, environment_id=job["environment"].id
-        )
+    jobs = saved_jobs
+    if not jobs:
+        return jobs
+
+    _get_or_create_environment_many(jobs, projects)
+    _get_or_create_group_environment_many(jobs, projects)
+    _get_or_create_release_associated_models(jobs, projects)
+    _get_or_create_group_release_many(jobs, projects)
+    _tsdb_record_all_metrics(jobs)
+    _update_user_reports_many(jobs)
 
+    for job in jobs:
         with metrics.timer("event_manager.filter_attachments_for_group"):
-            attachments = filter_attachments_for_group(attachments, job)
+            job["attachments"] = filter_attachments_for_group(job["attachments"], job)
 
-        # XXX: DO NOT MUTATE THE EVENT PAYLOAD AFTER THIS POINT
-        _materialize_event_metrics(jobs)
+    # XXX: DO NOT MUTATE THE EVENT PAYLOAD AFTER THIS POINT
+    _materialize_event_metrics(jobs)
 
-        for attachment in attachments:
+    for job in jobs:
+        for attachment in job["attachments"]:
             key = f"bytes.stored.{attachment.type}"
             old_bytes = job["event_metrics"].get(key) or 0
             job["event_metrics"][key] = old_bytes + attachment.size
 
-        _nodestore_save_many(jobs)
-        save_unprocessed_event(project, job["event"].event_id)
+    _nodestore_save_many(jobs)
 
-        if not raw:
+    for job in jobs:
+        event = job["event"]
+        project = projects[job["project_id"]]
+        save_unprocessed_event(project, event.event_id)
+
+        if not job["raw"]:
             if not project.first_event:
-                project.update(first_event=job["event"].datetime)
-                first_event_received.send_robust(
-                    project=project, event=job["event"], sender=Project
-                )
+                project.update(first_event=event.datetime)
+                first_event_received.send_robust(project=project, event=event, sender=Project)
 
-        if is_reprocessed:
+        if job["is_reprocessed"]:
             safe_execute(
                 reprocessing2.buffered_delete_old_primary_hash,
-                project_id=job["event"].project_id,
-                group_id=reprocessing2.get_original_group_id(job["event"]),
-                event_id=job["event"].event_id,
-                datetime=job["event"].datetime,
-                old_primary_hash=reprocessing2.get_original_primary_hash(job["event"]),
-                current_primary_hash=job["event"].get_primary_hash(),
+                project_id=event.project_id,
+                group_id=reprocessing2.get_original_group_id(event),
+                event_id=event.event_id,
+                datetime=event.datetime,
+                old_primary_hash=reprocessing2.get_original_primary_hash(event),
+                current_primary_hash=event.get_primary_hash(),
                 _with_transaction=False,
             )
 
-        _eventstream_insert_many(jobs)
+    _eventstream_insert_many(jobs)
 
+    for job in jobs:
         # Do this last to ensure signals get emitted even if connection to the
         # file store breaks temporarily.
         #
         # We do not need this for reprocessed events as for those we update the
         # group_id on existing models in post_process_group, which already does
         # this because of indiv. attachments.
-        if not is_reprocessed:
+        if not job["is_reprocessed"]:
             with metrics.timer("event_manager.save_attachments"):
-                save_attachments(cache_key, attachments, job)
+                save_attachments(job["cache_key"], job["attachments"], job)
 
         metric_tags = {"from_relay": "_relay_processed" in job["data"]}
 
@@ -597,99 +679,143 @@ class EventManager:
             tags=metric_tags,
         )
 
-        _track_outcome_accepted_many(jobs)
+    _track_outcome_accepted_many(jobs)
+    return jobs
 
-        self._data = job["event"].data.data
 
-        # Check if the project is configured for auto upgrading and we need to upgrade
-        # to the latest grouping config.
-        if auto_upgrade_grouping and _project_should_update_grouping(project):
-            _auto_update_grouping(project)
+def _set_organization_cache(projects):
+    with metrics.timer("event_manager.save.collect_organization_ids"):
+        organization_ids = {project.organization_id for project in projects.values()}
 
-        return job["event"]
+    with metrics.timer("event_manager.save.fetch_organizations"):
+        organizations = {
+            o.id: o for o in Organization.objects.get_many_from_cache(organization_ids)
+        }
 
+    with metrics.timer("event_manager.save.set_organization_cache"):
+        for project in projects.values():
+            try:
+                project.set_cached_field_value(
+                    "organization", organizations[project.organization_id]
+                )
+            except KeyError:
+                continue
 
-def _project_should_update_grouping(project):
-    should_update_org = (
-        project.organization_id % 1000 < float(settings.SENTRY_GROUPING_AUTO_UPDATE_ENABLED) * 1000
-    )
-    return project.get_option("sentry:grouping_auto_update") and should_update_org
 
+@metrics.wraps("save_event.get_project_keys_many")
+def _get_project_keys_many(jobs):
+    key_ids = {job["key_id"] for job in jobs if job["key_id"] is not None}
+    project_keys = {}
+    if key_ids:
+        with metrics.timer("event_manager.load_project_key"):
+            project_keys = {pk.id: pk for pk in ProjectKey.objects.get_many_from_cache(key_ids)}
 
-def _auto_update_grouping(project):
-    old_grouping = project.get_option("sentry:grouping_config")
-    new_grouping = DEFAULT_GROUPING_CONFIG
+    for job in jobs:
+        job["project_key"] = project_keys.get(job["key_id"])
 
-    # update to latest grouping config but not if a user is already on
-    # beta.
-    if old_grouping == new_grouping or old_grouping == BETA_GROUPING_CONFIG:
-        return
 
-    # Because the way the auto grouping upgrading happening is racy, we want to
-    # try to write the audit log entry only and project option change just once.
-    # For this a cache key is used.  That's not perfect, but should reduce the
-    # risk significantly.
-    cache_key = f"grouping-config-update:{project.id}:{old_grouping}"
-    lock = f"grouping-update-lock:{project.id}"
-    if cache.get(cache_key) is not None:
-        return
+@metrics.wraps("save_event.calculate_event_grouping_many")
+def _calculate_event_grouping_many(jobs, projects):
+    do_background_grouping_before = options.get("store.background-grouping-before")
 
-    with locks.get(lock, duration=60, name="grouping-update-lock").acquire():
-        if cache.get(cache_key) is None:
-            cache.set(cache_key, "1", 60 * 5)
-        else:
-            return
+    for job in jobs:
+        project = projects[job["project_id"]]
 
-        from sentry import audit_log
-        from sentry.utils.audit import create_system_audit_entry
+        if do_background_grouping_before:
+            _run_background_grouping(project, job)
 
-        expiry = int(time.time()) + settings.SENTRY_GROUPING_UPDATE_MIGRATION_PHASE
-        changes = {
-            "sentry:secondary_grouping_config": old_grouping,
-            "sentry:secondary_grouping_expiry": expiry,
-            "sentry:grouping_config": new_grouping,
-        }
-        for (key, value) in changes.items():
-            project.update_option(key, value)
-        create_system_audit_entry(
-            organization=project.organization,
-            target_object=project.id,
-            event=audit_log.get_event_id("PROJECT_EDIT"),
-            data={**changes, **project.get_audit_log_data()},
+        secondary_hashes = None
+
+        try:
+            secondary_grouping_config = project.get_option("sentry:secondary_grouping_config")
+            secondary_grouping_expiry = project.get_option("sentry:secondary_grouping_expiry")
+            if secondary_grouping_config and (secondary_grouping_expiry or 0) >= time.time():
+                with metrics.timer("event_manager.secondary_grouping"):
+                    secondary_event = copy.deepcopy(job["event"])
+                    loader = SecondaryGroupingConfigLoader()
+                    secondary_grouping_config = loader.get_config_dict(project)
+                    secondary_hashes = _calculate_event_grouping(
+                        project, secondary_event, secondary_grouping_config
+                    )
+        except Exception:
+            sentry_sdk.capture_exception()
+
+        with metrics.timer("event_manager.load_grouping_config"):
+            # At this point we want to normalize the in_app values in case the
+            # clients did not set this appropriately so far.
+            if job["is_reprocessed"]:
+                # The customer might have changed grouping enhancements since
+                # the event was ingested -> make sure we get the fresh one for reprocessing.
+                grouping_config = get_grouping_config_dict_for_project(project)
+                # Write back grouping config because it might have changed since the
+                # event was ingested.
+                # NOTE: We could do this unconditionally (regardless of `is_processed`).
+                job["data"]["grouping_config"] = grouping_config
+            else:
+                grouping_config = get_grouping_config_dict_for_event_data(
+                    job["event"].data.data, project
+                )
+
+        with metrics.timer("event_manager.calculate_event_grouping"):
+            hashes = _calculate_event_grouping(project, job["event"], grouping_config)
+
+        hashes = CalculatedHashes(
+            hashes=hashes.hashes + (secondary_hashes and secondary_hashes.hashes or []),
+            hierarchical_hashes=hashes.hierarchical_hashes,
+            tree_labels=hashes.tree_labels,
         )
 
+        if not do_background_grouping_before:
+            _run_background_grouping(project, job)
 
-@metrics.wraps("event_manager.background_grouping")
-def _calculate_background_grouping(project, event, config):
-    return _calculate_event_grouping(project, event, config)
+        if hashes.tree_labels:
+            job["finest_tree_label"] = hashes.finest_tree_label
 
+        job["hashes"] = hashes
 
-def _run_background_grouping(project, job):
-    """Optionally run a fraction of events with a third grouping config
-    This can be helpful to measure its performance impact.
-    This does not affect actual grouping.
+
+@metrics.wraps("save_event.get_or_create_grouphashes_many")
+def _get_or_create_grouphashes_many(jobs, projects):
     """
-    try:
-        sample_rate = options.get("store.background-grouping-sample-rate")
-        if sample_rate and random.random() <= sample_rate:
-            config = BackgroundGroupingConfigLoader().get_config_dict(project)
-            if config["id"]:
-                copied_event = copy.deepcopy(job["event"])
-                _calculate_background_grouping(project, copied_event, config)
-    except Exception:
-        sentry_sdk.capture_exception()
+    Look up the flat and hierarchical grouphashes of all jobs with a single
+    query per project. The resulting mapping of hash to `GroupHash` is shared
+    between all jobs of the same project and passed to `_save_aggregate`,
+    which creates missing flat grouphashes and keeps the mapping up to date.
+    """
+    hashes_by_project = {}
+    for job in jobs:
+        hashes = job["hashes"]
+        project_hashes = hashes_by_project.setdefault(job["project_id"], set())
+        project_hashes.update(hashes.hashes)
+        project_hashes.update(hashes.hierarchical_hashes)
 
+    grouphashes_by_project = get_grouphashes_many(hashes_by_project)
 
-def _get_job_category(data):
-    event_type = data.get("type")
-    if event_type == "transaction":
-        # TODO: This logic should move into sentry-relay, but I'm not sure
-        # about the consequences of making `from_event_type` return
-        # `TRANSACTION_INDEXED` unconditionally.
-        # https://github.com/getsentry/relay/blob/d77c489292123e53831e10281bd310c6a85c63cc/relay-server/src/envelope.rs#L121
-        return DataCategory.TRANSACTION_INDEXED
+    for job in jobs:
+        job["grouphashes"] = grouphashes_by_project[job["project_id"]]
 
-    return DataCategory.from_event_type(event_type)
+
+@metrics.wraps("save_event.update_user_reports_many")
+def _update_user_reports_many(jobs):
+    event_ids = {job["event"].event_id for job in jobs}
+    project_ids = {job["project_id"] for job in jobs}
+
+    reported = set(
+        UserReport.objects.filter(project_id__in=project_ids, event_id__in=event_ids).values_list(
+            "project_id", "event_id"
+        )
+    )
+    if not reported:
+        return
+
+    for job in jobs:
+        event = job["event"]
+        if (job["project_id"], event.event_id) not in reported:
+            continue
+
+        UserReport.objects.filter(project_id=job["project_id"], event_id=event.event_id).update(
+            group_id=event.group.id, environment_id=job["environment"].id
+        )
 
 
 @metrics.wraps("save_event.pull_out_data")
@@ -977,16 +1103,29 @@ def _create_kwargs(job):
 
 @metrics.wraps("save_event.get_or_create_environment_many")
 def _get_or_create_environment_many(jobs, projects):
+    environments = {}
     for job in jobs:
-        job["environment"] = Environment.get_or_create(
-            project=projects[job["project_id"]], name=job["environment"]
-        )
+        environment_key = (job["project_id"], job["environment"])
+        if environment_key not in environments:
+            environments[environment_key] = Environment.get_or_create(
+                project=projects[job["project_id"]], name=job["environment"]
+            )
+        job["environment"] = environments[environment_key]
 
 
 @metrics.wraps("save_event.get_or_create_group_environment_many")
 def _get_or_create_group_environment_many(jobs, projects):
+    seen_group_environments = set()
     for job in jobs:
         for group_info in job["groups"]:
+            group_environment_key = (group_info.group.id, job["environment"].id)
+            if group_environment_key in seen_group_environments:
+                # Only the first event of a batch can create the group
+                # environment.
+                group_info.is_new_group_environment = False
+                continue
+
+            seen_group_environments.add(group_environment_key)
             group_info.is_new_group_environment = GroupEnvironment.get_or_create(
                 group_id=group_info.group.id,
                 environment_id=job["environment"].id,
@@ -999,14 +1138,21 @@ def _get_or_create_release_associated_models(jobs, projects):
     # XXX: This is possibly unnecessarily detached from
     # _get_or_create_release_many, but we do not want to destroy order of
     # execution right now
+    jobs_by_release_environment = {}
     for job in jobs:
         release = job["release"]
         if not release:
             continue
 
+        release_environment_key = (job["project_id"], release.id, job["environment"].id)
+        jobs_by_release_environment.setdefault(release_environment_key, []).append(job)
+
+    for jobs_to_update in jobs_by_release_environment.values():
+        job = jobs_to_update[0]
+        release = job["release"]
         project = projects[job["project_id"]]
         environment = job["environment"]
-        date = job["event"].datetime
+        date = max(j["event"].datetime for j in jobs_to_update)
 
         ReleaseEnvironment.get_or_create(
             project=project, release=release, environment=environment, datetime=date
@@ -1017,7 +1163,7 @@ def _get_or_create_release_associated_models(jobs, projects):
         )
         rp_new_groups = 0
         rpe_new_groups = 0
-        for group_info in job["groups"]:
+        for group_info in itertools.chain.from_iterable(j["groups"] for j in jobs_to_update):
             if group_info.is_new:
                 rp_new_groups += 1
             if group_info.is_new_group_environment:
@@ -1042,16 +1188,30 @@ def _get_or_create_release_associated_models(jobs, projects):
 
 @metrics.wraps("save_event.get_or_create_group_release_many")
 def _get_or_create_group_release_many(jobs, projects):
+    group_infos_by_group_release = {}
     for job in jobs:
         if job["release"]:
             for group_info in job["groups"]:
-                group_info.group_release = GroupRelease.get_or_create(
-                    group=group_info.group,
-                    release=job["release"],
-                    environment=job["environment"],
-                    datetime=job["event"].datetime,
+                group_release_key = (
+                    group_info.group.id,
+                    job["release"].id,
+                    job["environment"].id,
+                )
+                group_infos_by_group_release.setdefault(group_release_key, []).append(
+                    (job, group_info)
                 )
 
+    for job_group_infos in group_infos_by_group_release.values():
+        job, group_info = job_group_infos[0]
+        group_release = GroupRelease.get_or_create(
+            group=group_info.group,
+            release=job["release"],
+            environment=job["environment"],
+            datetime=max(j["event"].datetime for j, _ in job_group_infos),
+        )
+        for _, group_info in job_group_infos:
+            group_info.group_release = group_release
+
 
 @metrics.wraps("save_event.tsdb_record_all_metrics")
 def _tsdb_record_all_metrics(jobs):
@@ -1113,22 +1273,37 @@ def _tsdb_record_all_metrics(jobs):
 @metrics.wraps("save_event.nodestore_save_many")
 def _nodestore_save_many(jobs):
     inserted_time = datetime.utcnow().replace(tzinfo=UTC).timestamp()
+
+    # We only care about `unprocessed` for error events
+    unprocessed_keys = {
+        (job["event"].project_id, job["event"].event_id): cache_key_for_event(
+            {"project": job["event"].project_id, "event_id": job["event"].event_id}
+        )
+        for job in jobs
+        if job["event"].get_event_type() != "transaction" and job["groups"]
+    }
+    unprocessed_events = {}
+    if unprocessed_keys:
+        unprocessed_events = event_processing_store.get_many(
+            list(unprocessed_keys.values()), unprocessed=True
+        )
+
+    nodes = []
     for job in jobs:
         # Write the event to Nodestore
         subkeys = {}
 
         event = job["event"]
-        # We only care about `unprocessed` for error events
-        if event.get_event_type() != "transaction" and job["groups"]:
-            unprocessed = event_processing_store.get(
-                cache_key_for_event({"project": event.project_id, "event_id": event.event_id}),
-                unprocessed=True,
-            )
+        unprocessed_key = unprocessed_keys.get((event.project_id, event.event_id))
+        if unprocessed_key is not None:
+            unprocessed = unprocessed_events.get(unprocessed_key)
             if unprocessed is not None:
                 subkeys["unprocessed"] = unprocessed
 
-        job["event"].data["nodestore_insert"] = inserted_time
-        job["event"].data.save(subkeys=subkeys)
+        event.data["nodestore_insert"] = inserted_time
+        nodes.append((event.data, subkeys))
+
+    NodeData.save_many(nodes, deduplicate=options.get("nodestore.deduplicate-interfaces"))
 
 
 @metrics.wraps("save_event.eventstream_insert_many")
@@ -1315,12 +1490,49 @@ def get_culprit(data):
     )
 
 
-def _save_aggregate(event, hashes, release, metadata, received_timestamp, **kwargs) -> GroupInfo:
+def _get_or_create_grouphashes(project, hashes, grouphashes=None):
+    """
+    Resolve `hashes` into `GroupHash` instances, creating missing ones.
+
+    :param grouphashes: An optional mapping of already resolved grouphashes
+        (see `_get_or_create_grouphashes_many`). Hashes missing from it are
+        created and added to it.
+    """
+    if grouphashes is None:
+        grouphashes = get_grouphashes_many({project.id: hashes})[project.id]
+
+    rv = []
+    for hash in hashes:
+        grouphash = grouphashes.get(hash)
+        if grouphash is None:
+            grouphash = grouphashes[hash] = GroupHash.objects.get_or_create(
+                project=project, hash=hash
+            )[0]
+        rv.append(grouphash)
+
+    return rv
+
+
+def _assign_grouphashes_to_group(new_hashes, group, grouphashes=None):
+    GroupHash.objects.filter(id__in=[h.id for h in new_hashes]).exclude(
+        state=GroupHash.State.LOCKED_IN_MIGRATION
+    ).update(group=group)
+
+    # Keep the grouphashes shared by events of the same batch up to date, so
+    # that subsequent events find the group without entering group creation.
+    if grouphashes is not None:
+        for h in new_hashes:
+            grouphash = grouphashes.get(h.hash)
+            if grouphash is not None and grouphash.state != GroupHash.State.LOCKED_IN_MIGRATION:
+                grouphash.group_id = group.id
+
+
+def _save_aggregate(
+    event, hashes, release, metadata, received_timestamp, grouphashes=None, **kwargs
+) -> GroupInfo:
     project = event.project
 
-    flat_grouphashes = [
-        GroupHash.objects.get_or_create(project=project, hash=hash)[0] for hash in hashes.hashes
-    ]
+    flat_grouphashes = _get_or_create_grouphashes(project, hashes.hashes, grouphashes)
 
     # The root_hierarchical_hash is the least specific hash within the tree, so
     # typically hierarchical_hashes[0], unless a hash `n` has been split in
@@ -1329,12 +1541,12 @@ def _save_aggregate(event, hashes, release, metadata, received_timestamp, **kwar
     # when groups are created and also relieves contention by locking a more
     # specific hash than `hierarchical_hashes[0]`.
     existing_grouphash, root_hierarchical_hash = _find_existing_grouphash(
-        project, flat_grouphashes, hashes.hierarchical_hashes
+        project, flat_grouphashes, hashes.hierarchical_hashes, grouphashes
     )
 
     if root_hierarchical_hash is not None:
-        root_hierarchical_grouphash = GroupHash.objects.get_or_create(
-            project=project, hash=root_hierarchical_hash
+        root_hierarchical_grouphash = _get_or_create_grouphashes(
+            project, [root_hierarchical_hash], grouphashes
         )[0]
 
         metadata.update(
@@ -1407,9 +1619,7 @@ def _save_aggregate(event, hashes, release, metadata, received_timestamp, **kwar
                 else:
                     new_hashes = list(flat_grouphashes)
 
-                GroupHash.objects.filter(id__in=[h.id for h in new_hashes]).exclude(
-                    state=GroupHash.State.LOCKED_IN_MIGRATION
-                ).update(group=group)
+                _assign_grouphashes_to_group(new_hashes, group, grouphashes)
 
                 is_new = True
                 is_regression = False
@@ -1425,7 +1635,18 @@ def _save_aggregate(event, hashes, release, metadata, received_timestamp, **kwar
 
                 return GroupInfo(group, is_new, is_regression)
 
-    group = Group.objects.get(id=existing_grouphash.group_id)
+    try:
+        group = Group.objects.get(id=existing_grouphash.group_id)
+    except Group.DoesNotExist:
+        if grouphashes is None:
+            raise
+
+        # The grouphash was resolved ahead of time (possibly from the
+        # grouphash cache) and its group has been deleted since. Start over
+        # with grouphashes that are read from the database.
+        invalidate_grouphash_cache(project.id)
+        return _save_aggregate(event, hashes, release, metadata, received_timestamp, **kwargs)
+
     if group.issue_category != GroupCategory.ERROR:
         logger.info(
             "event_manager.category_mismatch",
@@ -1474,9 +1695,7 @@ def _save_aggregate(event, hashes, release, metadata, received_timestamp, **kwar
         # _save_aggregate had races around group creation which made this race
         # more user visible. For more context, see 84c6f75a and d0e22787, as
         # well as GH-5085.
-        GroupHash.objects.filter(id__in=[h.id for h in new_hashes]).exclude(
-            state=GroupHash.State.LOCKED_IN_MIGRATION
-        ).update(group=group)
+        _assign_grouphashes_to_group(new_hashes, group, grouphashes)
 
     is_regression = _process_existing_aggregate(
         group=group, event=event, data=kwargs, release=release
@@ -1489,6 +1708,7 @@ def _find_existing_grouphash(
     project,
     flat_grouphashes,
     hierarchical_hashes,
+    grouphashes=None,
 ):
     all_grouphashes = []
     root_hierarchical_hash = None
@@ -1496,10 +1716,15 @@ def _find_existing_grouphash(
     found_split = False
 
     if hierarchical_hashes:
-        hierarchical_grouphashes = {
-            h.hash: h
-            for h in GroupHash.objects.filter(project=project, hash__in=hierarchical_hashes)
-        }
+        if grouphashes is not None:
+            hierarchical_grouphashes = {
+                hash: grouphashes[hash] for hash in hierarchical_hashes if hash in grouphashes
+            }
+        else:
+            hierarchical_grouphashes = {
+                h.hash: h
+                for h in GroupHash.objects.filter(project=project, hash__in=hierarchical_hashes)
+            }
 
         # Look for splits:
         # 1. If we find a hash with SPLIT state at `n`, we want to use
@@ -1928,9 +2153,18 @@ def save_attachment(
     else:
         timestamp = datetime.utcnow().replace(tzinfo=UTC)
 
+    file = File.objects.create(
+        name=attachment.name,
+        type=attachment.type,
+        headers={"Content-Type": attachment.content_type},
+    )
+
     try:
-        data = attachment.data
+        # Stream the chunks into the file store instead of loading the whole
+        # attachment into memory.
+        file.putfile(attachment.open(), blob_size=settings.SENTRY_ATTACHMENT_BLOB_SIZE)
     except MissingAttachmentChunks:
+        file.delete()
         track_outcome(
             org_id=project.organization_id,
             project_id=project.id,
@@ -1945,13 +2179,6 @@ def save_attachment(
         logger.exception("Missing chunks for cache_key=%s", cache_key)
         return
 
-    file = File.objects.create(
-        name=attachment.name,
-        type=attachment.type,
-        headers={"Content-Type": attachment.content_type},
-    )
-    file.putfile(BytesIO(data), blob_size=settings.SENTRY_ATTACHMENT_BLOB_SIZE)
-
     EventAttachment.objects.create(
         event_id=event_id,
         project_id=project.id,
@@ -3,15 +3,34 @@ Eventstore compressor is responsible for pulling out repeating data across
 events such that they can be stored only once. For example SDK modules list, or
 debug_meta.
 
-This is not used in production yet, we are still collecting metrics there.
+Every deduplicated interface is split into a part that is shared across
+events of a project, which is stored once in nodestore under the project and
+its checksum, and a part that is stored inline with the event.
+``deduplicate_nodes`` and ``assemble_nodes`` apply this to nodestore writes
+and reads when the ``nodestore.deduplicate-interfaces`` option is enabled.
+Nodes that have been written without deduplication can always be read.
+
+Shared parts are not deleted along with the events that refer to them. They
+are never shared with other projects, and expire like all other nodes once no
+event has been written with them for the retention period.
 """
 
+import copy
 import hashlib
+import logging
+
+from sentry.utils import json, metrics
+from sentry.utils.datastructures import LRUCache
 
-from sentry.utils import json
+logger = logging.getLogger(__name__)
 
 _INTERFACES = {}
 
+PATCHSETS_KEY = "__nodestore_patchsets"
+
+# Deduplicated parts are immutable, so they can be cached in every process.
+_extra_keys_cache = LRUCache(1000)
+
 
 def _deduplicate_interface(*keys):
     def inner(f):
@@ -51,7 +70,83 @@ class DebugMeta:
         return data
 
 
+@_deduplicate_interface("modules", "sdk")
+class Shared:
+    """
+    Interfaces that are usually identical for all events of a release, and are
+    stored once as a whole.
+    """
+
+    @staticmethod
+    def encode(data):
+        return data, None
+
+    @staticmethod
+    def decode(dedup, data):
+        return dedup
+
+
+@_deduplicate_interface("contexts")
+class Contexts:
+    # Fields of a context that are shared across events. ``None`` shares the
+    # entire context.
+    _DEDUP_CONTEXTS = {
+        "device": (
+            "name",
+            "family",
+            "model",
+            "model_id",
+            "arch",
+            "brand",
+            "manufacturer",
+            "simulator",
+            "memory_size",
+            "storage_size",
+            "screen_resolution",
+            "screen_density",
+            "screen_dpi",
+            "processor_count",
+            "processor_frequency",
+            "cpu_description",
+        ),
+        "os": None,
+        "runtime": None,
+    }
+
+    @staticmethod
+    def encode(data):
+        dedup = {}
+
+        if isinstance(data, dict):
+            for name, fields in Contexts._DEDUP_CONTEXTS.items():
+                context = data.get(name)
+                if not isinstance(context, dict):
+                    continue
+
+                if fields is None:
+                    dedup[name] = data.pop(name)
+                    continue
+
+                shared = {field: context.pop(field) for field in fields if field in context}
+                if shared:
+                    dedup[name] = shared
+
+        return dedup, data
+
+    @staticmethod
+    def decode(dedup, data):
+        for name, shared in dedup.items():
+            data.setdefault(name, {}).update(shared)
+
+        return data
+
+
 def deduplicate(data):
+    """
+    Splits the deduplicated interfaces of ``data`` into their shared and
+    inline parts. Returns the data with the inline parts and the shared parts
+    by checksum. ``data`` is not modified.
+    """
     patchsets = []
     extra_keys = {}
 
@@ -59,31 +154,122 @@ def deduplicate(data):
         if key not in data:
             continue
 
-        to_deduplicate, to_inline = interface.encode(data.pop(key))
+        to_deduplicate, to_inline = interface.encode(copy.deepcopy(data[key]))
+        if not to_deduplicate:
+            continue
+
         to_deduplicate_serialized = json.dumps(to_deduplicate, sort_keys=True).encode("utf8")
         checksum = hashlib.md5(to_deduplicate_serialized).hexdigest()
         extra_keys[checksum] = to_deduplicate
         patchsets.append([key, checksum, to_inline])
 
     if patchsets:
-        data["__nodestore_patchsets"] = patchsets
+        data = dict(data)
+        for key, _, _ in patchsets:
+            del data[key]
+        data[PATCHSETS_KEY] = patchsets
 
     return data, extra_keys
 
 
 def assemble(data, get_extra_keys):
-    if not data.get("__nodestore_patchsets"):
+    if not data.get(PATCHSETS_KEY):
         return data
 
     checksums = []
-    for key, checksum, inlined in data["__nodestore_patchsets"]:
+    for key, checksum, inlined in data[PATCHSETS_KEY]:
         checksums.append(checksum)
 
     deduplicated_interfaces = get_extra_keys(checksums)
 
-    for key, checksum, inlined in data["__nodestore_patchsets"]:
-        deduplicated = deduplicated_interfaces[checksum]
-        data[key] = _INTERFACES[key].decode(deduplicated, inlined)
+    for key, checksum, inlined in data[PATCHSETS_KEY]:
+        deduplicated = deduplicated_interfaces.get(checksum)
+        if deduplicated is None:
+            # The shared part is gone, keep what has been stored inline.
+            logger.warning("eventstore.compressor.missing-extra-key", extra={"checksum": checksum})
+            data[key] = inlined
+            continue
+
+        data[key] = _INTERFACES[key].decode(copy.deepcopy(deduplicated), inlined)
 
-    del data["__nodestore_patchsets"]
+    del data[PATCHSETS_KEY]
     return data
+
+
+def get_extra_key_node_id(project_id, checksum):
+    return f"dedup:{project_id}:{checksum}"
+
+
+def deduplicate_nodes(items):
+    """
+    Deduplicates the nodes in ``items``, a mapping of node ids to subkeys as
+    passed to ``nodestore.set_subkeys_multi``. Returns the deduplicated items
+    and the nodes of shared parts that have to be written along with them.
+
+    Shared parts are only shared by the events of a project, nodes that do
+    not belong to a project are not deduplicated. They are written with every
+    batch that refers to them, even if they have been written before, so that
+    they never expire before the events that refer to them.
+    """
+    rv = {}
+    extra_nodes = {}
+    for id, subkeys in items.items():
+        project_id = subkeys[None].get("project")
+        if project_id is None:
+            rv[id] = subkeys
+            continue
+
+        data, extra_keys = deduplicate(subkeys[None])
+        rv[id] = {**subkeys, None: data}
+
+        for checksum, value in extra_keys.items():
+            extra_nodes[get_extra_key_node_id(project_id, checksum)] = {None: value}
+
+    metrics.incr("eventstore.compressor.extra_keys.written", amount=len(extra_nodes))
+    return rv, extra_nodes
+
+
+def assemble_nodes(items, get_multi):
+    """
+    Assembles all deduplicated nodes in ``items``, a mapping of node ids to
+    node data, in place. The shared parts are fetched with one call to
+    ``get_multi`` unless they are cached.
+    """
+    node_ids = set()
+    for data in items.values():
+        if isinstance(data, dict):
+            for _, checksum, _ in data.get(PATCHSETS_KEY) or ():
+                node_ids.add(get_extra_key_node_id(data.get("project"), checksum))
+
+    if not node_ids:
+        return items
+
+    extra_nodes = {}
+    for node_id in node_ids:
+        value = _extra_keys_cache.get(node_id)
+        if value is not None:
+            extra_nodes[node_id] = value
+
+    uncached = node_ids - set(extra_nodes)
+    metrics.incr("eventstore.compressor.extra_keys.cache_hit", amount=len(extra_nodes))
+    metrics.incr("eventstore.compressor.extra_keys.fetched", amount=len(uncached))
+    if uncached:
+        fetched = get_multi(list(uncached))
+        for node_id in uncached:
+            value = fetched.get(node_id)
+            if value is not None:
+                _extra_keys_cache.set(node_id, value)
+                extra_nodes[node_id] = value
+
+    for data in items.values():
+        if isinstance(data, dict) and data.get(PATCHSETS_KEY):
+            project_id = data.get("project")
+            assemble(
+                data,
+                lambda checksums: {
+                    checksum: extra_nodes.get(get_extra_key_node_id(project_id, checksum))
+                    for checksum in checksums
+                },
+            )
+
+    return items
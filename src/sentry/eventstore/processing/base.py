@@ -1,5 +1,5 @@
 from datetime import timedelta
-from typing import Any, Optional
+from typing import Any, Mapping, Optional, Sequence
 
 import sentry_sdk
 
@@ -40,12 +40,37 @@ class EventProcessingStore:
             self.inner.set(key, event, self.timeout)
             return key
 
+    def store_many(self, events: Sequence[Event]) -> Sequence[str]:
+        """
+        Store multiple events at once. Returns the keys of the events in the
+        same order.
+        """
+        with sentry_sdk.start_span(op="eventstore.processing.store_many"):
+            keys = [cache_key_for_event(event) for event in events]
+            self.inner.set_many(list(zip(keys, events)), self.timeout)
+            return keys
+
     def get(self, key: str, unprocessed: bool = False) -> Optional[Event]:
         with sentry_sdk.start_span(op="eventstore.processing.get"):
             if unprocessed:
                 key = self.__get_unprocessed_key(key)
             return self.inner.get(key)
 
+    def get_many(self, keys: Sequence[str], unprocessed: bool = False) -> Mapping[str, Event]:
+        """
+        Fetch multiple events by their keys. Missing events are not returned.
+        The returned mapping is always keyed by the keys that were passed in.
+        """
+        with sentry_sdk.start_span(op="eventstore.processing.get_many"):
+            if not unprocessed:
+                return dict(self.inner.get_many(keys))
+
+            keys_by_unprocessed_key = {self.__get_unprocessed_key(key): key for key in keys}
+            return {
+                keys_by_unprocessed_key[key]: value
+                for key, value in self.inner.get_many(list(keys_by_unprocessed_key))
+            }
+
     def delete_by_key(self, key: str) -> None:
         with sentry_sdk.start_span(op="eventstore.processing.delete_by_key"):
             self.inner.delete(key)
@@ -0,0 +1,153 @@
+"""
+An on-disk cache of file blobs.
+
+File blobs are immutable and addressed by their checksum, so they can be
+cached on the local disk without invalidation. The cache is shared between
+all processes that use the same directory: blobs are written to temporary
+files and atomically moved into place, and reading a blob touches its
+modification time. Once the cache grows beyond its maximum size, the least
+recently used blobs are removed.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+
+from sentry.utils import metrics
+
+__all__ = ("FileBlobCache", "get_blob_cache")
+
+TEMP_PREFIX = "._blob-"
+# Temporary files that have not been written to for this long have been left
+# behind by processes that died while storing a blob.
+TEMP_FILE_MAX_AGE = 60 * 60
+
+
+class FileBlobCache:
+    def __init__(self, path, max_size, trim_interval=60):
+        self.path = path
+        self.max_size = max_size
+        self.trim_interval = trim_interval
+        self._last_trim = None
+        self._trim_lock = threading.Lock()
+
+    def _get_path(self, checksum):
+        return os.path.join(self.path, checksum[:2], checksum)
+
+    def open(self, blob):
+        """
+        Returns a file object for the contents of ``blob``, which is fetched
+        from the file store if it is not cached yet.
+        """
+        path = self._get_path(blob.checksum)
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            metrics.incr("filestore.blob-cache", tags={"result": "miss"}, sample_rate=0.1)
+            self._store(blob, path)
+            self._maybe_trim()
+            try:
+                return open(path, "rb")
+            except FileNotFoundError:
+                # Evicted by another process in the meantime
+                return blob.getfile()
+
+        metrics.incr("filestore.blob-cache", tags={"result": "hit"}, sample_rate=0.1)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return f
+
+    def _store(self, blob, path):
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        with tempfile.NamedTemporaryFile(dir=directory, prefix=TEMP_PREFIX, delete=False) as dst:
+            try:
+                with blob.getfile() as src:
+                    shutil.copyfileobj(src, dst)
+            except Exception:
+                os.remove(dst.name)
+                raise
+
+        os.replace(dst.name, path)
+
+    def _maybe_trim(self):
+        now = time.monotonic()
+        if self._last_trim is not None and now - self._last_trim < self.trim_interval:
+            return
+        if not self._trim_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_trim = now
+            self.trim()
+        finally:
+            self._trim_lock.release()
+
+    def trim(self):
+        """
+        Removes the least recently used blobs until the cache fits into its
+        maximum size, and temporary files that have been left behind.
+        """
+        entries = []
+        total_size = 0
+        stale_temp_files = time.time() - TEMP_FILE_MAX_AGE
+        for directory in os.scandir(self.path):
+            if not directory.is_dir():
+                continue
+            for entry in os.scandir(directory.path):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+
+                if entry.name.startswith(TEMP_PREFIX):
+                    if stat.st_mtime < stale_temp_files:
+                        try:
+                            os.remove(entry.path)
+                        except FileNotFoundError:
+                            pass
+                    continue
+
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total_size += stat.st_size
+
+        metrics.timing("filestore.blob-cache.size", total_size)
+        if total_size <= self.max_size:
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_size -= size
+            if total_size <= self.max_size:
+                break
+
+
+_blob_cache = None
+_blob_cache_lock = threading.Lock()
+
+
+def get_blob_cache():
+    """
+    Returns the blob cache configured with ``SENTRY_FILEBLOB_CACHE_DIR``, or
+    ``None`` if the cache is disabled.
+    """
+    global _blob_cache
+
+    path = settings.SENTRY_FILEBLOB_CACHE_DIR
+    if not path:
+        return None
+
+    with _blob_cache_lock:
+        if _blob_cache is None or _blob_cache.path != path:
+            _blob_cache = FileBlobCache(path, settings.SENTRY_FILEBLOB_CACHE_SIZE)
+        return _blob_cache
@@ -8,6 +8,7 @@ from parsimonious.grammar import Grammar, NodeVisitor
 
 from sentry import projectoptions
 from sentry.grouping.component import GroupingComponent
+from sentry.utils.datastructures import LRUCache
 from sentry.utils.strings import unescape_string
 
 from .actions import Action, FlagAction, VarAction
@@ -96,6 +97,12 @@ class StacktraceState:
         return f"{hint} by stack trace rule ({description})"
 
 
+# Parsed enhancements by their serialized form. Grouping loads the
+# enhancements of the project for every event, parsing them (and compiling
+# the matchers of every rule) once per process is enough.
+_loaded_enhancements = LRUCache(100)
+
+
 class Enhancements:
 
     # NOTE: You must add a version to ``VERSIONS`` any time attributes are added
@@ -251,14 +258,23 @@ class Enhancements:
     def loads(cls, data):
         if isinstance(data, str):
             data = data.encode("ascii", "ignore")
+
+        # Instances are never modified after loading and can be shared.
+        rv = _loaded_enhancements.get(data)
+        if rv is not None:
+            return rv
+
         padded = data + b"=" * (4 - (len(data) % 4))
         try:
-            return cls._from_config_structure(
+            rv = cls._from_config_structure(
                 msgpack.loads(zlib.decompress(base64.urlsafe_b64decode(padded)), raw=False)
             )
         except (LookupError, AttributeError, TypeError, ValueError) as e:
             raise ValueError("invalid stack trace rule config: %s" % e)
 
+        _loaded_enhancements.set(data, rv)
+        return rv
+
     @classmethod
     def from_config_string(self, s, bases=None, id=None):
         try:
@@ -285,6 +301,20 @@ class Rule:
             else:
                 self._other_matchers.append(matcher)
 
+        # All matchers have to match, evaluate the cheap ones first.
+        self._exception_matchers.sort(key=lambda m: m.cost)
+        self._other_matchers.sort(key=lambda m: m.cost)
+
+        # The guard is the most selective matcher that only looks at frame
+        # attributes no action can change. The frames it matches are computed
+        # once per stacktrace and shared by all rules with the same guard
+        # (matchers are interned, see `FrameMatch.from_key`), the remaining
+        # matchers only run on those frames.
+        guards = [m for m in self._other_matchers if m.guard_priority is not None]
+        self._guard = min(guards, key=lambda m: m.guard_priority) if guards else None
+        if self._guard is not None:
+            self._other_matchers.remove(self._guard)
+
         self.actions = actions
         self._is_updater = any(action.is_updater for action in actions)
         self._is_modifier = any(action.is_modifier for action in actions)
@@ -327,7 +357,7 @@ class Rule:
         rv = []
 
         # 2 - Check if frame matchers match
-        for idx, frame in enumerate(frames):
+        for idx in self._get_candidate_frames(frames, platform, exception_data, cache):
             if all(
                 m.matches_frame(frames, idx, platform, exception_data, cache)
                 for m in self._other_matchers
@@ -337,6 +367,23 @@ class Rule:
 
         return rv
 
+    def _get_candidate_frames(self, frames, platform, exception_data, cache):
+        if self._guard is None:
+            return range(len(frames))
+
+        if cache is None:
+            cache = {}
+
+        key = ("candidates", self._guard, id(frames))
+        rv = cache.get(key)
+        if rv is None:
+            rv = cache[key] = [
+                idx
+                for idx in range(len(frames))
+                if self._guard.matches_frame(frames, idx, platform, exception_data, cache)
+            ]
+        return rv
+
     def _to_config_structure(self, version):
         return [
             [x._to_config_structure(version) for x in self.matchers],
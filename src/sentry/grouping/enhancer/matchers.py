@@ -1,10 +1,10 @@
-from typing import Optional
+from typing import Optional, Tuple
 
 from sentry.grouping.utils import get_rule_bool
 from sentry.stacktraces.functions import get_function_name_for_frame
 from sentry.stacktraces.platform import get_behavior_family_for_platform
 from sentry.utils import metrics
-from sentry.utils.functional import cached
+from sentry.utils.datastructures import LRUCache
 from sentry.utils.glob import glob_match
 from sentry.utils.safe import get_path
 
@@ -26,6 +26,16 @@ SHORT_MATCH_KEYS = {v: k for k, v in MATCH_KEYS.items()}
 
 assert len(SHORT_MATCH_KEYS) == len(MATCH_KEYS)  # assert short key names are not reused
 
+# Characters with a special meaning in glob patterns. A pattern without any of
+# them only matches its literal value, and a pattern starting with a literal
+# prefix only matches values starting with the same prefix.
+GLOB_SPECIAL_CHARS = frozenset(b"*?[]{}\\!")
+
+# Glob results are shared between events (and enhancement configs), frames
+# from the same SDKs and frameworks repeat across virtually all events of a
+# platform. The key includes the match function, see `_cached_match`.
+_match_results = LRUCache(50_000)
+
 FAMILIES = {"native": "N", "javascript": "J", "all": "a"}
 REVERSE_FAMILIES = {v: k for k, v in FAMILIES.items()}
 
@@ -51,6 +61,31 @@ MATCHERS = {
 }
 
 
+def _get_literal_prefix(pattern: bytes) -> Tuple[bytes, bool]:
+    """Returns the literal prefix of a glob pattern and whether the entire
+    pattern is literal."""
+    for idx, char in enumerate(pattern):
+        if char in GLOB_SPECIAL_CHARS:
+            return pattern[:idx], False
+    return pattern, True
+
+
+def _cached_match(cache, function, value, pattern):
+    """Like ``cached``, but backed by the process-wide ``_match_results``."""
+    key = (function, value, pattern)
+
+    if key in cache:
+        return cache[key]
+
+    rv = _match_results.get(key)
+    if rv is None:
+        rv = function(value, pattern)
+        _match_results.set(key, rv)
+
+    cache[key] = rv
+    return rv
+
+
 def _get_function_name(frame_data: dict, platform: Optional[str]):
 
     function_name = get_function_name_for_frame(frame_data, platform)
@@ -85,6 +120,20 @@ def create_match_frame(frame_data: dict, platform: Optional[str]) -> dict:
 class Match:
     description = None
 
+    #: Relative cost of evaluating the matcher, used to order the matchers of
+    #: a rule such that cheap matchers can rule out frames early.
+    cost = 5
+
+    #: Whether the matcher only depends on frame attributes that cannot be
+    #: modified by actions, see `Rule`.
+    is_static = False
+
+    @property
+    def guard_priority(self):
+        """How well the matcher can serve as a guard for its rule, lower is
+        better. ``None`` if it cannot be used as a guard (see `Rule`)."""
+        return None
+
     def matches_frame(self, frames, idx, platform, exception_data, cache):
         raise NotImplementedError()
 
@@ -198,16 +247,54 @@ def path_like_match(pattern, value):
     return False
 
 
+class GlobMatch(FrameMatch):
+    """Base class for matchers that glob-match a single value. Literal
+    patterns and literal prefixes are checked without calling into
+    ``glob_match``."""
+
+    def __init__(self, key, pattern, negated=False):
+        super().__init__(key, pattern, negated)
+        self._literal_prefix, self._is_literal = _get_literal_prefix(self._encoded_pattern)
+
+    @property
+    def cost(self):
+        if self._is_literal:
+            return 1
+        if self._literal_prefix:
+            return 2
+        return 3
+
+    @property
+    def guard_priority(self):
+        if not self.is_static or self.negated:
+            return None
+        return self.cost
+
+    def _glob_match(self, value, cache):
+        if self._is_literal:
+            return value == self._encoded_pattern
+        if not value.startswith(self._literal_prefix):
+            return False
+        return _cached_match(cache, glob_match, value, self._encoded_pattern)
+
+
 class PathLikeMatch(FrameMatch):
+    cost = 4
+    is_static = True
+
     def __init__(self, key, pattern, negated=False):
         super().__init__(key, pattern.lower(), negated)
 
+    @property
+    def guard_priority(self):
+        return None if self.negated else self.cost
+
     def _positive_frame_match(self, match_frame, platform, exception_data, cache):
         value = match_frame[self.field]
         if value is None:
             return False
 
-        return cached(cache, path_like_match, self._encoded_pattern, value)
+        return _cached_match(cache, path_like_match, self._encoded_pattern, value)
 
 
 class PackageMatch(PathLikeMatch):
@@ -221,10 +308,18 @@ class PathMatch(PathLikeMatch):
 
 
 class FamilyMatch(FrameMatch):
+    cost = 0
+    is_static = True
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._flags = set(self._encoded_pattern.split(b","))
 
+    @property
+    def guard_priority(self):
+        # Families are hardly selective, prefer any other static matcher.
+        return None if self.negated else 5
+
     def _positive_frame_match(self, match_frame, platform, exception_data, cache):
         if b"all" in self._flags:
             return True
@@ -233,6 +328,8 @@ class FamilyMatch(FrameMatch):
 
 
 class InAppMatch(FrameMatch):
+    cost = 0
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._ref_val = get_rule_bool(self.pattern)
@@ -242,24 +339,27 @@ class InAppMatch(FrameMatch):
         return ref_val is not None and ref_val == match_frame["in_app"]
 
 
-class FunctionMatch(FrameMatch):
+class FunctionMatch(GlobMatch):
+    is_static = True
+
     def _positive_frame_match(self, match_frame, platform, exception_data, cache):
 
-        return cached(cache, glob_match, match_frame["function"], self._encoded_pattern)
+        return self._glob_match(match_frame["function"], cache)
 
 
-class FrameFieldMatch(FrameMatch):
+class FrameFieldMatch(GlobMatch):
     def _positive_frame_match(self, match_frame, platform, exception_data, cache):
         field = match_frame[self.field]
         if field is None:
             return False
 
-        return cached(cache, glob_match, field, self._encoded_pattern)
+        return self._glob_match(field, cache)
 
 
 class ModuleMatch(FrameFieldMatch):
 
     field = "module"
+    is_static = True
 
 
 class CategoryMatch(FrameFieldMatch):
@@ -267,7 +367,7 @@ class CategoryMatch(FrameFieldMatch):
     field = "category"
 
 
-class ExceptionFieldMatch(FrameMatch):
+class ExceptionFieldMatch(GlobMatch):
     def matches_frame(self, frames, idx, platform, exception_data, cache):
         match_frame = None
         rv = self._positive_frame_match(match_frame, platform, exception_data, cache)
@@ -277,7 +377,9 @@ class ExceptionFieldMatch(FrameMatch):
 
     def _positive_frame_match(self, frame_data, platform, exception_data, cache):
         field = get_path(exception_data, *self.field_path) or "<unknown>"
-        return cached(cache, glob_match, field, self._encoded_pattern)
+        if isinstance(field, str):
+            field = field.encode("utf-8")
+        return self._glob_match(field, cache)
 
 
 class ExceptionTypeMatch(ExceptionFieldMatch):
@@ -296,6 +398,8 @@ class ExceptionMechanismMatch(ExceptionFieldMatch):
 
 
 class CallerMatch(Match):
+    cost = 6
+
     def __init__(self, caller: FrameMatch):
         self.caller = caller
 
@@ -313,6 +417,8 @@ class CallerMatch(Match):
 
 
 class CalleeMatch(Match):
+    cost = 6
+
     def __init__(self, caller: FrameMatch):
         self.caller = caller
 
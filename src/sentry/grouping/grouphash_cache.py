@@ -0,0 +1,146 @@
+"""
+In-process cache for resolving hashes to ``GroupHash`` rows during event
+saving.
+
+Almost all events are sorted into an existing group, so the grouphash rows
+they resolve to are read far more often than they change. This module keeps
+``(id, group_id, state, group_tombstone_id)`` per ``(project_id, hash)`` in a
+bounded LRU cache local to each process.
+
+Processes cannot evict entries from each other's caches. Instead, every entry
+is tagged with a per-project generation stored in the shared default cache.
+Everything that moves grouphashes between groups (merge, unmerge, split,
+tombstones and group deletion) calls ``invalidate_grouphash_cache``, which
+rotates the generation of the project. Readers fetch the generations once per
+lookup and ignore entries written under an older generation.
+
+Only rows that are attached to a group or tombstone, or that have been split,
+are cached. Unassigned rows are picked up by group creation, which always
+reads them from the database under a row lock.
+"""
+
+from __future__ import annotations
+
+import uuid
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+from django.core.cache import cache
+
+from sentry import options
+from sentry.models.grouphash import GroupHash
+from sentry.utils import metrics
+from sentry.utils.datastructures import LRUCache
+
+__all__ = ("get_grouphashes_many", "invalidate_grouphash_cache")
+
+# Invalidation happens through generations, the TTL only limits the damage
+# should a code path that moves grouphashes miss to invalidate.
+GROUPHASH_CACHE_SIZE = 100_000
+GROUPHASH_CACHE_TTL = 60 * 60
+GENERATION_CACHE_TTL = 24 * 60 * 60
+
+CacheEntry = Tuple[str, int, Optional[int], Optional[int], Optional[int]]
+
+_local_cache = LRUCache(GROUPHASH_CACHE_SIZE, ttl=GROUPHASH_CACHE_TTL)
+
+
+def _get_generation_cache_key(project_id: int) -> str:
+    return f"grouphash-cache-gen:{project_id}"
+
+
+def _get_generations(project_ids: Iterable[int]) -> Mapping[int, str]:
+    keys = {_get_generation_cache_key(project_id): project_id for project_id in project_ids}
+    generations = {keys[key]: value for key, value in cache.get_many(list(keys)).items()}
+
+    for key, project_id in keys.items():
+        if project_id not in generations:
+            cache.add(key, uuid.uuid4().hex, GENERATION_CACHE_TTL)
+            # Another process may have won the race, always use the stored value.
+            generations[project_id] = cache.get(key)
+
+    return generations
+
+
+def _is_cacheable(grouphash: GroupHash) -> bool:
+    return (
+        grouphash.group_id is not None
+        or grouphash.group_tombstone_id is not None
+        or grouphash.state == GroupHash.State.SPLIT
+    )
+
+
+def _to_grouphash(project_id: int, hash: str, entry: CacheEntry) -> GroupHash:
+    _generation, id, group_id, state, group_tombstone_id = entry
+    return GroupHash(
+        id=id,
+        project_id=project_id,
+        hash=hash,
+        group_id=group_id,
+        state=state,
+        group_tombstone_id=group_tombstone_id,
+    )
+
+
+def get_grouphashes_many(
+    hashes_by_project: Mapping[int, Iterable[str]]
+) -> Mapping[int, Dict[str, GroupHash]]:
+    """
+    Resolve hashes to their existing ``GroupHash`` rows, grouped by project.
+    Hashes without a row are missing from the result.
+
+    Hashes that are not in the cache are fetched with one query per project.
+    Returned instances may come from the cache and must not be saved, use
+    queryset updates by ``id`` instead.
+    """
+    use_cache = options.get("store.use-grouphash-cache")
+    generations = _get_generations(hashes_by_project) if use_cache else {}
+
+    rv = {}
+    for project_id, hashes in hashes_by_project.items():
+        hashes = set(hashes)
+        grouphashes = rv[project_id] = {}
+
+        # Without a generation (e.g. the shared cache is unavailable) we cannot
+        # tell whether entries are stale, and neither read nor write them.
+        generation = generations.get(project_id)
+
+        if generation is not None:
+            cached = _local_cache.get_many([(project_id, hash) for hash in hashes])
+            for (_, hash), entry in cached.items():
+                if entry[0] == generation:
+                    grouphashes[hash] = _to_grouphash(project_id, hash, entry)
+
+            metrics.incr("grouphash_cache.hit", amount=len(grouphashes), skip_internal=True)
+            metrics.incr(
+                "grouphash_cache.miss", amount=len(hashes) - len(grouphashes), skip_internal=True
+            )
+
+        missing_hashes = hashes - grouphashes.keys()
+        if not missing_hashes:
+            continue
+
+        to_cache = {}
+        for grouphash in GroupHash.objects.filter(project_id=project_id, hash__in=missing_hashes):
+            grouphashes[grouphash.hash] = grouphash
+            if generation is not None and _is_cacheable(grouphash):
+                to_cache[(project_id, grouphash.hash)] = (
+                    generation,
+                    grouphash.id,
+                    grouphash.group_id,
+                    grouphash.state,
+                    grouphash.group_tombstone_id,
+                )
+
+        if to_cache:
+            _local_cache.set_many(to_cache)
+
+    return rv
+
+
+def invalidate_grouphash_cache(project_id: int) -> None:
+    """
+    Invalidate all cached grouphashes of a project in all processes. Must be
+    called after grouphashes have been moved to a different group, tombstoned,
+    split or deleted.
+    """
+    cache.set(_get_generation_cache_key(project_id), uuid.uuid4().hex, GENERATION_CACHE_TTL)
@@ -8,7 +8,7 @@ from django.conf import settings
 from django.db import transaction
 from snuba_sdk import Column, Condition, Limit, Op
 
-from sentry import features
+from sentry import features, options
 from sentry.constants import CRASH_RATE_ALERT_AGGREGATE_ALIAS, CRASH_RATE_ALERT_SESSION_COUNT_ALIAS
 from sentry.incidents.logic import (
     CRITICAL_TRIGGER_LABEL,
@@ -48,6 +48,7 @@ ALERT_RULE_BASE_STAT_KEY = "%s:%s"
 ALERT_RULE_STAT_KEYS = ("last_update",)
 ALERT_RULE_BASE_TRIGGER_STAT_KEY = "%s:trigger:%s:%s"
 ALERT_RULE_TRIGGER_STAT_KEYS = ("alert_triggered", "resolve_triggered")
+ALERT_RULE_COMPARISON_VALUES_KEY = "comparison_values:%s"
 # Stores a minimum threshold that represents a session count under which we don't evaluate crash
 # rate alert, and the update is just dropped. If it is set to None, then no minimum threshold
 # check is applied
@@ -167,7 +168,39 @@ class SubscriptionProcessor:
 
     def get_comparison_aggregation_value(self, subscription_update, aggregation_value):
         # For comparison alerts run a query over the comparison period and use it to calculate the
-        # % change.
+        # % change. If the update from the start of the comparison period has been processed, its
+        # value is used instead.
+        comparison_aggregate = None
+        if options.get("incidents.store-comparison-values"):
+            try:
+                comparison_aggregate = get_and_store_comparison_value(
+                    self.alert_rule,
+                    self.subscription,
+                    subscription_update["timestamp"],
+                    aggregation_value,
+                )
+            except Exception:
+                # Fall back to querying the comparison value
+                logger.exception("Failed to get stored comparison value")
+                result = "error"
+            else:
+                result = "miss" if comparison_aggregate is None else "hit"
+            metrics.incr("incidents.alert_rules.comparison_value", tags={"result": result})
+
+        if comparison_aggregate is None:
+            try:
+                comparison_aggregate = self.query_comparison_aggregate(subscription_update)
+            except Exception:
+                logger.exception("Failed to run comparison query")
+                return
+
+        if not comparison_aggregate:
+            metrics.incr("incidents.alert_rules.skipping_update_comparison_value_invalid")
+            return
+
+        return (aggregation_value / comparison_aggregate) * 100
+
+    def query_comparison_aggregate(self, subscription_update):
         delta = timedelta(seconds=self.alert_rule.comparison_delta)
         end = subscription_update["timestamp"] - delta
         snuba_query = self.subscription.snuba_query
@@ -177,40 +210,29 @@ class SubscriptionProcessor:
             snuba_query,
             self.subscription.project.organization_id,
         )
-        try:
-            project_ids = [self.subscription.project_id]
-            query_builder = build_query_builder(
-                entity_subscription,
-                snuba_query.query,
-                project_ids,
-                snuba_query.environment,
-                params={
-                    "organization_id": self.subscription.project.organization.id,
-                    "project_id": project_ids,
-                    "start": start,
-                    "end": end,
-                },
-            )
-            time_col = ENTITY_TIME_COLUMNS[get_entity_key_from_query_builder(query_builder)]
-            query_builder.add_conditions(
-                [
-                    Condition(Column(time_col), Op.GTE, start),
-                    Condition(Column(time_col), Op.LT, end),
-                ]
-            )
-            query_builder.limit = Limit(1)
-            results = query_builder.run_query(referrer="subscription_processor.comparison_query")
-            comparison_aggregate = list(results["data"][0].values())[0]
-
-        except Exception:
-            logger.exception("Failed to run comparison query")
-            return
-
-        if not comparison_aggregate:
-            metrics.incr("incidents.alert_rules.skipping_update_comparison_value_invalid")
-            return
-
-        return (aggregation_value / comparison_aggregate) * 100
+        project_ids = [self.subscription.project_id]
+        query_builder = build_query_builder(
+            entity_subscription,
+            snuba_query.query,
+            project_ids,
+            snuba_query.environment,
+            params={
+                "organization_id": self.subscription.project.organization.id,
+                "project_id": project_ids,
+                "start": start,
+                "end": end,
+            },
+        )
+        time_col = ENTITY_TIME_COLUMNS[get_entity_key_from_query_builder(query_builder)]
+        query_builder.add_conditions(
+            [
+                Condition(Column(time_col), Op.GTE, start),
+                Condition(Column(time_col), Op.LT, end),
+            ]
+        )
+        query_builder.limit = Limit(1)
+        results = query_builder.run_query(referrer="subscription_processor.comparison_query")
+        return list(results["data"][0].values())[0]
 
     def get_crash_rate_alert_aggregation_value(self, subscription_update):
         """
@@ -758,6 +780,52 @@ def update_alert_rule_stats(alert_rule, subscription, last_update, alert_counts,
     pipeline.execute()
 
 
+def build_comparison_values_key(alert_rule, subscription):
+    key_base = ALERT_RULE_BASE_KEY % (alert_rule.id, subscription.project_id)
+    # Updating the query of a subscription recreates it in Snuba, so values of the previous query
+    # are not used for comparisons.
+    return ALERT_RULE_BASE_STAT_KEY % (
+        key_base,
+        ALERT_RULE_COMPARISON_VALUES_KEY % subscription.subscription_id,
+    )
+
+
+def get_and_store_comparison_value(alert_rule, subscription, timestamp, aggregation_value):
+    """
+    Stores the aggregation value of a subscription update, and returns the value of the update
+    from `comparison_delta` seconds before it.
+
+    Values are stored in a ring with one slot per `resolution` seconds, in a hash per
+    subscription. Each slot holds the timestamp of its update, so that slots of updates that
+    were missed or are outdated are not used.
+    :return: The aggregation value of the earlier update, or None if it has not been stored.
+    """
+    resolution = subscription.snuba_query.resolution
+    comparison_delta = alert_rule.comparison_delta
+    # Leave room so that the current value never overwrites the value it is compared to.
+    slots = comparison_delta // resolution + 2
+
+    ts = int(to_timestamp(timestamp))
+    comparison_ts = ts - comparison_delta
+
+    key = build_comparison_values_key(alert_rule, subscription)
+    pipeline = get_redis_client().pipeline()
+    pipeline.hget(key, (comparison_ts // resolution) % slots)
+    pipeline.hset(key, (ts // resolution) % slots, f"{ts}:{aggregation_value}")
+    pipeline.expire(key, comparison_delta + REDIS_TTL)
+    result = pipeline.execute()[0]
+
+    if result is None:
+        return None
+    if isinstance(result, bytes):
+        result = result.decode("utf-8")
+
+    stored_ts, value = result.split(":", 1)
+    if int(stored_ts) != comparison_ts:
+        return None
+    return float(value)
+
+
 def get_redis_client():
     cluster_key = getattr(settings, "SENTRY_INCIDENT_RULES_REDIS_CLUSTER", "default")
     return redis.redis_clusters.get(cluster_key)
@@ -22,7 +22,7 @@ import sentry_sdk
 from django.conf import settings
 from django.core.cache import cache
 
-from sentry import eventstore, features
+from sentry import eventstore, features, options
 from sentry.attachments import CachedAttachment, attachment_cache
 from sentry.event_manager import save_attachment
 from sentry.eventstore.processing import event_processing_store
@@ -31,7 +31,7 @@ from sentry.ingest.userreport import Conflict, save_userreport
 from sentry.killswitches import killswitch_matches_context
 from sentry.models import Project
 from sentry.signals import event_accepted
-from sentry.tasks.store import preprocess_event, save_event_transaction
+from sentry.tasks.store import preprocess_event, save_event_transaction, save_event_transactions
 from sentry.utils import json, metrics
 from sentry.utils.batching_kafka_consumer import AbstractBatchWorker
 from sentry.utils.cache import cache_key_for_event
@@ -94,6 +94,8 @@ class IngestConsumerWorker(AbstractBatchWorker):
             ]
         ] = []
 
+        event_messages = []
+        batch_events = options.get("ingest-consumer.batch-events")
         projects_to_fetch = set()
 
         with metrics.timer("ingest_consumer.prepare_messages"):
@@ -101,7 +103,9 @@ class IngestConsumerWorker(AbstractBatchWorker):
                 message_type = message["type"]
                 projects_to_fetch.add(message["project_id"])
 
-                if message_type == "event":
+                if message_type == "event" and batch_events:
+                    event_messages.append(message)
+                elif message_type == "event":
                     other_messages.append((self.__process_event, message))
                 elif message_type == "attachment_chunk":
                     attachment_chunks.append(message)
@@ -124,6 +128,10 @@ class IngestConsumerWorker(AbstractBatchWorker):
                 for attachment_chunk in attachment_chunks:
                     process_attachment_chunk(attachment_chunk, projects=projects)
 
+        if event_messages:
+            with metrics.timer("ingest_consumer.process_event_batch"):
+                process_event_batch(event_messages, projects)
+
         if other_messages:
             with metrics.timer("ingest_consumer.process_other_messages_batch"):
                 other_messages_flush_start = time.monotonic()
@@ -178,15 +186,53 @@ def _do_process_event(message: Message, projects: Mapping[int, Project]) -> None
     callback(_store_event(data))
 
 
+def _get_deduplication_key(project_id: int, event_id: str) -> str:
+    return f"ev:{project_id}:{event_id}"
+
+
+def _log_duplicate_event(project_id: int, event_id: str) -> None:
+    logger.warning(
+        "pre-process-forwarder detected a duplicated event" " with id:%s for project:%s.",
+        event_id,
+        project_id,
+    )
+
+
+class _EventBatch:
+    """
+    Collects the transactions to save, the deduplication markers to set and the
+    signals to send for a batch of events, so that they can be dispatched with
+    one task and written with one round trip.
+    """
+
+    def __init__(self) -> None:
+        self.transactions: MutableSequence[Mapping[str, Any]] = []
+        self.deduplication_keys: MutableSequence[str] = []
+        self.accepted: MutableSequence[Mapping[str, Any]] = []
+
+    def flush(self) -> None:
+        max_size = options.get("ingest-consumer.transaction-batch-size")
+        for i in range(0, len(self.transactions), max_size):
+            save_event_transactions.delay(events=self.transactions[i : i + max_size])
+
+        if self.deduplication_keys:
+            cache.set_many(dict.fromkeys(self.deduplication_keys, ""), CACHE_TIMEOUT)
+
+        for kwargs in self.accepted:
+            event_accepted.send_robust(sender=process_event, **kwargs)
+
+
 def _load_event(
-    message: Message, projects: Mapping[int, Project]
-) -> Optional[Tuple[Any, Callable[[str], None]]]:
+    message: Message, projects: Mapping[int, Project], deduplicate: bool = True
+) -> Optional[Tuple[Any, Callable[..., None]]]:
     """
     Perform some initial filtering and deserialize the message payload. If the
     event should be stored, the deserialized payload is returned along with a
     function that can be called with the event's storage key to resume
     processing after the event has been persisted and is available to be read by
-    other processing components.
+    other processing components. If an ``_EventBatch`` is passed along with the
+    key, transactions and deduplication markers are added to it instead of
+    being dispatched and written right away.
     """
     payload = message["payload"]
     start_time = float(message["start_time"])
@@ -215,13 +261,9 @@ def _load_event(
     # This code has been ripped from the old python store endpoint. We're
     # keeping it around because it does provide some protection against
     # reprocessing good events if a single consumer is in a restart loop.
-    deduplication_key = f"ev:{project_id}:{event_id}"
-    if cache.get(deduplication_key) is not None:
-        logger.warning(
-            "pre-process-forwarder detected a duplicated event" " with id:%s for project:%s.",
-            event_id,
-            project_id,
-        )
+    deduplication_key = _get_deduplication_key(project_id, event_id)
+    if deduplicate and cache.get(deduplication_key) is not None:
+        _log_duplicate_event(project_id, event_id)
         return  # message already processed do not reprocess
 
     if killswitch_matches_context(
@@ -267,7 +309,7 @@ def _load_event(
     ):
         return
 
-    def dispatch_task(cache_key: str) -> None:
+    def dispatch_task(cache_key: str, batch: Optional[_EventBatch] = None) -> None:
         if attachments:
             with sentry_sdk.start_span(op="ingest_consumer.set_attachment_cache"):
                 attachment_objects = [
@@ -279,7 +321,17 @@ def _load_event(
                     cache_key, attachments=attachment_objects, timeout=CACHE_TIMEOUT
                 )
 
-        if data.get("type") == "transaction":
+        if data.get("type") == "transaction" and batch is not None:
+            batch.transactions.append(
+                dict(
+                    cache_key=cache_key,
+                    data=None,
+                    start_time=start_time,
+                    event_id=event_id,
+                    project_id=project_id,
+                )
+            )
+        elif data.get("type") == "transaction":
             # No need for preprocess/process for transactions thus submit
             # directly transaction specific save_event task.
             save_event_transaction.delay(
@@ -303,6 +355,11 @@ def _load_event(
                     has_attachments=bool(attachments),
                 )
 
+        if batch is not None:
+            batch.deduplication_keys.append(deduplication_key)
+            batch.accepted.append({"ip": remote_addr, "data": data, "project": project})
+            return
+
         # remember for an 1 hour that we saved this event (deduplication protection)
         cache.set(deduplication_key, "", CACHE_TIMEOUT)
 
@@ -322,6 +379,42 @@ def process_event(message: Message, projects: Mapping[int, Project]) -> None:
     return _do_process_event(message, projects)
 
 
+@trace_func(name="ingest_consumer.process_event_batch")
+def process_event_batch(messages: Sequence[Message], projects: Mapping[int, Project]) -> None:
+    """
+    Processes the event messages of a batch together: duplicates are detected
+    with one cache lookup, the events are written to the processing store at
+    once, and transactions are saved by one task per batch.
+    """
+    deduplication_keys = [
+        _get_deduplication_key(int(message["project_id"]), message["event_id"])
+        for message in messages
+    ]
+    seen = set(cache.get_many(deduplication_keys))
+
+    loaded = []
+    for message, deduplication_key in zip(messages, deduplication_keys):
+        if deduplication_key in seen:
+            _log_duplicate_event(int(message["project_id"]), message["event_id"])
+            continue
+        seen.add(deduplication_key)
+
+        result = _load_event(message, projects, deduplicate=False)
+        if result is not None:
+            loaded.append(result)
+
+    if not loaded:
+        return
+
+    with metrics.timer("ingest_consumer._store_events"):
+        cache_keys = event_processing_store.store_many([data for data, _ in loaded])
+
+    batch = _EventBatch()
+    for (_, callback), cache_key in zip(loaded, cache_keys):
+        callback(cache_key, batch)
+    batch.flush()
+
+
 def process_event_async(
     executor: ThreadPoolExecutor, message: Message, projects: Mapping[int, Project]
 ) -> Optional["AsyncResult[str]"]:
@@ -1,8 +1,13 @@
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
 from symbolic import SourceView
 
+from sentry.utils import metrics
 from sentry.utils.strings import codec_lookup
 
-__all__ = ["SourceCache", "SourceMapCache"]
+__all__ = ["SourceCache", "SourceMapCache", "ParsedArtifactCache", "get_parsed_artifact_cache"]
 
 
 def is_utf8(codec):
@@ -10,6 +15,20 @@ def is_utf8(codec):
     return name in ("utf-8", "ascii")
 
 
+def make_source_view(source, encoding=None):
+    if isinstance(source, str):
+        source = source.encode("utf-8")
+    # If an encoding is provided and it's not utf-8 compatible
+    # we try to re-encoding the source and create a source view
+    # from it.
+    elif encoding is not None and not is_utf8(encoding):
+        try:
+            source = source.decode(encoding).encode("utf-8")
+        except UnicodeError:
+            pass
+    return SourceView.from_bytes(source)
+
+
 class SourceCache:
     def __init__(self):
         self._cache = {}
@@ -40,17 +59,7 @@ class SourceCache:
         url = self._get_canonical_url(url)
 
         if not isinstance(source, SourceView):
-            if isinstance(source, str):
-                source = source.encode("utf-8")
-            # If an encoding is provided and it's not utf-8 compatible
-            # we try to re-encoding the source and create a source view
-            # from it.
-            elif encoding is not None and not is_utf8(encoding):
-                try:
-                    source = source.decode(encoding).encode("utf-8")
-                except UnicodeError:
-                    pass
-            source = SourceView.from_bytes(source)
+            source = make_source_view(source, encoding)
         self._cache[url] = source
 
     def add_error(self, url, error):
@@ -90,3 +99,71 @@ class SourceMapCache:
             sourcemap = self.get(sourcemap_url)
             return (sourcemap_url, sourcemap)
         return (None, None)
+
+
+class ParsedArtifactCache:
+    """
+    A process-wide cache of parsed source and sourcemap views, which are
+    shared between all events that a worker processes.
+
+    Entries are keyed by the checksum of the artifacts they were parsed from,
+    and the least recently used entries are evicted once the total size of
+    those artifacts exceeds ``max_size`` bytes.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.size = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._cache)
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value, _ = self._cache[key]
+            except KeyError:
+                return None
+            self._cache.move_to_end(key)
+            return value
+
+    def set(self, key, value, size):
+        # Artifacts that would evict everything else are not worth caching.
+        if size > self.max_size:
+            return
+
+        with self._lock:
+            old = self._cache.pop(key, None)
+            if old is not None:
+                self.size -= old[1]
+
+            self._cache[key] = (value, size)
+            self.size += size
+            while self.size > self.max_size:
+                _, (_, evicted_size) = self._cache.popitem(last=False)
+                self.size -= evicted_size
+
+        metrics.gauge("sourcemaps.parsed_cache.size", self.size)
+
+
+_parsed_artifact_cache = None
+_parsed_artifact_cache_lock = threading.Lock()
+
+
+def get_parsed_artifact_cache():
+    """
+    Returns the parsed artifact cache sized with
+    ``SENTRY_JS_PARSED_ARTIFACT_CACHE_SIZE``, or ``None`` if it is disabled.
+    """
+    global _parsed_artifact_cache
+
+    max_size = settings.SENTRY_JS_PARSED_ARTIFACT_CACHE_SIZE
+    if not max_size:
+        return None
+
+    with _parsed_artifact_cache_lock:
+        if _parsed_artifact_cache is None or _parsed_artifact_cache.max_size != max_size:
+            _parsed_artifact_cache = ParsedArtifactCache(max_size)
+        return _parsed_artifact_cache
@@ -1,10 +1,12 @@
 import base64
 import errno
+import hashlib
 import logging
 import re
 import sys
 import time
 import zlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from io import BytesIO
 from os.path import splitext
@@ -16,6 +18,7 @@ from django.conf import settings
 from django.utils import timezone
 from django.utils.encoding import force_bytes, force_text
 from requests.utils import get_encoding_from_headers
+from sentry_sdk import Hub
 from symbolic import SourceMapCache as SmCache
 from symbolic import SourceMapView
 
@@ -30,6 +33,7 @@ from sentry.utils import json, metrics
 # holding the results of attempting to fetch both kinds of files, either from the
 # database or from the internet
 from sentry.utils.cache import cache
+from sentry.utils.concurrent import run_in_worker_thread
 from sentry.utils.files import compress_file
 from sentry.utils.hashlib import md5_text
 from sentry.utils.http import is_valid_origin
@@ -37,7 +41,7 @@ from sentry.utils.retries import ConditionalRetryPolicy, exponential_delay
 from sentry.utils.safe import get_path, set_path
 from sentry.utils.urls import non_standard_url_join
 
-from .cache import SourceCache, SourceMapCache
+from .cache import SourceCache, SourceMapCache, get_parsed_artifact_cache, make_source_view
 
 __all__ = ["JavaScriptStacktraceProcessor"]
 
@@ -781,6 +785,37 @@ def get_max_age(headers):
     return min(max_age, CACHE_CONTROL_MAX)
 
 
+def get_parsed_artifact(kind, parse, url, release, dist, *bodies):
+    """
+    Returns ``parse()``, the parsed view of one or more artifact ``bodies``,
+    from the process-wide parsed artifact cache if possible.
+    """
+    parsed_cache = get_parsed_artifact_cache()
+    if parsed_cache is None:
+        return parse()
+
+    checksum = hashlib.sha1()
+    for body in bodies:
+        checksum.update(body)
+
+    key = (
+        kind,
+        release and release.id,
+        dist and dist.id,
+        "<base64>" if is_data_uri(url) else url,
+        checksum.hexdigest(),
+    )
+    rv = parsed_cache.get(key)
+    if rv is not None:
+        metrics.incr("sourcemaps.parsed_cache", tags={"result": "hit", "kind": kind})
+        return rv
+
+    metrics.incr("sourcemaps.parsed_cache", tags={"result": "miss", "kind": kind})
+    rv = parse()
+    parsed_cache.set(key, rv, sum(len(body) for body in bodies))
+    return rv
+
+
 # TODO(smcache): Remove unnecessary `use_smcache` flag.
 def fetch_sourcemap(
     url, source=b"", project=None, release=None, dist=None, allow_scraping=True, use_smcache=True
@@ -813,12 +848,27 @@ def fetch_sourcemap(
             with sentry_sdk.start_span(
                 op="JavaScriptStacktraceProcessor.fetch_sourcemap.SmCache.from_bytes"
             ):
-                return SmCache.from_bytes(source, body)
+                return get_parsed_artifact(
+                    "smcache",
+                    lambda: SmCache.from_bytes(source, body),
+                    url,
+                    release,
+                    dist,
+                    source,
+                    body,
+                )
         else:
             with sentry_sdk.start_span(
                 op="JavaScriptStacktraceProcessor.fetch_sourcemap.SourceMapView.from_json_bytes"
             ):
-                return SourceMapView.from_json_bytes(body)
+                return get_parsed_artifact(
+                    "sourcemap",
+                    lambda: SourceMapView.from_json_bytes(body),
+                    url,
+                    release,
+                    dist,
+                    body,
+                )
 
     except Exception as exc:
         # This is in debug because the product shows an error already.
@@ -1256,86 +1306,113 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
         Look for and (if found) cache a source file and its associated source
         map (if any).
         """
+        if not self._count_fetch(filename):
+            return
 
-        sourcemaps = self.sourcemaps
-        cache = self.cache
+        try:
+            result = self._fetch_source(filename)
+        except http.BadSource as exc:
+            self._add_source_error(filename, exc)
+            return
 
+        sourcemap_url = self._add_source(filename, result)
+        if not sourcemap_url or sourcemap_url in self.sourcemaps:
+            return
+
+        try:
+            sourcemap_view = self._fetch_sourcemap(sourcemap_url, result)
+        except http.BadSource as exc:
+            # we don't perform the same check here as for sources, because if someone has
+            # uploaded a node_modules file, which has a sourceMappingURL, they
+            # presumably would like it mapped (and would like to know why it's not
+            # working, if that's the case). If they're not looking for it to be
+            # mapped, then they shouldn't be uploading the source file in the
+            # first place.
+            self.cache.add_error(filename, exc.data)
+            return
+
+        self._add_sourcemap(sourcemap_url, sourcemap_view)
+
+    def _count_fetch(self, filename):
         self.fetch_count += 1
 
         if self.fetch_count > self.max_fetches:
-            cache.add_error(filename, {"type": EventError.JS_TOO_MANY_REMOTE_SOURCES})
-            return
+            self.cache.add_error(filename, {"type": EventError.JS_TOO_MANY_REMOTE_SOURCES})
+            return False
+        return True
 
+    def _fetch_source(self, filename):
         # TODO: respect cache-control/max-age headers to some extent
         logger.debug("Attempting to cache source %r", filename)
-        try:
-            # this both looks in the database and tries to scrape the internet
-            with sentry_sdk.start_span(
-                op="JavaScriptStacktraceProcessor.cache_source.fetch_file"
-            ) as span:
-                span.set_data("filename", filename)
-                result = fetch_file(
-                    filename,
-                    project=self.project,
-                    release=self.release,
-                    dist=self.dist,
-                    allow_scraping=self.allow_scraping,
-                )
-        except http.BadSource as exc:
-            # most people don't upload release artifacts for their third-party libraries,
-            # so ignore missing node_modules files
-            if exc.data["type"] == EventError.JS_MISSING_SOURCE and "node_modules" in filename:
-                pass
-            else:
-                cache.add_error(filename, exc.data)
+        # this both looks in the database and tries to scrape the internet
+        with sentry_sdk.start_span(
+            op="JavaScriptStacktraceProcessor.cache_source.fetch_file"
+        ) as span:
+            span.set_data("filename", filename)
+            return fetch_file(
+                filename,
+                project=self.project,
+                release=self.release,
+                dist=self.dist,
+                allow_scraping=self.allow_scraping,
+            )
 
-            # either way, there's no more for us to do here, since we don't have
-            # a valid file to cache
-            return
-        cache.add(filename, result.body, result.encoding)
-        cache.alias(result.url, filename)
+    def _add_source_error(self, filename, exc):
+        # most people don't upload release artifacts for their third-party libraries,
+        # so ignore missing node_modules files
+        if exc.data["type"] == EventError.JS_MISSING_SOURCE and "node_modules" in filename:
+            pass
+        else:
+            self.cache.add_error(filename, exc.data)
+
+    def _add_source(self, filename, result):
+        """
+        Caches a fetched source file and links it to its source map. Returns
+        the url of the source map, if any.
+        """
+        source_view = get_parsed_artifact(
+            f"source:{result.encoding}",
+            lambda: make_source_view(result.body, result.encoding),
+            filename,
+            self.release,
+            self.dist,
+            result.body,
+        )
+        self.cache.add(filename, source_view)
+        self.cache.alias(result.url, filename)
 
         sourcemap_url = discover_sourcemap(result)
         if not sourcemap_url:
-            return
+            return None
 
         logger.debug(
             "Found sourcemap URL %r for minified script %r", sourcemap_url[:256], result.url
         )
-        sourcemaps.link(filename, sourcemap_url)
-        if sourcemap_url in sourcemaps:
-            return
+        self.sourcemaps.link(filename, sourcemap_url)
+        return sourcemap_url
 
+    def _fetch_sourcemap(self, sourcemap_url, result):
         # pull down sourcemap
-        try:
-            with sentry_sdk.start_span(
-                op="JavaScriptStacktraceProcessor.cache_source.fetch_sourcemap"
-            ) as span:
-                span.set_data("sourcemap_url", sourcemap_url)
-                sourcemap_view = fetch_sourcemap(
-                    sourcemap_url,
-                    source=result.body,
-                    project=self.project,
-                    release=self.release,
-                    dist=self.dist,
-                    allow_scraping=self.allow_scraping,
-                    # TODO(smcache): Remove unnecessary `use_smcache` flag.
-                    use_smcache=isinstance(self, JavaScriptSmCacheStacktraceProcessor),
-                )
-        except http.BadSource as exc:
-            # we don't perform the same check here as above, because if someone has
-            # uploaded a node_modules file, which has a sourceMappingURL, they
-            # presumably would like it mapped (and would like to know why it's not
-            # working, if that's the case). If they're not looking for it to be
-            # mapped, then they shouldn't be uploading the source file in the
-            # first place.
-            cache.add_error(filename, exc.data)
-            return
+        with sentry_sdk.start_span(
+            op="JavaScriptStacktraceProcessor.cache_source.fetch_sourcemap"
+        ) as span:
+            span.set_data("sourcemap_url", sourcemap_url)
+            return fetch_sourcemap(
+                sourcemap_url,
+                source=result.body,
+                project=self.project,
+                release=self.release,
+                dist=self.dist,
+                allow_scraping=self.allow_scraping,
+                # TODO(smcache): Remove unnecessary `use_smcache` flag.
+                use_smcache=isinstance(self, JavaScriptSmCacheStacktraceProcessor),
+            )
 
+    def _add_sourcemap(self, sourcemap_url, sourcemap_view):
         with sentry_sdk.start_span(
             op="JavaScriptStacktraceProcessor.cache_source.cache_sourcemap_view"
         ) as span:
-            sourcemaps.add(sourcemap_url, sourcemap_view)
+            self.sourcemaps.add(sourcemap_url, sourcemap_view)
 
             # TODO(smcache): Remove this whole iteration block
             if not isinstance(self, JavaScriptSmCacheStacktraceProcessor):
@@ -1369,6 +1446,11 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
                 continue
             pending_file_list.add(f["abs_path"])
 
+        max_workers = options.get("sourcemaps.fetch-concurrency")
+        if max_workers > 1 and len(pending_file_list) > 1:
+            self._populate_source_cache_concurrently(pending_file_list, max_workers)
+            return
+
         for idx, filename in enumerate(pending_file_list):
             with sentry_sdk.start_span(
                 op="JavaScriptStacktraceProcessor.populate_source_cache.cache_source"
@@ -1376,6 +1458,68 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
                 span.set_data("filename", filename)
                 self.cache_source(filename=filename)
 
+    def _populate_source_cache_concurrently(self, pending_file_list, max_workers):
+        """
+        Like calling ``cache_source`` for every file, but fetches all sources
+        and then all of their (distinct) source maps concurrently. The caches
+        are only updated from the calling thread.
+        """
+        filenames = [filename for filename in pending_file_list if self._count_fetch(filename)]
+        if not filenames:
+            return
+
+        hub = Hub(Hub.current)
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(filenames))) as pool:
+            with sentry_sdk.start_span(
+                op="JavaScriptStacktraceProcessor.populate_source_cache.fetch_sources"
+            ):
+                futures = [
+                    (
+                        filename,
+                        pool.submit(run_in_worker_thread, hub, self._fetch_source, filename),
+                    )
+                    for filename in filenames
+                ]
+
+                sourcemap_urls = {}
+                for filename, future in futures:
+                    try:
+                        result = future.result()
+                    except http.BadSource as exc:
+                        self._add_source_error(filename, exc)
+                        continue
+
+                    sourcemap_url = self._add_source(filename, result)
+                    if sourcemap_url and sourcemap_url not in self.sourcemaps:
+                        sourcemap_urls.setdefault(sourcemap_url, []).append((filename, result))
+
+            with sentry_sdk.start_span(
+                op="JavaScriptStacktraceProcessor.populate_source_cache.fetch_sourcemaps"
+            ):
+                futures = [
+                    (
+                        sourcemap_url,
+                        pool.submit(
+                            run_in_worker_thread,
+                            hub,
+                            self._fetch_sourcemap,
+                            sourcemap_url,
+                            sources[0][1],
+                        ),
+                    )
+                    for sourcemap_url, sources in sourcemap_urls.items()
+                ]
+
+                for sourcemap_url, future in futures:
+                    try:
+                        sourcemap_view = future.result()
+                    except http.BadSource as exc:
+                        for filename, _ in sourcemap_urls[sourcemap_url]:
+                            self.cache.add_error(filename, exc.data)
+                        continue
+
+                    self._add_sourcemap(sourcemap_url, sourcemap_view)
+
     def close(self):
         StacktraceProcessor.close(self)
         if self.sourcemaps_touched:
@@ -3,8 +3,10 @@ import mmap
 import os
 import tempfile
 import time
+from bisect import bisect_right
 from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
+from functools import partial
 from hashlib import sha1
 from threading import Semaphore
 from uuid import uuid4
@@ -24,6 +26,7 @@ from sentry.db.models import (
     Model,
     region_silo_only_model,
 )
+from sentry.filestore.cache import get_blob_cache
 from sentry.locks import locks
 from sentry.tasks.files import delete_file as delete_file_task
 from sentry.tasks.files import delete_unreferenced_blobs
@@ -341,12 +344,15 @@ class File(Model):
         db_table = "sentry_file"
 
     def _get_chunked_blob(self, mode=None, prefetch=False, prefetch_to=None, delete=True):
+        from sentry import options
+
         return ChunkedFileBlobIndexWrapper(
             FileBlobIndex.objects.filter(file=self).select_related("blob").order_by("offset"),
             mode=mode,
             prefetch=prefetch,
             prefetch_to=prefetch_to,
             delete=delete,
+            read_ahead=options.get("filestore.read-ahead-blobs"),
         )
 
     def getfile(self, mode=None, prefetch=False):
@@ -493,12 +499,35 @@ class FileBlobIndex(Model):
         unique_together = (("file", "blob", "offset"),)
 
 
+# Downloads blobs ahead for all files that are being read.
+_read_ahead_pool = ThreadPoolExecutor(max_workers=16)
+
+
+def _open_blob(blob):
+    blob_cache = get_blob_cache()
+    if blob_cache is None or not blob.checksum:
+        return blob.getfile()
+    return blob_cache.open(blob)
+
+
+def _read_blob(blob):
+    with _open_blob(blob) as f:
+        return f.read()
+
+
 class ChunkedFileBlobIndexWrapper:
-    def __init__(self, indexes, mode=None, prefetch=False, prefetch_to=None, delete=True):
+    def __init__(
+        self, indexes, mode=None, prefetch=False, prefetch_to=None, delete=True, read_ahead=0
+    ):
         # eager load from database incase its a queryset
         self._indexes = list(indexes)
+        self._offsets = [idx.offset for idx in self._indexes]
         self._curfile = None
         self._curidx = None
+        self._curpos = None
+        # Blobs that are downloaded ahead, by their position in the indexes
+        self._read_ahead = read_ahead
+        self._pending = {}
         if prefetch:
             self.prefetched = True
             self._prefetch(prefetch_to, delete)
@@ -524,18 +553,41 @@ class ChunkedFileBlobIndexWrapper:
 
     def _nextidx(self):
         assert not self.prefetched, "this makes no sense"
+        self._loadidx(self._curpos + 1)
+
+    def _loadidx(self, pos):
         old_file = self._curfile
         try:
-            try:
-                self._curidx = next(self._idxiter)
-                self._curfile = self._curidx.blob.getfile()
-            except StopIteration:
+            if pos < len(self._indexes):
+                self._curpos = pos
+                self._curidx = self._indexes[pos]
+                self._curfile = self._open_blob_at(pos)
+            else:
+                self._curpos = None
                 self._curidx = None
                 self._curfile = None
         finally:
             if old_file is not None:
                 old_file.close()
 
+    def _open_blob_at(self, pos):
+        if not self._read_ahead:
+            return _open_blob(self._indexes[pos].blob)
+
+        # Blobs that were read ahead but are not needed anymore after seeking
+        # are dropped, so that at most ``read_ahead + 1`` blobs are held.
+        last = min(pos + self._read_ahead, len(self._indexes) - 1)
+        for other in [other for other in self._pending if not pos <= other <= last]:
+            self._pending.pop(other).cancel()
+
+        for ahead in range(pos, last + 1):
+            if ahead not in self._pending:
+                self._pending[ahead] = _read_ahead_pool.submit(
+                    _read_blob, self._indexes[ahead].blob
+                )
+
+        return io.BytesIO(self._pending.pop(pos).result())
+
     @property
     def size(self):
         return sum(i.blob.size for i in self._indexes)
@@ -569,7 +621,7 @@ class ChunkedFileBlobIndexWrapper:
 
         with ThreadPoolExecutor(max_workers=4) as exe:
             for idx in self._indexes:
-                exe.submit(fetch_file, idx.offset, idx.blob.getfile)
+                exe.submit(fetch_file, idx.offset, partial(_open_blob, idx.blob))
 
         mem.flush()
         self._curfile = f
@@ -577,8 +629,12 @@ class ChunkedFileBlobIndexWrapper:
     def close(self):
         if self._curfile:
             self._curfile.close()
+        for future in self._pending.values():
+            future.cancel()
+        self._pending = {}
         self._curfile = None
         self._curidx = None
+        self._curpos = None
         self.closed = True
 
     def _seek(self, pos):
@@ -594,14 +650,11 @@ class ChunkedFileBlobIndexWrapper:
             # Empty file, there's no seeking to be done.
             return
 
-        for n, idx in enumerate(self._indexes[::-1]):
-            if idx.offset <= pos:
-                if idx != self._curidx:
-                    self._idxiter = iter(self._indexes[-(n + 1) :])
-                    self._nextidx()
-                break
-        else:
+        n = bisect_right(self._offsets, pos) - 1
+        if n < 0:
             raise ValueError("Cannot seek to pos")
+        if n != self._curpos:
+            self._loadidx(n)
         self._curfile.seek(pos - self._curidx.offset)
 
     def seek(self, pos, whence=io.SEEK_SET):
@@ -8,6 +8,7 @@ from sentry import projectoptions
 from sentry.db.models import FlexibleForeignKey, Model, region_silo_only_model, sane_repr
 from sentry.db.models.fields import PickledObjectField
 from sentry.db.models.manager import OptionManager, ValidateFunction, Value
+from sentry.signals import project_options_updated
 from sentry.tasks.relay import schedule_invalidate_project_config
 from sentry.utils.cache import cache
 
@@ -118,6 +119,34 @@ class ProjectOptionManager(OptionManager["Project"]):
         values: Mapping[str, Value] = self._option_cache.get(cache_key, {})
         return values
 
+    def populate_cache(self, projects: Sequence[Project]) -> None:
+        """
+        Loads the options of several projects into the local cache at once,
+        so that ``get_all_values`` does not query them one by one.
+        """
+        cache_keys = {
+            self._make_key(project.id): project.id
+            for project in projects
+            if self._make_key(project.id) not in self._option_cache
+        }
+        if not cache_keys:
+            return
+
+        cached = cache.get_many(cache_keys.keys())
+        missing = {}
+        for cache_key, project_id in cache_keys.items():
+            if cache_key in cached:
+                self._option_cache[cache_key] = cached[cache_key]
+            else:
+                missing[project_id] = {}
+
+        if missing:
+            for option in self.filter(project__in=missing.keys()):
+                missing[option.project_id][option.key] = option.value
+            results = {self._make_key(project_id): result for project_id, result in missing.items()}
+            cache.set_many(results)
+            self._option_cache.update(results)
+
     def reload_cache(self, project_id: int, update_reason: str) -> Mapping[str, Value]:
         if update_reason != "projectoption.get_all_values":
             # this hook may be called from model hooks during an
@@ -135,6 +164,8 @@ class ProjectOptionManager(OptionManager["Project"]):
         result = {i.key: i.value for i in self.filter(project=project_id)}
         cache.set(cache_key, result)
         self._option_cache[cache_key] = result
+        if update_reason != "projectoption.get_all_values":
+            project_options_updated.send_robust(sender=self.model, project_id=project_id)
         return result
 
     def post_save(self, instance: ProjectOption, **kwargs: Any) -> None:
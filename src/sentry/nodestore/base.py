@@ -3,6 +3,9 @@ from threading import local
 import sentry_sdk
 from django.core.cache import InvalidCacheBackendError, caches
 
+from sentry.nodestore.format import CompressionDictionary
+from sentry.nodestore.format import encode as encode_binary_node
+from sentry.nodestore.format import is_binary_node, read_section
 from sentry.utils import json
 from sentry.utils.cache import memoize
 from sentry.utils.services import Service
@@ -56,8 +59,23 @@ class NodeStorage(local, Service):
 
     This is used in reprocessing to store a snapshot of the event from multiple
     stages of the pipeline.
+
+    With ``binary_format`` enabled, nodes are written in the binary format
+    described in ``sentry.nodestore.format`` instead, which compresses every
+    subkey separately (optionally with the trained zstd dictionary at
+    ``compression_dictionary``) and allows reading a subkey without parsing the
+    others. Nodes in either format can always be read.
     """
 
+    binary_format = False
+    compression_dictionary = None
+
+    def __init__(self, binary_format=False, compression_dictionary=None):
+        self.binary_format = binary_format
+        if isinstance(compression_dictionary, str):
+            compression_dictionary = CompressionDictionary.from_file(compression_dictionary)
+        self.compression_dictionary = compression_dictionary
+
     __all__ = (
         "delete",
         "delete_multi",
@@ -65,6 +83,8 @@ class NodeStorage(local, Service):
         "get_multi",
         "set",
         "set_subkeys",
+        "set_subkeys_multi",
+        "set_subkeys_multi_deduplicated",
         "cleanup",
         "validate",
         "bootstrap",
@@ -92,6 +112,12 @@ class NodeStorage(local, Service):
         if value is None:
             return None
 
+        if is_binary_node(value):
+            payload = read_section(value, subkey, self.compression_dictionary)
+            if payload is None:
+                return None
+            return json_loads(payload)
+
         lines_iter = iter(value.splitlines())
         try:
             if subkey is not None:
@@ -131,7 +157,7 @@ class NodeStorage(local, Service):
                 if item_from_cache:
                     span.set_tag("origin", "from_cache")
                     span.set_tag("found", bool(item_from_cache))
-                    return item_from_cache
+                    return self._assemble_nodes({id: item_from_cache})[id]
 
             span.set_tag("subkey", str(subkey))
             bytes_data = self._get_bytes(id)
@@ -139,6 +165,7 @@ class NodeStorage(local, Service):
             if subkey is None:
                 # set cache item only after we know decoding did not fail
                 self._set_cache_item(id, rv)
+                rv = self._assemble_nodes({id: rv})[id]
 
             span.set_tag("result", "from_service")
             if bytes_data:
@@ -165,6 +192,12 @@ class NodeStorage(local, Service):
             "key2": {"message": "hello world"}
         }
         """
+        items = self._get_multi(id_list, subkey=subkey)
+        if subkey is None:
+            self._assemble_nodes(items)
+        return items
+
+    def _get_multi(self, id_list, subkey=None):
         with sentry_sdk.start_span(op="nodestore.get_multi") as span:
             span.set_tag("subkey", str(subkey))
             span.set_tag("num_ids", len(id_list))
@@ -192,6 +225,15 @@ class NodeStorage(local, Service):
 
             return items
 
+    def _assemble_nodes(self, items):
+        """
+        Restores the interfaces of nodes that have been written with
+        ``deduplicate_interfaces`` in place.
+        """
+        from sentry.eventstore.compressor import assemble_nodes
+
+        return assemble_nodes(items, self._get_multi)
+
     def _encode(self, data):
         """
         Encode data dict in a way where its keys can be deserialized
@@ -201,6 +243,12 @@ class NodeStorage(local, Service):
         >>> _encode({"unprocessed": {}, None: {"stacktrace": {}}})
         b'{"stacktrace": {}}\nunprocessed\n{}'
         """
+        if self.binary_format:
+            sections = {None: json_dumps(data.pop(None)).encode("utf8")}
+            for key, value in data.items():
+                sections[key] = json_dumps(value).encode("utf8")
+            return encode_binary_node(sections, self.compression_dictionary)
+
         lines = [json_dumps(data.pop(None)).encode("utf8")]
         for key, value in data.items():
             lines.append(key.encode("ascii"))
@@ -246,6 +294,42 @@ class NodeStorage(local, Service):
             # set cache only after encoding and write to nodestore has succeeded
             self._set_cache_item(id, cache_item)
 
+    def _set_bytes_multi(self, items, ttl=None):
+        """
+        >>> nodestore._set_bytes_multi({'key1': b"{'foo': 'bar'}", 'key2': b"{}"})
+        """
+        for id, data in items.items():
+            self._set_bytes(id, data, ttl=ttl)
+
+    def set_subkeys_multi(self, items, ttl=None):
+        """
+        Set values and subkeys for multiple nodes at once. Backends that
+        support batched writes do this in a single round trip.
+
+        >>> nodestore.set_subkeys_multi({
+        ...    'key1': {None: {'foo': 'bar'}},
+        ...    'key2': {None: {'foo': 'baz'}, "unprocessed": {'foo': 'bam'}},
+        ... })
+        """
+        with sentry_sdk.start_span(op="nodestore.set_subkeys_multi") as span:
+            span.set_tag("num_ids", len(items))
+            cache_items = {id: data.get(None) for id, data in items.items()}
+            bytes_items = {id: self._encode(data) for id, data in items.items()}
+            self._set_bytes_multi(bytes_items, ttl=ttl)
+            # set cache only after encoding and write to nodestore has succeeded
+            self._set_cache_items({id: data for id, data in cache_items.items() if data})
+
+    def set_subkeys_multi_deduplicated(self, items, ttl=None):
+        """
+        Like ``set_subkeys_multi``, but stores interfaces that repeat across
+        events (see ``sentry.eventstore.compressor``) only once, under their
+        checksum. The nodes are reassembled transparently when they are read.
+        """
+        from sentry.eventstore.compressor import deduplicate_nodes
+
+        items, extra_nodes = deduplicate_nodes(items)
+        self.set_subkeys_multi({**extra_nodes, **items}, ttl=ttl)
+
     def cleanup(self, cutoff_timestamp):
         raise NotImplementedError
 
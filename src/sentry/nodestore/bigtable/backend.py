@@ -18,6 +18,11 @@ class BigtableNodeStorage(NodeStorage):
         valid for reading + returning)
     :param compression: A boolean whether to enable zlib-compression, or the
         string "zstd" to use zstd.
+    :param binary_format: Whether to write nodes in the binary node format.
+        Binary nodes are compressed per subkey already, so ``compression``
+        should be disabled along with it.
+    :param compression_dictionary: Path to a trained zstd dictionary used to
+        compress binary nodes.
 
     >>> BigtableNodeStorage(
     ...     project='some-project',
@@ -38,8 +43,12 @@ class BigtableNodeStorage(NodeStorage):
         automatic_expiry=False,
         default_ttl=None,
         compression=False,
+        binary_format=False,
+        compression_dictionary=None,
         **client_options,
     ):
+        super().__init__(binary_format=binary_format, compression_dictionary=compression_dictionary)
+
         if compression is True:
             compression = "zlib"
         elif compression is False:
@@ -67,6 +76,11 @@ class BigtableNodeStorage(NodeStorage):
     def _set_bytes(self, id, data, ttl=None):
         self.store.set(id, data, ttl)
 
+    def _set_bytes_multi(self, items, ttl=None):
+        with sentry_sdk.start_span(op="nodestore.bigtable.set_bytes_multi") as span:
+            span.set_tag("num_ids", len(items))
+            self.store.set_many(list(items.items()), ttl)
+
     def delete(self, id):
         if self.skip_deletes:
             return
@@ -6,6 +6,7 @@ from django.utils import timezone
 
 from sentry.db.models import create_or_update
 from sentry.nodestore.base import NodeStorage
+from sentry.nodestore.format import is_binary_node
 from sentry.utils.strings import compress, decompress
 
 from .models import Node
@@ -14,6 +15,14 @@ logger = logging.getLogger("sentry")
 
 
 class DjangoNodeStorage(NodeStorage):
+    """
+    A postgres-based backend for storing node data.
+
+    Legacy nodes are zlib-compressed and base64-encoded into the ``data``
+    column. Binary nodes (see ``binary_format``) are already compressed and are
+    stored as-is in the ``data_bytes`` column.
+    """
+
     def delete(self, id):
         Node.objects.filter(id=id).delete()
         self._delete_cache_item(id)
@@ -23,7 +32,7 @@ class DjangoNodeStorage(NodeStorage):
             return None
 
         try:
-            if value.startswith(b"{"):
+            if value.startswith(b"{") or is_binary_node(value):
                 return NodeStorage._decode(self, value, subkey=subkey)
 
             if subkey is None:
@@ -34,22 +43,31 @@ class DjangoNodeStorage(NodeStorage):
             logger.exception(e)
             return {}
 
+    def _get_node_bytes(self, node):
+        if node.data_bytes is not None:
+            return bytes(node.data_bytes)
+        return decompress(node.data)
+
     def _get_bytes(self, id):
         try:
-            data = Node.objects.get(id=id).data
-            return decompress(data)
+            return self._get_node_bytes(Node.objects.get(id=id))
         except Node.DoesNotExist:
             return None
 
     def _get_bytes_multi(self, id_list):
-        return {n.id: decompress(n.data) for n in Node.objects.filter(id__in=id_list)}
+        return {n.id: self._get_node_bytes(n) for n in Node.objects.filter(id__in=id_list)}
 
     def delete_multi(self, id_list):
         Node.objects.filter(id__in=id_list).delete()
         self._delete_cache_items(id_list)
 
     def _set_bytes(self, id, data, ttl=None):
-        create_or_update(Node, id=id, values={"data": compress(data), "timestamp": timezone.now()})
+        if is_binary_node(data):
+            values = {"data": "", "data_bytes": data}
+        else:
+            values = {"data": compress(data), "data_bytes": None}
+        values["timestamp"] = timezone.now()
+        create_or_update(Node, id=id, values=values)
 
     def cleanup(self, cutoff_timestamp):
         from sentry.db.deletion import BulkDeleteQuery
@@ -11,6 +11,9 @@ class Node(BaseModel):
     # TODO(dcramer): this being pickle and not JSON has the ability to cause
     # hard errors as it accepts other serialization than native JSON
     data = models.TextField()
+    # Binary nodes are stored uncompressed and unencoded in here instead, see
+    # ``sentry.nodestore.format``.
+    data_bytes = models.BinaryField(null=True)
     timestamp = models.DateTimeField(default=timezone.now, db_index=True)
 
     __repr__ = sane_repr("timestamp")
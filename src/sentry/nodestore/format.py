@@ -0,0 +1,165 @@
+"""
+Binary node format.
+
+Legacy nodes are JSON documents separated by newlines (see
+``NodeStorage._encode``), which means reading a subkey requires splitting the
+entire blob, and the blob can only be compressed as a whole. Binary nodes
+instead start with a header that lists every subkey together with the offset
+and length of its payload, and every payload is compressed on its own:
+
+    magic (4 bytes) | version (u8) | dictionary id (u32) | section count (u16)
+    per section: name length (u8) | name | codec (u8) | offset (u32) | length (u32)
+    payloads
+
+All integers are little endian, offsets are relative to the end of the header.
+The default subkey (``None``) is stored with an empty name. Payloads are JSON,
+optionally compressed with zstd, using a trained dictionary if one is
+configured. The dictionary id is recorded so that nodes written with a
+different dictionary are detected instead of decoded into garbage.
+
+Legacy nodes start with ``{`` (JSON) or are pickles and can never start with
+the magic bytes, so both formats can be read side by side.
+"""
+
+from __future__ import annotations
+
+import struct
+from typing import Any, Mapping, Optional
+
+import zstandard
+
+MAGIC = b"\x00SNB"
+VERSION = 1
+
+CODEC_RAW = 0
+CODEC_ZSTD = 1
+
+# Payloads shorter than this are not worth compressing.
+MIN_COMPRESS_SIZE = 64
+
+_preamble = struct.Struct("<4sBIH")
+_section_name_length = struct.Struct("<B")
+_section_location = struct.Struct("<BII")
+
+
+class NodeFormatError(Exception):
+    pass
+
+
+class CompressionDictionary:
+    """
+    A zstd dictionary trained on node payloads, see ``zstd --train``.
+    """
+
+    def __init__(self, data: bytes, level: int = 3):
+        self.dict_data = zstandard.ZstdCompressionDict(data)
+        self.dict_data.precompute_compress(level=level)
+        self.level = level
+
+    @classmethod
+    def from_file(cls, path: str, level: int = 3) -> CompressionDictionary:
+        with open(path, "rb") as f:
+            return cls(f.read(), level=level)
+
+    @property
+    def dict_id(self) -> int:
+        return int(self.dict_data.dict_id())
+
+
+def is_binary_node(value: bytes) -> bool:
+    return value[: len(MAGIC)] == MAGIC
+
+
+def encode(
+    data: Mapping[Optional[str], bytes], dictionary: Optional[CompressionDictionary] = None
+) -> bytes:
+    """
+    Encode already JSON-serialized payloads by subkey into a binary node.
+    """
+    if dictionary is not None:
+        compressor = zstandard.ZstdCompressor(dict_data=dictionary.dict_data)
+    else:
+        compressor = zstandard.ZstdCompressor()
+
+    header = [_preamble.pack(MAGIC, VERSION, dictionary.dict_id if dictionary else 0, len(data))]
+    payloads = []
+    offset = 0
+
+    for key, value in data.items():
+        name = b"" if key is None else key.encode("ascii")
+        if key is not None and not name:
+            raise ValueError("subkeys must not be empty")
+
+        codec = CODEC_RAW
+        if len(value) >= MIN_COMPRESS_SIZE:
+            compressed = compressor.compress(value)
+            if len(compressed) < len(value):
+                codec = CODEC_ZSTD
+                value = compressed
+
+        header.append(_section_name_length.pack(len(name)))
+        header.append(name)
+        header.append(_section_location.pack(codec, offset, len(value)))
+        payloads.append(value)
+        offset += len(value)
+
+    return b"".join(header + payloads)
+
+
+def read_section(
+    value: bytes,
+    subkey: Optional[str] = None,
+    dictionary: Optional[CompressionDictionary] = None,
+) -> Optional[bytes]:
+    """
+    Return the JSON payload of a single subkey of a binary node without
+    touching any of the other payloads, or ``None`` if the subkey does not
+    exist.
+    """
+    try:
+        magic, version, dict_id, count = _preamble.unpack_from(value)
+    except struct.error as e:
+        raise NodeFormatError("truncated node header") from e
+
+    if magic != MAGIC or version != VERSION:
+        raise NodeFormatError(f"unsupported node format {magic!r} version {version}")
+
+    wanted = b"" if subkey is None else subkey.encode("ascii")
+    location: Any = None
+
+    pos = _preamble.size
+    try:
+        for _ in range(count):
+            (name_length,) = _section_name_length.unpack_from(value, pos)
+            pos += _section_name_length.size
+            name = value[pos : pos + name_length]
+            pos += name_length
+            if name == wanted:
+                location = _section_location.unpack_from(value, pos)
+            pos += _section_location.size
+    except struct.error as e:
+        raise NodeFormatError("truncated node header") from e
+
+    if location is None:
+        return None
+
+    codec, offset, length = location
+    start = pos + offset
+    payload = value[start : start + length]
+    if len(payload) != length:
+        raise NodeFormatError("truncated node payload")
+
+    if codec == CODEC_RAW:
+        return payload
+
+    if codec != CODEC_ZSTD:
+        raise NodeFormatError(f"unknown codec {codec}")
+
+    if dict_id:
+        if dictionary is None or dictionary.dict_id != dict_id:
+            raise NodeFormatError(f"node requires compression dictionary {dict_id}")
+        decompressor = zstandard.ZstdDecompressor(dict_data=dictionary.dict_data)
+    else:
+        decompressor = zstandard.ZstdDecompressor()
+
+    return decompressor.decompress(payload)
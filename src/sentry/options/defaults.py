@@ -52,6 +52,12 @@ register(
 )
 register("redis.options", type=Dict, flags=FLAG_NOSTORE)
 
+# Buffers
+# Store buffered filters and extra values with the typed JSON encoding instead of pickle
+register("buffer.typed-encoding", default=False)
+# Flush pending buffer keys in batches, with one multi-row UPDATE per model and column set
+register("buffer.bulk-flush", default=False)
+
 # Processing worker caches
 register(
     "dsym.cache-path", type=String, default="/tmp/sentry-dsym-cache", flags=FLAG_PRIORITIZE_DISK
@@ -258,9 +264,21 @@ register("snuba.search.max-pre-snuba-candidates", default=5000)
 register("snuba.search.chunk-growth-rate", default=1.5)
 register("snuba.search.max-chunk-size", default=2000)
 register("snuba.search.max-total-chunk-time-seconds", default=30.0)
+register("snuba.search.pipelined-chunks", type=Bool, default=False)
 register("snuba.search.hits-sample-size", default=100)
 register("snuba.track-outcomes-sample-rate", default=0.0)
 
+# Let one worker run a query missing from the query cache while concurrent
+# workers wait for its result.
+register("snuba.query-cache.coalesce", default=False)
+# Referrer prefixes for which the query cache is always used, and which are
+# served stale results while another worker refreshes them.
+register("snuba.query-cache.stale-referrers", type=Sequence, default=[], flags=FLAG_ALLOW_EMPTY)
+# Referrer prefixes for which time-series queries cache their results by bucket
+register("snuba.timeseries-cache.referrers", type=Sequence, default=[], flags=FLAG_ALLOW_EMPTY)
+# Run the independent Snuba queries of group serializers concurrently
+register("serializers.group.concurrent-snuba-queries", type=Bool, default=False)
+
 # The percentage of tagkeys that we want to cache. Set to 1.0 in order to cache everything, <=0.0 to stop caching
 register("snuba.tagstore.cache-tagkeys-rate", default=0.0, flags=FLAG_PRIORITIZE_DISK)
 
@@ -363,6 +381,9 @@ register("store.reprocessing-force-disable", default=False)
 
 register("store.race-free-group-creation-force-disable", default=False)
 
+# Resolve grouphashes through a per-process cache during event saving
+register("store.use-grouphash-cache", default=False)
+
 
 # ## sentry.killswitches
 #
@@ -472,6 +493,10 @@ register("sentry-metrics.performance.tags-values-are-strings", default=False)
 # values or not
 register("sentry-metrics.performance.index-tag-values", default=True)
 
+# Keep resolved indexer strings and ids in an in-process cache in front of
+# the shared indexer cache
+register("sentry-metrics.indexer.local-cache", default=False)
+
 # Global and per-organization limits on the writes to the string indexer's DB.
 #
 # Format is a list of dictionaries of format {
@@ -534,6 +559,43 @@ register("performance.issues.n_plus_one_db_ext.problem-creation", default=0.0)
 register("performance.issues.n_plus_one_db.count_threshold", default=5)
 register("performance.issues.n_plus_one_db.duration_threshold", default=100.0)
 
+# Cache detection settings per project instead of reading them for every transaction.
+register("performance.issues.cache-detection-settings", default=False)
+
+# Count events per group in Redis and answer event frequency conditions from
+# the counts instead of Snuba where possible.
+register("rules.frequency-counters", default=False)
+
+# Process the events of an ingest consumer batch together: deduplicate and
+# write them to the processing store with one round trip each, and save
+# transactions with one task per up to `transaction-batch-size` transactions.
+register("ingest-consumer.batch-events", default=False)
+register("ingest-consumer.transaction-batch-size", default=20)
+
+# Store the aggregation values of subscription updates of percent change
+# metric alerts, and compare to them instead of querying Snuba where possible.
+register("incidents.store-comparison-values", default=False)
+
+# Number of blobs that are downloaded ahead while reading a file, 0 downloads
+# every blob when it is read.
+register("filestore.read-ahead-blobs", default=0)
+
+# Group deletions: build the child relations of a batch of groups once and
+# delete them with one query per model, and the number of independent child
+# relations that are deleted concurrently (1 deletes them one by one).
+register("deletions.groups.bulk-relations", default=False)
+register("deletions.groups.batch-size", default=100)
+register("deletions.max-concurrent-relations", default=1)
+
+# Store interfaces that repeat across events (debug images, modules, SDK info
+# and some contexts) once in nodestore, under their checksum. Deduplicated
+# nodes can always be read.
+register("nodestore.deduplicate-interfaces", default=False)
+
+# Number of source files and source maps of an event that JavaScript
+# processing fetches concurrently (1 fetches them one by one).
+register("sourcemaps.fetch-concurrency", default=1)
+
 # Dynamic Sampling system wide options
 # Killswitch to disable new dynamic sampling behavior specifically new dynamic sampling biases
 register("dynamic-sampling:enabled-biases", default=True)
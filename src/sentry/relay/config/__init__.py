@@ -155,6 +155,47 @@ def get_project_config(project, full_config=True, project_keys=None):
             return _get_project_config(project, full_config=full_config, project_keys=project_keys)
 
 
+def get_project_configs(project, project_keys, full_config=True):
+    """Constructs the ProjectConfig of each of the given keys of a project.
+
+    This is equivalent to calling :func:`get_project_config` with every key on
+    its own, except that the parts of the config which do not depend on the
+    key are only computed once.
+
+    :param project: The project to load configuration for, see
+        :func:`get_project_config`.
+    :param project_keys: The keys of the project to construct configs for.
+    :param full_config: See :func:`get_project_config`.
+    :return: a dict mapping public keys to their ProjectConfig
+    """
+    if not project_keys:
+        return {}
+
+    first_key, *other_keys = project_keys
+    with sentry_sdk.push_scope() as scope:
+        scope.set_tag("project", project.id)
+        with metrics.timer("relay.config.get_project_configs.duration"):
+            project_config = _get_project_config(
+                project, full_config=full_config, project_keys=[first_key]
+            )
+            configs = {first_key.public_key: project_config}
+            if project_config.disabled:
+                configs.update((key.public_key, project_config) for key in other_keys)
+                return configs
+
+            shared = project_config.to_dict()
+            for key in other_keys:
+                cfg = {
+                    **shared,
+                    "publicKeys": get_public_key_configs(project, full_config, project_keys=[key]),
+                }
+                if full_config:
+                    cfg["config"] = {**shared["config"], "quotas": get_quotas(project, keys=[key])}
+                configs[key.public_key] = ProjectConfig(project, **cfg)
+
+    return configs
+
+
 def get_dynamic_sampling_config(project) -> Optional[Mapping[str, Any]]:
     feature_multiplexer = DynamicSamplingFeatureMultiplexer(project)
 
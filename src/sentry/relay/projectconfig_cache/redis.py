@@ -55,7 +55,17 @@ class RedisProjectConfigCache(ProjectConfigCache):
         )
 
     def get(self, public_key):
-        rv = self.cluster_read.get(self.__get_redis_key(public_key))
+        return self.__load(self.cluster_read.get(self.__get_redis_key(public_key)))
+
+    def get_many(self, public_keys):
+        public_keys = list(public_keys)
+        # Note: Those are multiple pipelines, one per cluster node
+        p = self.cluster_read.pipeline()
+        for public_key in public_keys:
+            p.get(self.__get_redis_key(public_key))
+        return {public_key: self.__load(rv) for public_key, rv in zip(public_keys, p.execute())}
+
+    def __load(self, rv):
         if rv is not None:
             try:
                 rv = zstandard.decompress(rv).decode()
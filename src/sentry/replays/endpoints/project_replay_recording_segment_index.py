@@ -1,4 +1,5 @@
 import zlib
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor
 
 from django.db.models import Prefetch
@@ -17,6 +18,13 @@ from sentry.replays.models import ReplayRecordingSegment
 from sentry.replays.serializers import ReplayRecordingSegmentSerializer
 
 FILE_FETCH_THREADPOOL_SIZE = 4
+# Segments are read and decompressed in pieces of this size.
+SEGMENT_READ_SIZE = 64 * 1024
+
+
+def close_fetched_segment(future):
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
 
 
 @region_silo_endpoint
@@ -61,13 +69,9 @@ class ProjectReplayRecordingSegmentIndexEndpoint(ProjectEndpoint):
 
     def on_download_results(self, results):
         """
-        get the files associated with the segment range requested. prefetch the files
-        in a threadpool.
+        get the files associated with the segment range requested. the files are
+        fetched in a threadpool while the previous ones are streamed.
         """
-
-        # TODO: deflate files as theyre fetched, instead of having
-        # to wait untill all of them are complete before starting work.
-
         recording_segment_files = File.objects.filter(
             id__in=[r.file_id for r in results]
         ).prefetch_related(
@@ -77,39 +81,79 @@ class ProjectReplayRecordingSegmentIndexEndpoint(ProjectEndpoint):
                 to_attr="file_blob_indexes",
             )
         )
-        with ThreadPoolExecutor(max_workers=4) as exe:
+        files_by_id = {file.id: file for file in recording_segment_files}
 
-            file_objects = exe.map(
-                lambda file: get_chunked_blob_from_indexes(file.file_blob_indexes),
-                recording_segment_files,
+        return iter(
+            self.segment_generator(
+                [files_by_id[r.file_id] for r in results if r.file_id in files_by_id]
             )
+        )
 
-        return iter(self.segment_generator(list(file_objects)))
-
-    def segment_generator(self, recording_segments):
+    def segment_generator(self, recording_segment_files):
         """
         streams a JSON object made of replay recording segments.
         the segments are individual json objects, and we build a list around them.
         they are also default compressed, so deflate them if needed.
-        """
-        yield "["
-
-        for i, file in enumerate(recording_segments):
-            if self.is_compressed(file):
-                buffer = file.read()
-                yield zlib.decompress(buffer, zlib.MAX_WBITS | 32)
-            else:
-                yield file.read().decode("utf-8")
-
-            if i < len(recording_segments) - 1:
-                yield ","
 
-        yield "]"
+        the next FILE_FETCH_THREADPOOL_SIZE segments are fetched while a segment is
+        streamed, so at most that many segments are held at a time.
+        """
+        yield b"["
+
+        with ThreadPoolExecutor(max_workers=FILE_FETCH_THREADPOOL_SIZE) as exe:
+            files = iter(recording_segment_files)
+            pending = deque()
+
+            def fetch_next():
+                file = next(files, None)
+                if file is not None:
+                    pending.append(
+                        exe.submit(get_chunked_blob_from_indexes, file.file_blob_indexes)
+                    )
+
+            for _ in range(FILE_FETCH_THREADPOOL_SIZE):
+                fetch_next()
+
+            try:
+                first = True
+                while pending:
+                    with pending.popleft().result() as segment:
+                        fetch_next()
+
+                        if not first:
+                            yield b","
+                        first = False
+
+                        yield from self.read_segment(segment)
+            finally:
+                # the client may have gone away, close the segments that have
+                # been fetched already or are being fetched.
+                for future in pending:
+                    if not future.cancel():
+                        future.add_done_callback(close_fetched_segment)
+
+        yield b"]"
 
     @staticmethod
-    def is_compressed(blob):
-        first_char = blob.read(1)
-        blob.seek(0)
-        if first_char == b"[":
-            return False
-        return True
+    def read_segment(file):
+        """
+        yields the contents of a segment file in pieces, and deflates them as they
+        are read if the segment is compressed.
+        """
+        chunk = file.read(SEGMENT_READ_SIZE)
+        if chunk[:1] == b"[":
+            while chunk:
+                yield chunk
+                chunk = file.read(SEGMENT_READ_SIZE)
+            return
+
+        decompressor = zlib.decompressobj(zlib.MAX_WBITS | 32)
+        while chunk:
+            data = decompressor.decompress(chunk)
+            if data:
+                yield data
+            chunk = file.read(SEGMENT_READ_SIZE)
+
+        data = decompressor.flush()
+        if data:
+            yield data
@@ -11,12 +11,13 @@ from django import forms
 from django.core.cache import cache
 from django.utils import timezone
 
-from sentry import release_health, tsdb
+from sentry import options, release_health, tsdb
 from sentry.eventstore.models import GroupEvent
 from sentry.issues.constants import ISSUE_TSDB_GROUP_MODELS, ISSUE_TSDB_USER_GROUP_MODELS
 from sentry.receivers.rules import DEFAULT_RULE_LABEL
 from sentry.rules import EventState
 from sentry.rules.conditions.base import EventCondition
+from sentry.rules.frequency_counters import get_group_event_count
 from sentry.utils import metrics
 from sentry.utils.snuba import options_override
 
@@ -45,6 +46,20 @@ comparison_types = {
 }
 
 
+def get_counted_event_count(
+    event: GroupEvent, start: datetime, end: datetime, environment_id: str
+) -> int | None:
+    """
+    Returns the number of events of the group of ``event`` from the event
+    counters, or ``None`` if they cannot tell.
+    """
+    if not options.get("rules.frequency-counters"):
+        return None
+    return get_group_event_count(
+        event.group_id, int(environment_id) if environment_id else None, start, end
+    )
+
+
 class EventFrequencyForm(forms.Form):  # type: ignore
     intervals = standard_intervals
     interval = forms.ChoiceField(
@@ -122,6 +137,10 @@ class BaseEventFrequencyCondition(EventCondition, abc.ABC):
         return current_value > value
 
     def query(self, event: GroupEvent, start: datetime, end: datetime, environment_id: str) -> int:
+        counted_result = self.query_counters(event, start, end, environment_id)
+        if counted_result is not None:
+            return counted_result
+
         query_result = self.query_hook(event, start, end, environment_id)
         metrics.incr(
             "rules.conditions.queried_snuba",
@@ -138,6 +157,14 @@ class BaseEventFrequencyCondition(EventCondition, abc.ABC):
         """ """
         raise NotImplementedError  # subclass must implement
 
+    def query_counters(
+        self, event: GroupEvent, start: datetime, end: datetime, environment_id: str
+    ) -> int | None:
+        """
+        Answers the query without Snuba if possible, see `sentry.rules.frequency_counters`.
+        """
+        return None
+
     def get_rate(self, event: GroupEvent, interval: str, environment_id: str) -> int:
         _, duration = self.intervals[interval]
         end = timezone.now()
@@ -187,6 +214,11 @@ class EventFrequencyCondition(BaseEventFrequencyCondition):
     id = "sentry.rules.conditions.event_frequency.EventFrequencyCondition"
     label = "The issue is seen more than {value} times in {interval}"
 
+    def query_counters(
+        self, event: GroupEvent, start: datetime, end: datetime, environment_id: str
+    ) -> int | None:
+        return get_counted_event_count(event, start, end, environment_id)
+
     def query_hook(
         self, event: GroupEvent, start: datetime, end: datetime, environment_id: str
     ) -> int:
@@ -313,15 +345,17 @@ class EventFrequencyPercentCondition(BaseEventFrequencyCondition):
             )
             avg_sessions_in_interval = session_count_last_hour / (60 / interval_in_minutes)
 
-            issue_count = self.tsdb.get_sums(
-                model=ISSUE_TSDB_GROUP_MODELS[event.group.issue_category],
-                keys=[event.group_id],
-                start=start,
-                end=end,
-                environment_id=environment_id,
-                use_cache=True,
-                jitter_value=event.group_id,
-            )[event.group_id]
+            issue_count = get_counted_event_count(event, start, end, environment_id)
+            if issue_count is None:
+                issue_count = self.tsdb.get_sums(
+                    model=ISSUE_TSDB_GROUP_MODELS[event.group.issue_category],
+                    keys=[event.group_id],
+                    start=start,
+                    end=end,
+                    environment_id=environment_id,
+                    use_cache=True,
+                    jitter_value=event.group_id,
+                )[event.group_id]
             if issue_count > avg_sessions_in_interval:
                 # We want to better understand when and why this is happening, so we're logging it for now
                 self.logger.info(
@@ -0,0 +1,117 @@
+"""
+Event counts per group over sliding windows, for event frequency conditions.
+
+Event frequency conditions are evaluated for every event of a group, and
+every evaluation used to query the number of events of the group in the last
+N minutes from Snuba. Instead, post-processing counts every event in Redis,
+in buckets of ``BUCKET_SIZE`` seconds. The buckets of an hour are fields of
+one hash per group, environment and hour, which expires once its hour can no
+longer be part of a window.
+
+The counters only know about events that have been counted. Every group has a
+marker of the time it has been counted since, which is kept alive by every
+event of the group. Windows that start before it (or more than
+``MAX_WINDOW`` seconds ago) cannot be answered from the counters, and
+conditions fall back to Snuba. Events that are not counted (because counting
+is disabled, failed, or the event is reprocessed) remove the marker with
+``reset_group_event_count``, so that counting starts over.
+"""
+
+from __future__ import annotations
+
+import time
+from datetime import datetime
+from typing import Optional
+
+from django.conf import settings
+
+from sentry.utils import metrics, redis
+from sentry.utils.dates import to_timestamp
+
+__all__ = ("get_group_event_count", "incr_group_event_count", "reset_group_event_count")
+
+BUCKET_SIZE = 10
+# Windows (that start) up to this many seconds ago can be answered.
+MAX_WINDOW = 60 * 60
+KEY_TTL = 3 * MAX_WINDOW
+
+
+def get_redis_client():
+    return redis.redis_clusters.get(settings.SENTRY_RULE_FREQUENCY_COUNTERS_REDIS_CLUSTER)
+
+
+def _get_counter_key(group_id: int, environment_id: Optional[int], hour: int) -> str:
+    # All keys of a group share a hash tag, so that they can be pipelined.
+    return f"rfc:{{{group_id}}}:{environment_id or ''}:{hour}"
+
+
+def _get_since_key(group_id: int) -> str:
+    return f"rfc:{{{group_id}}}:since"
+
+
+def incr_group_event_count(
+    group_id: int, environment_id: Optional[int], timestamp: datetime
+) -> None:
+    """
+    Count an event of a group, in its environment and across all
+    environments.
+    """
+    now = int(time.time())
+    ts = min(int(to_timestamp(timestamp)), now)
+
+    pipe = get_redis_client().pipeline(transaction=False)
+    since_key = _get_since_key(group_id)
+    pipe.set(since_key, now, ex=KEY_TTL, nx=True)
+    pipe.expire(since_key, KEY_TTL)
+
+    # Events that are too old to be part of any window only keep the marker alive.
+    if ts >= now - MAX_WINDOW:
+        for env in {None, environment_id}:
+            key = _get_counter_key(group_id, env, ts // MAX_WINDOW)
+            pipe.hincrby(key, ts // BUCKET_SIZE, 1)
+            pipe.expire(key, KEY_TTL)
+
+    pipe.execute()
+
+
+def reset_group_event_count(group_id: int) -> None:
+    """
+    Forget the time a group has been counted since, after an event of the
+    group has not been counted. Windows are answered by Snuba until they start
+    after the next counted event.
+    """
+    get_redis_client().delete(_get_since_key(group_id))
+
+
+def get_group_event_count(
+    group_id: int, environment_id: Optional[int], start: datetime, end: datetime
+) -> Optional[int]:
+    """
+    Returns the number of events of a group between ``start`` and ``end``,
+    rounded to buckets like the time series of ``tsdb.get_sums``, or
+    ``None`` if the counters cannot tell.
+    """
+    start_ts = int(to_timestamp(start))
+    end_ts = int(to_timestamp(end))
+    # Compare whole seconds, so that windows of ``MAX_WINDOW`` seconds can be answered.
+    if start_ts < int(time.time()) - MAX_WINDOW:
+        metrics.incr("rules.frequency_counters.get", tags={"result": "out_of_range"})
+        return None
+
+    fields_by_key = {}
+    for bucket in range(start_ts // BUCKET_SIZE, end_ts // BUCKET_SIZE + 1):
+        key = _get_counter_key(group_id, environment_id, bucket * BUCKET_SIZE // MAX_WINDOW)
+        fields_by_key.setdefault(key, []).append(bucket)
+
+    pipe = get_redis_client().pipeline(transaction=False)
+    pipe.get(_get_since_key(group_id))
+    for key, fields in fields_by_key.items():
+        pipe.hmget(key, fields)
+    since, *counts = pipe.execute()
+
+    if since is None or int(since) > start_ts:
+        metrics.incr("rules.frequency_counters.get", tags={"result": "cold"})
+        return None
+
+    metrics.incr("rules.frequency_counters.get", tags={"result": "hit"})
+    return sum(int(count) for key_counts in counts for count in key_counts if count is not None)
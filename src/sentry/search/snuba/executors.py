@@ -4,6 +4,8 @@ import functools
 import logging
 import time
 from abc import ABCMeta, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from dataclasses import replace
 from datetime import datetime, timedelta
 from hashlib import md5
@@ -11,6 +13,7 @@ from typing import Any, List, Mapping, Optional, Sequence, Set, Tuple, cast
 
 import sentry_sdk
 from django.utils import timezone
+from sentry_sdk import Hub
 from snuba_sdk import (
     Column,
     Condition,
@@ -157,6 +160,41 @@ class AbstractQueryExecutor(metaclass=ABCMeta):
         * a sorted list of (group_id, group_score) tuples sorted descending by score,
         * the count of total results (rows) available for this query.
         """
+        query_params, referrer, sort_field = self._get_snuba_search_query_params(
+            start=start,
+            end=end,
+            project_ids=project_ids,
+            environment_ids=environment_ids,
+            sort_field=sort_field,
+            organization_id=organization_id,
+            cursor=cursor,
+            group_ids=group_ids,
+            limit=limit,
+            offset=offset,
+            get_sample=get_sample,
+            search_filters=search_filters,
+        )
+        return self._run_snuba_search(query_params, referrer, sort_field, get_sample)
+
+    def _get_snuba_search_query_params(
+        self,
+        start: datetime,
+        end: datetime,
+        project_ids: Sequence[int],
+        environment_ids: Optional[Sequence[int]],
+        sort_field: str,
+        organization_id: int,
+        cursor: Optional[Cursor] = None,
+        group_ids: Optional[Sequence[int]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        get_sample: bool = False,
+        search_filters: Optional[Sequence[SearchFilter]] = None,
+    ) -> Tuple[Sequence[SnubaQueryParams], str, str]:
+        """
+        Builds the queries of `snuba_search`, which may access the database.
+        Returns the queries, their referrer and the field to sort by.
+        """
         filters = {"project_id": project_ids}
 
         environments = None
@@ -276,7 +314,19 @@ class AbstractQueryExecutor(metaclass=ABCMeta):
             )
         )
 
-        bulk_query_results = bulk_raw_query(query_params_for_categories, referrer=referrer)
+        return query_params_for_categories, referrer, sort_field
+
+    def _run_snuba_search(
+        self,
+        query_params: Sequence[SnubaQueryParams],
+        referrer: str,
+        sort_field: str,
+        get_sample: bool = False,
+    ) -> Tuple[List[Tuple[int, Any]], int]:
+        """
+        Runs the queries built by `_get_snuba_search_query_params`, see `snuba_search`.
+        """
+        bulk_query_results = bulk_raw_query(query_params, referrer=referrer)
 
         rows: list[MergeableRow] = []
         total = 0
@@ -329,6 +379,11 @@ def trend_aggregation(start: datetime, end: datetime) -> Sequence[str]:
     ]
 
 
+# Fetches the next chunk of `PostgresSnubaQueryExecutor` searches from Snuba
+# while the current one is post-filtered.
+_chunk_prefetch_pool = ThreadPoolExecutor(max_workers=10)
+
+
 class PostgresSnubaQueryExecutor(AbstractQueryExecutor):
     ISSUE_FIELD_NAME = "group_id"
 
@@ -513,6 +568,35 @@ class PostgresSnubaQueryExecutor(AbstractQueryExecutor):
         result_group_ids = set()
 
         max_time = options.get("snuba.search.max-total-chunk-time-seconds")
+
+        if not group_ids and options.get("snuba.search.pipelined-chunks"):
+            paginator_results, more_results, num_chunks = self._search_chunks_pipelined(
+                search_kwargs={
+                    "start": start,
+                    "end": end,
+                    "project_ids": [p.id for p in projects],
+                    "environment_ids": environments
+                    and [environment.id for environment in environments],
+                    "organization_id": projects[0].organization_id,
+                    "sort_field": sort_field,
+                    "cursor": cursor,
+                    "search_filters": search_filters,
+                },
+                group_queryset=group_queryset,
+                limit=limit,
+                chunk_limit=chunk_limit,
+                chunk_growth=chunk_growth,
+                max_chunk_size=max_chunk_size,
+                max_time=max_time,
+                cursor=cursor,
+                hits=hits,
+                max_hits=max_hits,
+                paginator_options=paginator_options,
+            )
+            return self._get_paginated_groups(
+                paginator_results, limit, cursor, more_results, num_chunks
+            )
+
         time_start = time.time()
         more_results = False
 
@@ -595,6 +679,22 @@ class PostgresSnubaQueryExecutor(AbstractQueryExecutor):
             if group_ids or len(paginator_results.results) >= limit or not more_results:
                 break
 
+        return self._get_paginated_groups(
+            paginator_results, limit, cursor, more_results, num_chunks
+        )
+
+    def _get_paginated_groups(
+        self,
+        paginator_results: CursorResult[int],
+        limit: int,
+        cursor: Optional[Cursor],
+        more_results: bool,
+        num_chunks: int,
+    ) -> CursorResult[Group]:
+        """
+        Fixes up the cursors of the paginated group ids of a chunked search,
+        and replaces the ids with their groups.
+        """
         # HACK: We're using the SequencePaginator to mask the complexities of going
         # back and forth between two databases. This causes a problem with pagination
         # because we're 'lying' to the SequencePaginator (it thinks it has the entire
@@ -621,6 +721,109 @@ class PostgresSnubaQueryExecutor(AbstractQueryExecutor):
 
         return paginator_results
 
+    def _search_chunks_pipelined(
+        self,
+        search_kwargs: Mapping[str, Any],
+        group_queryset: BaseQuerySet,
+        limit: int,
+        chunk_limit: int,
+        chunk_growth: float,
+        max_chunk_size: int,
+        max_time: float,
+        cursor: Optional[Cursor],
+        hits: Optional[int],
+        max_hits: Optional[int],
+        paginator_options: Mapping[str, Any],
+    ) -> Tuple[CursorResult[int], bool, int]:
+        """
+        Searches Snuba in chunks of growing size and post-filters them in
+        Postgres, like the serial loop of `query`, but fetches the next chunk
+        from Snuba while the current one is post-filtered. The next chunk is
+        fetched speculatively and discarded once enough groups have been
+        found.
+
+        Returns the paginated results, whether Snuba has more results, and
+        the number of chunks that were fetched.
+        """
+        time_start = time.time()
+        result_groups: List[Tuple[int, Any]] = []
+        result_group_ids: Set[int] = set()
+        offset = 0
+        num_chunks = 0
+        more_results = False
+
+        def fetch_chunk(chunk_offset: int) -> Future[Tuple[List[Tuple[int, Any]], int]]:
+            nonlocal chunk_limit, num_chunks
+            num_chunks += 1
+            # grow the chunk size on each iteration to account for huge projects
+            # and weird queries, up to a max size
+            chunk_limit = min(int(chunk_limit * chunk_growth), max_chunk_size)
+            # Queries are built here, as building them may access the database
+            query_params, referrer, sort_field = self._get_snuba_search_query_params(
+                limit=chunk_limit, offset=chunk_offset, **search_kwargs
+            )
+            hub = Hub(Hub.current)
+
+            def run() -> Tuple[List[Tuple[int, Any]], int]:
+                with hub:
+                    return self._run_snuba_search(query_params, referrer, sort_field)
+
+            return _chunk_prefetch_pool.submit(run)
+
+        future: Optional[Future[Tuple[List[Tuple[int, Any]], int]]] = fetch_chunk(offset)
+        while future is not None:
+            # Like the serial loop, the first chunk is always waited for, only
+            # prefetched chunks are bound by `max_time`.
+            timeout = max(max_time - (time.time() - time_start), 0) if num_chunks > 1 else None
+            try:
+                snuba_groups, total = future.result(timeout=timeout)
+            except FutureTimeoutError:
+                future.cancel()
+                metrics.incr("snuba.search.pipelined_chunks.timeout", skip_internal=False)
+                break
+
+            metrics.timing("snuba.search.num_snuba_results", len(snuba_groups))
+            more_results = len(snuba_groups) >= limit and (offset + limit) < total
+            offset += len(snuba_groups)
+
+            if not snuba_groups:
+                break
+
+            future = None
+            if more_results and (time.time() - time_start) < max_time:
+                future = fetch_chunk(offset)
+
+            filtered_group_ids = group_queryset.filter(
+                id__in=[gid for gid, _ in snuba_groups]
+            ).values_list("id", flat=True)
+
+            group_to_score = dict(snuba_groups)
+            for group_id in filtered_group_ids:
+                # guard against groups that moved between chunks, see `query`
+                if group_id in result_group_ids:
+                    continue
+                result_group_ids.add(group_id)
+                result_groups.append((group_id, group_to_score[group_id]))
+
+            if len(result_groups) >= limit:
+                # Only the paginator knows whether these satisfy the query
+                # (e.g. with a cursor), so only build it when they may.
+                paginator_results = SequencePaginator(
+                    [(score, id) for (id, score) in result_groups],
+                    reverse=True,
+                    **paginator_options,
+                ).get_result(limit, cursor, known_hits=hits, max_hits=max_hits)
+                if len(paginator_results.results) >= limit:
+                    if future is not None:
+                        future.cancel()
+                        metrics.incr("snuba.search.pipelined_chunks.discarded")
+                    return paginator_results, more_results, num_chunks
+
+        paginator_results = SequencePaginator(
+            [(score, id) for (id, score) in result_groups], reverse=True, **paginator_options
+        ).get_result(limit, cursor, known_hits=hits, max_hits=max_hits)
+        return paginator_results, more_results, num_chunks
+
     def calculate_hits(
         self,
         group_ids: Sequence[int],
@@ -5,6 +5,7 @@ from typing import Mapping, MutableMapping, Optional, Sequence, Set
 from django.conf import settings
 from django.core.cache import caches
 
+from sentry import options
 from sentry.sentry_metrics.configuration import UseCaseKey
 from sentry.sentry_metrics.indexer.base import (
     FetchType,
@@ -14,6 +15,7 @@ from sentry.sentry_metrics.indexer.base import (
     StringIndexer,
 )
 from sentry.utils import metrics
+from sentry.utils.datastructures import LRUCache
 from sentry.utils.hashlib import md5_text
 
 logger = logging.getLogger(__name__)
@@ -21,14 +23,54 @@ logger = logging.getLogger(__name__)
 _INDEXER_CACHE_METRIC = "sentry_metrics.indexer.memcache"
 # only used to compare to the older version of the PGIndexer
 _INDEXER_CACHE_FETCH_METRIC = "sentry_metrics.indexer.memcache.fetch"
+_INDEXER_LOCAL_CACHE_METRIC = "sentry_metrics.indexer.local_cache"
 
 
 class StringIndexerCache:
-    def __init__(self, cache_name: str, partition_key: str):
+    """
+    Cache of indexed strings ("org_id:string" keys) to their ids in a shared
+    Django cache.
+
+    With ``sentry-metrics.indexer.local-cache`` enabled, entries are also kept
+    in bounded in-process caches, in both directions. Ids never change once
+    they have been assigned, so local entries are only evicted by size.
+    """
+
+    def __init__(self, cache_name: str, partition_key: str, local_cache_size: Optional[int] = None):
         self.version = 1
         self.cache = caches[cache_name]
         self.partition_key = partition_key
 
+        if local_cache_size is None:
+            local_cache_size = settings.SENTRY_METRICS_INDEXER_LOCAL_CACHE_SIZE
+        # (cache_namespace, "org_id:string") -> id
+        self.local_cache = LRUCache(local_cache_size)
+        # (cache_namespace, org_id, id) -> string
+        self.reverse_local_cache = LRUCache(local_cache_size)
+
+    @property
+    def use_local_cache(self) -> bool:
+        return bool(options.get("sentry-metrics.indexer.local-cache"))
+
+    def _set_local_many(self, key_values: Mapping[str, int], cache_namespace: str) -> None:
+        reverse = {}
+        for key, value in key_values.items():
+            org_id, string = key.split(":", 1)
+            reverse[(cache_namespace, int(org_id), value)] = string
+
+        self.local_cache.set_many({(cache_namespace, k): v for k, v in key_values.items()})
+        self.reverse_local_cache.set_many(reverse)
+
+    def _delete_local_many(self, keys: Sequence[str], cache_namespace: str) -> None:
+        local_keys = [(cache_namespace, key) for key in keys]
+        reverse_keys = []
+        for (_, key), value in self.local_cache.get_many(local_keys).items():
+            org_id, _string = key.split(":", 1)
+            reverse_keys.append((cache_namespace, int(org_id), value))
+
+        self.local_cache.delete_many(local_keys)
+        self.reverse_local_cache.delete_many(reverse_keys)
+
     @property
     def randomized_ttl(self) -> int:
         # introduce jitter in the cache_ttl so that when we have large
@@ -60,9 +102,19 @@ class StringIndexerCache:
         return formatted
 
     def get(self, key: str, cache_namespace: str) -> int:
+        use_local_cache = self.use_local_cache
+        if use_local_cache:
+            local_result: Optional[int] = self.local_cache.get((cache_namespace, key))
+            if local_result is not None:
+                metrics.incr(_INDEXER_LOCAL_CACHE_METRIC, tags={"cache_hit": "true"})
+                return local_result
+            metrics.incr(_INDEXER_LOCAL_CACHE_METRIC, tags={"cache_hit": "false"})
+
         result: int = self.cache.get(
             self.make_cache_key(key, cache_namespace), version=self.version
         )
+        if use_local_cache and result is not None:
+            self._set_local_many({key: result}, cache_namespace)
         return result
 
     def set(self, key: str, value: int, cache_namespace: str) -> None:
@@ -72,29 +124,77 @@ class StringIndexerCache:
             timeout=self.randomized_ttl,
             version=self.version,
         )
+        if self.use_local_cache:
+            self._set_local_many({key: value}, cache_namespace)
 
     def get_many(
         self, keys: Sequence[str], cache_namespace: str
     ) -> MutableMapping[str, Optional[int]]:
+        use_local_cache = self.use_local_cache
+        local_results: MutableMapping[str, Optional[int]] = {}
+        if use_local_cache:
+            local_results = {
+                key: value
+                for (_, key), value in self.local_cache.get_many(
+                    [(cache_namespace, key) for key in keys]
+                ).items()
+            }
+            metrics.incr(
+                _INDEXER_LOCAL_CACHE_METRIC, tags={"cache_hit": "true"}, amount=len(local_results)
+            )
+            metrics.incr(
+                _INDEXER_LOCAL_CACHE_METRIC,
+                tags={"cache_hit": "false"},
+                amount=len(keys) - len(local_results),
+            )
+            keys = [key for key in keys if key not in local_results]
+            if not keys:
+                return local_results
+
         cache_keys = {self.make_cache_key(key, cache_namespace): key for key in keys}
         results: Mapping[str, Optional[int]] = self.cache.get_many(
             cache_keys.keys(), version=self.version
         )
-        return self._format_results(keys, results, cache_namespace)
+        formatted = self._format_results(keys, results, cache_namespace)
+
+        if use_local_cache:
+            self._set_local_many(
+                {k: v for k, v in formatted.items() if v is not None}, cache_namespace
+            )
+            formatted.update(local_results)
+        return formatted
 
     def set_many(self, key_values: Mapping[str, int], cache_namespace: str) -> None:
         cache_key_values = {
             self.make_cache_key(k, cache_namespace): v for k, v in key_values.items()
         }
         self.cache.set_many(cache_key_values, timeout=self.randomized_ttl, version=self.version)
+        if self.use_local_cache:
+            self._set_local_many(key_values, cache_namespace)
+
+    def get_string(self, org_id: int, id: int, cache_namespace: str) -> Optional[str]:
+        """
+        Returns the string for an id if it is in the local cache. Ids are not
+        stored in the shared cache, this never makes a network call.
+        """
+        if not self.use_local_cache:
+            return None
+        result: Optional[str] = self.reverse_local_cache.get((cache_namespace, org_id, id))
+        return result
+
+    def set_string(self, org_id: int, id: int, string: str, cache_namespace: str) -> None:
+        if self.use_local_cache:
+            self._set_local_many({f"{org_id}:{string}": id}, cache_namespace)
 
     def delete(self, key: str, cache_namespace: str) -> None:
         cache_key = self.make_cache_key(key, cache_namespace)
         self.cache.delete(cache_key, version=self.version)
+        self._delete_local_many([key], cache_namespace)
 
     def delete_many(self, keys: Sequence[str], cache_namespace: str) -> None:
         cache_keys = [self.make_cache_key(key, cache_namespace) for key in keys]
         self.cache.delete_many(cache_keys, version=self.version)
+        self._delete_local_many(keys, cache_namespace)
 
 
 class CachingIndexer(StringIndexer):
@@ -166,4 +266,12 @@ class CachingIndexer(StringIndexer):
         return id
 
     def reverse_resolve(self, use_case_id: UseCaseKey, org_id: int, id: int) -> Optional[str]:
-        return self.indexer.reverse_resolve(use_case_id, org_id, id)
+        string = self.cache.get_string(org_id, id, use_case_id.value)
+        if string is not None:
+            return string
+
+        string = self.indexer.reverse_resolve(use_case_id, org_id, id)
+        if string is not None:
+            self.cache.set_string(org_id, id, string, use_case_id.value)
+
+        return string
@@ -13,6 +13,7 @@ from snuba_sdk.conditions import Condition, Op
 from snuba_sdk.function import Function
 from typing_extensions import TypedDict
 
+from sentry import options
 from sentry.discover.arithmetic import categorize_columns
 from sentry.models import Group
 from sentry.search.events.builder import (
@@ -29,6 +30,7 @@ from sentry.search.events.fields import (
     is_function,
 )
 from sentry.search.events.types import HistogramParams, ParamsType
+from sentry.snuba.timeseries_cache import get_bucketed_timeseries, get_query_fingerprint
 from sentry.tagstore.base import TOP_VALUES_DEFAULT_LIMIT
 from sentry.utils.dates import to_timestamp
 from sentry.utils.math import nice_int
@@ -248,34 +250,44 @@ def timeseries_query(
     """
     with sentry_sdk.start_span(op="discover.discover", description="timeseries.filter_transform"):
         equations, columns = categorize_columns(selected_columns)
+        base_builder_kwargs = {
+            "query": query,
+            "selected_columns": columns,
+            "equations": equations,
+            "functions_acl": functions_acl,
+            "has_metrics": has_metrics,
+        }
         base_builder = TimeseriesQueryBuilder(
-            Dataset.Discover,
-            params,
-            rollup,
-            query=query,
-            selected_columns=columns,
-            equations=equations,
-            functions_acl=functions_acl,
-            has_metrics=has_metrics,
+            Dataset.Discover, params, rollup, **base_builder_kwargs
         )
-        query_list = [base_builder]
+        query_list = [(base_builder, base_builder_kwargs)]
         if comparison_delta:
             if len(base_builder.aggregates) != 1:
                 raise InvalidSearchQuery("Only one column can be selected for comparison queries")
             comp_query_params = deepcopy(params)
             comp_query_params["start"] -= comparison_delta
             comp_query_params["end"] -= comparison_delta
+            comparison_builder_kwargs = {
+                "query": query,
+                "selected_columns": columns,
+                "equations": equations,
+            }
             comparison_builder = TimeseriesQueryBuilder(
-                Dataset.Discover,
-                comp_query_params,
-                rollup,
-                query=query,
-                selected_columns=columns,
-                equations=equations,
+                Dataset.Discover, comp_query_params, rollup, **comparison_builder_kwargs
             )
-            query_list.append(comparison_builder)
-
-        query_results = bulk_snql_query([query.get_snql_query() for query in query_list], referrer)
+            query_list.append((comparison_builder, comparison_builder_kwargs))
+
+        # Results are cached by time bucket for some referrers, see `sentry.snuba.timeseries_cache`
+        if _uses_timeseries_cache(referrer):
+            query_results = [
+                _cached_timeseries_query(builder, rollup, builder_kwargs, referrer)
+                for builder, builder_kwargs in query_list
+            ]
+        else:
+            query_results = bulk_snql_query(
+                [builder.get_snql_query() for builder, _ in query_list], referrer
+            )
+        query_list = [builder for builder, _ in query_list]
 
     with sentry_sdk.start_span(op="discover.discover", description="timeseries.transform_results"):
         results = []
@@ -323,6 +335,33 @@ def timeseries_query(
     )
 
 
+def _uses_timeseries_cache(referrer: Optional[str]) -> bool:
+    if not referrer:
+        return False
+    return any(
+        referrer.startswith(prefix) for prefix in options.get("snuba.timeseries-cache.referrers")
+    )
+
+
+def _cached_timeseries_query(builder, rollup, builder_kwargs, referrer):
+    """Runs the query of a `TimeseriesQueryBuilder` through the bucket cache."""
+    params = builder.params
+    fingerprint = get_query_fingerprint(
+        params, dataset=Dataset.Discover.value, rollup=rollup, **builder_kwargs
+    )
+
+    def run_queries(ranges):
+        builders = []
+        for start, end in ranges:
+            range_params = dict(params, start=start, end=end)
+            builders.append(
+                TimeseriesQueryBuilder(Dataset.Discover, range_params, rollup, **builder_kwargs)
+            )
+        return bulk_snql_query([b.get_snql_query() for b in builders], referrer)
+
+    return get_bucketed_timeseries(fingerprint, params["start"], params["end"], rollup, run_queries)
+
+
 def create_result_key(result_row, fields, issues) -> str:
     values = []
     for field in fields:
@@ -0,0 +1,191 @@
+"""
+Cache for time-series query results by rollup bucket.
+
+Rows of a time-series query only depend on the data within their bucket, so
+the result for a time range can be stitched together from the results of
+adjacent sub-ranges split at bucket boundaries. Buckets that have been closed
+for a while are not going to change anymore (modulo very late data), which
+means that when a chart over the last 90 days is refreshed, only the newest
+buckets need to be queried again.
+
+``get_bucketed_timeseries`` keeps the rows of every closed bucket in the
+cache, keyed by a fingerprint of the query without its time range. Snuba is
+only queried for the ranges that are not cached: the buckets that are still
+open, buckets that have not been queried before, and the partial bucket at
+the start of a range that does not start at a bucket boundary. All of them
+are sent in a single bulk request.
+"""
+
+from __future__ import annotations
+
+import math
+from datetime import datetime, timedelta
+from hashlib import sha1
+from typing import Any, Callable, List, Mapping, MutableMapping, Sequence, Tuple
+
+import pytz
+from dateutil.parser import parse as parse_datetime
+from django.conf import settings
+from django.core.cache import cache
+
+from sentry.utils import json, metrics
+from sentry.utils.dates import to_timestamp
+from sentry.utils.snuba import naiveify_datetime, quantize_time, to_naive_timestamp
+
+__all__ = ("get_bucketed_timeseries", "get_query_fingerprint")
+
+# Results of one query per time range, in the format returned by Snuba.
+RunQueries = Callable[[Sequence[Tuple[datetime, datetime]]], Sequence[Mapping[str, Any]]]
+
+
+def get_query_fingerprint(params: Mapping[str, Any], **query: Any) -> str:
+    """
+    Fingerprint of a query, ignoring its time range. ``params`` are the
+    filter params of the query, ``query`` everything else that determines its
+    result (columns, conditions, rollup, ...).
+
+    Params that are not plain values (such as ``project_objects``) are
+    skipped, they mirror ids that are part of the params already.
+    """
+    hashable = {
+        key: value
+        for key, value in params.items()
+        if key not in ("start", "end") and _is_plain(value)
+    }
+    payload = json.dumps({"params": hashable, "query": query}, sort_keys=True, default=str)
+    return sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _is_plain(value: Any) -> bool:
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return all(_is_plain(v) for v in value)
+    return value is None or isinstance(value, (str, int, float, bool))
+
+
+def _get_bucket_cache_key(fingerprint: str, rollup: int, bucket: int) -> str:
+    # sqtc - Snuba Query Timeseries Cache
+    return f"sqtc:{fingerprint}:{rollup}:{bucket}"
+
+
+def _get_meta_cache_key(fingerprint: str) -> str:
+    return f"sqtc:{fingerprint}:meta"
+
+
+def _get_row_time(row: Mapping[str, Any]) -> int:
+    # SnQL returns times as strings, see `zerofill` in sentry.snuba.discover.
+    # Rows are returned as Snuba returned them, so they are not modified.
+    if isinstance(row["time"], str):
+        return int(to_timestamp(parse_datetime(row["time"])))
+    return int(row["time"])
+
+
+def _to_datetime(timestamp: int, like: datetime) -> datetime:
+    rv = datetime.fromtimestamp(timestamp, tz=pytz.utc)
+    if like.tzinfo is None:
+        rv = rv.replace(tzinfo=None)
+    return rv
+
+
+def get_bucketed_timeseries(
+    fingerprint: str,
+    start: datetime,
+    end: datetime,
+    rollup: int,
+    run_queries: RunQueries,
+) -> Mapping[str, Any]:
+    """
+    Returns the result of a time-series query for ``start`` to ``end``, in
+    the same format as a single Snuba query over the whole range, with rows
+    ordered by time.
+
+    ``run_queries`` gets a list of ``(start, end)`` ranges and has to run the
+    query for each of them.
+    """
+    start_ts = int(to_naive_timestamp(naiveify_datetime(start)))
+    end_ts = int(math.ceil(to_naive_timestamp(naiveify_datetime(end))))
+
+    # Buckets are closed once they have settled. The cutoff moves in steps
+    # (per fingerprint, see `quantize_time`), so that concurrent refreshes
+    # split their queries the same way.
+    settled = datetime.utcnow() - timedelta(
+        seconds=settings.SENTRY_SNUBA_TIMESERIES_CACHE_SETTLE_SECONDS
+    )
+    settled_ts = int(to_naive_timestamp(quantize_time(settled, int(fingerprint[:8], 16))))
+
+    first_bucket = int(math.ceil(start_ts / rollup)) * rollup
+    closed_end = min(end_ts, settled_ts) // rollup * rollup
+    buckets = list(range(first_bucket, closed_end, rollup))
+    if not buckets:
+        return run_queries([(start, end)])[0]
+
+    cache_keys = {bucket: _get_bucket_cache_key(fingerprint, rollup, bucket) for bucket in buckets}
+    meta_key = _get_meta_cache_key(fingerprint)
+    cached = cache.get_many([*cache_keys.values(), meta_key])
+    missing = {bucket for bucket, key in cache_keys.items() if key not in cached}
+
+    metrics.incr("snuba.timeseries_cache.hit", amount=len(buckets) - len(missing))
+    metrics.incr("snuba.timeseries_cache.miss", amount=len(missing))
+
+    # Contiguous ranges to query, as [start, end) timestamps.
+    ranges: List[List[int]] = []
+
+    def add_range(range_start: int, range_end: int) -> None:
+        if range_start >= range_end:
+            return
+        if ranges and ranges[-1][1] == range_start:
+            ranges[-1][1] = range_end
+        else:
+            ranges.append([range_start, range_end])
+
+    add_range(start_ts, first_bucket)
+    for bucket in buckets:
+        if bucket in missing:
+            add_range(bucket, bucket + rollup)
+    add_range(closed_end, end_ts)
+
+    # Without a meta we cannot answer from the cache alone.
+    if not ranges and meta_key not in cached:
+        ranges.append([start_ts, end_ts])
+
+    query_ranges = [
+        (
+            start if range_start == start_ts else _to_datetime(range_start, start),
+            end if range_end == end_ts else _to_datetime(range_end, end),
+        )
+        for range_start, range_end in ranges
+    ]
+    results = run_queries(query_ranges) if query_ranges else []
+
+    data: List[Tuple[int, MutableMapping[str, Any]]] = []
+    for bucket in buckets:
+        if bucket not in missing:
+            data.extend((bucket, row) for row in json.loads(cached[cache_keys[bucket]]))
+
+    rows_by_bucket: MutableMapping[int, List[MutableMapping[str, Any]]] = {
+        bucket: [] for bucket in missing
+    }
+    for result in results:
+        for row in result["data"]:
+            time = _get_row_time(row)
+            if time in rows_by_bucket:
+                rows_by_bucket[time].append(row)
+            elif time not in cache_keys:
+                data.append((time, row))
+            # Otherwise the bucket has been returned from the cache already
+
+    for bucket, bucket_rows in rows_by_bucket.items():
+        data.extend((bucket, row) for row in bucket_rows)
+
+    to_cache = {
+        cache_keys[bucket]: json.dumps(bucket_rows)
+        for bucket, bucket_rows in rows_by_bucket.items()
+    }
+    if results:
+        meta = results[0]["meta"]
+        to_cache[meta_key] = json.dumps(meta)
+    else:
+        meta = json.loads(cached[meta_key])
+    cache.set_many(to_cache, settings.SENTRY_SNUBA_TIMESERIES_CACHE_TTL_SECONDS)
+
+    data.sort(key=lambda item: item[0])
+    return {"data": [row for _, row in data], "meta": meta}
@@ -1,3 +1,4 @@
+import copy
 import logging
 from collections import namedtuple
 from datetime import datetime
@@ -7,12 +8,25 @@ from django.utils import timezone
 
 from sentry.models import Project, Release
 from sentry.stacktraces.functions import set_in_app, trim_function_name
+from sentry.utils import metrics
 from sentry.utils.cache import cache
+from sentry.utils.datastructures import LRUCache
 from sentry.utils.hashlib import hash_values
 from sentry.utils.safe import get_path, safe_execute
 
 logger = logging.getLogger(__name__)
 
+FRAME_CACHE_TIMEOUT = 3600
+# Frames that could not be resolved are cached for a shorter time, so that
+# they are retried soon after e.g. missing debug files have been uploaded.
+FRAME_CACHE_UNRESOLVED_TIMEOUT = 300
+# Stored in the cache for frames that could not be resolved.
+FRAME_CACHE_UNRESOLVED = "__unresolved__"
+
+# The hottest frames are additionally cached in every process, for a short
+# time only, as other processes may update them.
+_local_frame_cache = LRUCache(1000, ttl=60)
+
 StacktraceInfo = namedtuple(
     "StacktraceInfo", ["stacktrace", "container", "platforms", "is_exception"]
 )
@@ -22,6 +36,27 @@ StacktraceInfo.__ne__ = lambda a, b: a is not b
 
 
 class ProcessableFrame:
+    """
+    A frame of a stacktrace that a processor handles.
+
+    Processors can opt into the frame cache by setting a cache key in
+    ``preprocess_frame`` with ``set_cache_key_from_values``. The cache is
+    looked up for all frames before any of them are processed:
+
+    - ``cache_hit`` is ``False`` and ``cache_value`` is ``None`` if the frame
+      is not cached. The processor resolves the frame, and caches the result
+      with ``set_cache_value``.
+    - ``cache_hit`` is ``True`` and ``cache_value`` is the cached value if it
+      has been resolved before.
+    - ``cache_hit`` is ``True`` and ``cache_value`` is ``None`` if it has been
+      cached as unresolved with ``set_cache_value(None)``. The processor
+      should not try to resolve the frame again.
+
+    Processors therefore have to check ``cache_hit``, not ``cache_value``, to
+    tell whether a frame is cached. Frames that should not be cached must not
+    call ``set_cache_value`` at all.
+    """
+
     def __init__(self, frame, idx, processor, stacktrace_info, processable_frames):
         self.frame = frame
         self.idx = idx
@@ -30,6 +65,8 @@ class ProcessableFrame:
         self.data = None
         self.cache_key = None
         self.cache_value = None
+        self.cache_hit = False
+        self.pending_cache_value = None
         self.processable_frames = processable_frames
 
     def __repr__(self):
@@ -63,8 +100,16 @@ class ProcessableFrame:
         return self.processable_frames[last_idx]
 
     def set_cache_value(self, value):
+        """
+        Caches ``value`` for the frame, or caches the frame as unresolved if
+        ``value`` is ``None`` (see the class docstring). Values are written
+        when processing finishes, see
+        ``StacktraceProcessingTask.flush_frame_cache``.
+        """
         if self.cache_key is not None:
-            cache.set(self.cache_key, value, 3600)
+            if value is None:
+                value = FRAME_CACHE_UNRESOLVED
+            self.pending_cache_value = value
             return True
         return False
 
@@ -99,6 +144,19 @@ class StacktraceProcessingTask:
                 if processor is None or frame.processor == processor:
                     yield frame
 
+    def flush_frame_cache(self):
+        """
+        Writes the cache values that have been set for all frames in bulk.
+        """
+        items = {}
+        for frame in self.iter_processable_frames():
+            if frame.pending_cache_value is not None:
+                items[frame.cache_key] = frame.pending_cache_value
+                frame.pending_cache_value = None
+
+        if items:
+            store_frame_cache(items)
+
 
 class StacktraceProcessor:
     def __init__(self, data, stacktrace_infos, project=None):
@@ -441,12 +499,42 @@ def get_crash_frame_from_event_data(data, frame_filter=None):
 
 
 def lookup_frame_cache(keys):
-    rv = {}
-    for key in keys:
-        rv[key] = cache.get(key)
+    """
+    Returns the cached values for all frame cache ``keys`` that are cached,
+    from the local cache if possible and otherwise with one round trip.
+    Frames that are cached as unresolved map to ``FRAME_CACHE_UNRESOLVED``.
+    """
+    rv = {key: copy.deepcopy(value) for key, value in _local_frame_cache.get_many(keys).items()}
+
+    missing = [key for key in keys if key not in rv]
+    if missing:
+        remote = {key: value for key, value in cache.get_many(missing).items() if value is not None}
+        _local_frame_cache.set_many({key: copy.deepcopy(value) for key, value in remote.items()})
+        rv.update(remote)
+
     return rv
 
 
+def store_frame_cache(items):
+    """
+    Caches the values of frame cache keys in ``items``. Frames whose value is
+    ``FRAME_CACHE_UNRESOLVED`` are cached for a shorter time.
+    """
+    resolved = {}
+    unresolved = {}
+    for key, value in items.items():
+        if value == FRAME_CACHE_UNRESOLVED:
+            unresolved[key] = value
+        else:
+            resolved[key] = value
+
+    if resolved:
+        cache.set_many(resolved, FRAME_CACHE_TIMEOUT)
+    if unresolved:
+        cache.set_many(unresolved, FRAME_CACHE_UNRESOLVED_TIMEOUT)
+    _local_frame_cache.set_many({key: copy.deepcopy(value) for key, value in items.items()})
+
+
 def get_stacktrace_processing_task(infos, processors):
     """Returns a list of all tasks for the processors.  This can skip over
     processors that seem to not handle any frames.
@@ -468,11 +556,34 @@ def get_stacktrace_processing_task(infos, processors):
                 processable_frame
             )
             if processable_frame.cache_key is not None:
-                to_lookup[processable_frame.cache_key] = processable_frame
-
-    frame_cache = lookup_frame_cache(to_lookup)
-    for cache_key, processable_frame in to_lookup.items():
-        processable_frame.cache_value = frame_cache.get(cache_key)
+                to_lookup.setdefault(processable_frame.cache_key, []).append(processable_frame)
+
+    if to_lookup:
+        frame_cache = lookup_frame_cache(list(to_lookup))
+        hits = {}
+        for cache_key, processable_frames in to_lookup.items():
+            value = frame_cache.get(cache_key)
+            if value is None:
+                result = "miss"
+            elif value == FRAME_CACHE_UNRESOLVED:
+                result = "unresolved"
+                value = None
+            else:
+                result = "hit"
+
+            for processable_frame in processable_frames:
+                processable_frame.cache_hit = result != "miss"
+                processable_frame.cache_value = value
+                processor_name = processable_frame.processor.__class__.__name__
+                hits.setdefault((processor_name, result), 0)
+                hits[processor_name, result] += 1
+
+        for (processor_name, result), count in hits.items():
+            metrics.incr(
+                "stacktraces.frame_cache",
+                amount=count,
+                tags={"processor": processor_name, "result": result},
+            )
 
     return StacktraceProcessingTask(
         processable_stacktraces=by_stacktrace_info, processors=by_processor
@@ -565,6 +676,10 @@ def process_stacktraces(data, make_processors=None, set_raw_stacktrace=True):
     finally:
         for processor in processors:
             processor.close()
+        try:
+            processing_task.flush_frame_cache()
+        except Exception:
+            logger.exception("stacktraces.processing.frame_cache")
         processing_task.close()
 
     if changed:
@@ -9,6 +9,7 @@ from django.utils import timezone
 from sentry.exceptions import DeleteAborted
 from sentry.signals import pending_delete
 from sentry.tasks.base import instrumented_task, retry, track_group_async_operation
+from sentry.utils import metrics
 
 logger = logging.getLogger("sentry.deletions.api")
 
@@ -134,7 +135,7 @@ def run_deletion(deletion_id, first_pass=True):
 @retry(exclude=(DeleteAborted,))
 @track_group_async_operation
 def delete_groups(object_ids, transaction_id=None, eventstream_state=None, **kwargs):
-    from sentry import deletions, eventstream
+    from sentry import deletions, eventstream, options
     from sentry.models import Group
 
     logger.info(
@@ -147,13 +148,19 @@ def delete_groups(object_ids, transaction_id=None, eventstream_state=None, **kwa
 
     transaction_id = transaction_id or uuid4().hex
 
-    max_batch_size = 100
+    max_batch_size = options.get("deletions.groups.batch-size")
     current_batch, rest = object_ids[:max_batch_size], object_ids[max_batch_size:]
 
     task = deletions.get(
-        model=Group, query={"id__in": current_batch}, transaction_id=transaction_id
+        model=Group,
+        query={"id__in": current_batch},
+        transaction_id=transaction_id,
+        chunk_size=max_batch_size,
     )
     has_more = task.chunk()
+    if not has_more:
+        metrics.incr("deletions.groups.deleted", amount=len(current_batch))
+    metrics.timing("deletions.groups.remaining", len(object_ids if has_more else rest))
     if has_more or rest:
         delete_groups.apply_async(
             kwargs={
@@ -29,6 +29,7 @@ def merge_groups(
     **kwargs,
 ):
     # TODO(mattrobenolt): Write tests for all of this
+    from sentry.grouping.grouphash_cache import invalidate_grouphash_cache
     from sentry.models import (
         Activity,
         Environment,
@@ -103,6 +104,7 @@ def merge_groups(
         has_more = merge_objects(
             model_list, group, new_group, logger=logger, transaction_id=transaction_id
         )
+        invalidate_grouphash_cache(group.project_id)
 
         if not has_more:
             # There are no more objects to merge for *this* "from" group, remove it
@@ -6,7 +6,7 @@ from typing import TYPE_CHECKING, Mapping, Optional, Sequence, Tuple, TypedDict,
 import sentry_sdk
 from django.conf import settings
 
-from sentry import features
+from sentry import features, options
 from sentry.exceptions import PluginError
 from sentry.killswitches import killswitch_matches_context
 from sentry.signals import event_processed, issue_unignored, transaction_processed
@@ -569,13 +569,39 @@ def process_snoozes(job: PostProcessJob) -> None:
     return
 
 
+def _count_group_event(group_event: GroupEvent, is_reprocessed: bool) -> None:
+    from sentry.models import Environment
+    from sentry.rules.frequency_counters import incr_group_event_count, reset_group_event_count
+
+    # The counters of a group can only answer frequency conditions while all of
+    # its events are counted.
+    if is_reprocessed or not options.get("rules.frequency-counters"):
+        reset_group_event_count(group_event.group_id)
+        return
+
+    try:
+        environment_id = group_event.get_environment().id
+    except Environment.DoesNotExist:
+        environment_id = None
+
+    try:
+        incr_group_event_count(group_event.group_id, environment_id, group_event.datetime)
+    except Exception:
+        reset_group_event_count(group_event.group_id)
+        raise
+
+
 def process_rules(job: PostProcessJob) -> None:
+    group_event = job["event"]
+
+    # Count the event before evaluating rules, frequency conditions include it
+    safe_execute(_count_group_event, group_event, job["is_reprocessed"], _with_transaction=False)
+
     if job["is_reprocessed"]:
         return
 
     from sentry.rules.processor import RuleProcessor
 
-    group_event = job["event"]
     is_new = job["group_state"]["is_new"]
     is_regression = job["group_state"]["is_regression"]
     is_new_group_environment = job["group_state"]["is_new_group_environment"]
@@ -1,5 +1,6 @@
 import logging
 import time
+from collections import defaultdict
 
 import sentry_sdk
 
@@ -119,38 +120,14 @@ def compute_configs(organization_id=None, project_id=None, public_key=None):
         # it could be possible that refrequent invalidations cause the task to take excessive time
         # to complete.
         for organization in Organization.objects.filter(id=organization_id):
-            for project in Project.objects.filter(organization_id=organization_id):
+            projects = list(Project.objects.filter(organization_id=organization_id))
+            for project in projects:
                 project.set_cached_field_value("organization", organization)
-                for key in ProjectKey.objects.filter(project_id=project.id):
-                    key.set_cached_field_value("project", project)
-                    # If we find the config in the cache it means it was active.  As such we want to
-                    # recalculate it.  If the config was not there at all, we leave it and avoid the
-                    # cost of re-computation.
-                    if projectconfig_cache.get(key.public_key) is not None:
-                        configs[key.public_key] = compute_projectkey_config(key)
-                        action = "recompute"
-                    else:
-                        action = "not-cached"
-                    metrics.incr(
-                        "relay.projectconfig_cache.invalidation.recompute",
-                        tags={"action": action, "scope": "organization"},
-                    )
+            configs.update(compute_projects_configs(projects, scope="organization"))
     elif project_id:
-        for project in Project.objects.filter(id=project_id):
-            for key in ProjectKey.objects.filter(project_id=project_id):
-                key.set_cached_field_value("project", project)
-                # If we find the config in the cache it means it was active.  As such we want to
-                # recalculate it.  If the config was not there at all, we leave it and avoid the
-                # cost of re-computation.
-                if projectconfig_cache.get(key.public_key) is not None:
-                    configs[key.public_key] = compute_projectkey_config(key)
-                    action = "recompute"
-                else:
-                    action = "not-cached"
-                    metrics.incr(
-                        "relay.projectconfig_cache.invalidation.recompute",
-                        tags={"action": action, "scope": "project"},
-                    )
+        configs.update(
+            compute_projects_configs(Project.objects.filter(id=project_id), scope="project")
+        )
     elif public_key:
         try:
             key = ProjectKey.objects.get(public_key=public_key)
@@ -173,6 +150,66 @@ def compute_configs(organization_id=None, project_id=None, public_key=None):
     return configs
 
 
+def compute_projects_configs(projects, scope):
+    """Recomputes the cached configs of all keys of the given projects.
+
+    Keys are fetched for all projects at once, and so are the configs in the
+    cache and the project options.  The parts of the configs which are shared
+    by the keys of a project are only computed once.
+
+    :param scope: The scope of the invalidation, used to tag metrics.
+    :returns: A dict mapping public keys to their config, see :func:`compute_configs`.
+    """
+    from sentry.models import ProjectKey, ProjectOption
+
+    projects = {project.id: project for project in projects}
+    keys = list(ProjectKey.objects.filter(project_id__in=projects.keys()))
+    if not keys:
+        return {}
+
+    # If we find the config in the cache it means it was active.  As such we want to
+    # recalculate it.  If the config was not there at all, we leave it and avoid the
+    # cost of re-computation.
+    cached = projectconfig_cache.get_many([key.public_key for key in keys])
+    keys_by_project = defaultdict(list)
+    for key in keys:
+        if cached.get(key.public_key) is not None:
+            key.set_cached_field_value("project", projects[key.project_id])
+            keys_by_project[key.project_id].append(key)
+
+    num_recomputed = sum(len(project_keys) for project_keys in keys_by_project.values())
+    num_not_cached = len(keys) - num_recomputed
+    for action, amount in (("recompute", num_recomputed), ("not-cached", num_not_cached)):
+        if amount:
+            metrics.incr(
+                "relay.projectconfig_cache.invalidation.recompute",
+                amount=amount,
+                tags={"action": action, "scope": scope},
+            )
+
+    ProjectOption.objects.populate_cache([projects[project_id] for project_id in keys_by_project])
+
+    configs = {}
+    for project_id, project_keys in keys_by_project.items():
+        configs.update(compute_projectkey_configs(projects[project_id], project_keys))
+    return configs
+
+
+def compute_projectkey_configs(project, keys):
+    """Computes the configs of several :class:`ProjectKey` of the same project.
+
+    :returns: A dict mapping public keys to their config.
+    """
+    from sentry.models import ProjectKeyStatus
+    from sentry.relay.config import get_project_configs
+
+    configs = {key.public_key: {"disabled": True} for key in keys}
+    active_keys = [key for key in keys if key.status == ProjectKeyStatus.ACTIVE]
+    for public_key, config in get_project_configs(project, active_keys, full_config=True).items():
+        configs[public_key] = config.to_dict()
+    return configs
+
+
 def compute_projectkey_config(key):
     """Computes a single config for the given :class:`ProjectKey`.
 
@@ -1,9 +1,10 @@
 import logging
 from datetime import datetime
 from time import time
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence
 
 import sentry_sdk
+from celery.exceptions import SoftTimeLimitExceeded
 from django.conf import settings
 from django.utils import timezone
 from sentry_relay.processing import StoreNormalizer
@@ -812,6 +813,36 @@ def save_event_transaction(
     _do_save_event(cache_key, data, start_time, event_id, project_id, **kwargs)
 
 
+@instrumented_task(  # type: ignore
+    name="sentry.tasks.store.save_event_transactions",
+    queue="events.save_event_transaction",
+    time_limit=185,
+    soft_time_limit=180,
+)
+def save_event_transactions(events: Sequence[Mapping[str, Any]], **kwargs: Any) -> None:
+    """
+    Saves a batch of transactions dispatched together by the ingest consumer.
+    Each item holds the arguments of ``save_event_transaction``. Transactions
+    that have not been started when the task runs out of time are saved by
+    another task.
+    """
+    for i, event in enumerate(events):
+        try:
+            _do_save_event(**event)
+        except SoftTimeLimitExceeded:
+            remaining = events[i + 1 :]
+            if remaining:
+                save_event_transactions.delay(events=remaining)
+                metrics.incr("tasks.store.save_event_transactions.requeued", amount=len(remaining))
+            raise
+        except Exception:
+            # Do not lose the rest of the batch because of one transaction.
+            error_logger.exception(
+                "tasks.store.save_event_transactions.error",
+                extra={"event_id": event.get("event_id")},
+            )
+
+
 @instrumented_task(  # type: ignore
     name="sentry.tasks.store.save_event_attachments",
     queue="events.save_event_attachments",
@@ -8,6 +8,7 @@ from django.db import transaction
 from sentry import eventstore, similarity, tsdb
 from sentry.constants import DEFAULT_LOGGER_NAME, LOG_LEVELS_MAP
 from sentry.event_manager import generate_culprit
+from sentry.grouping.grouphash_cache import invalidate_grouphash_cache
 from sentry.models import (
     Activity,
     Environment,
@@ -450,6 +451,7 @@ def lock_hashes(project_id, source_id, fingerprints):
             state=GroupHash.State.LOCKED_IN_MIGRATION
         )
 
+    invalidate_grouphash_cache(project_id)
     return [h.hash for h in eligible_hashes]
 
 
@@ -459,6 +461,7 @@ def unlock_hashes(project_id, locked_primary_hashes):
         hash__in=locked_primary_hashes,
         state=GroupHash.State.LOCKED_IN_MIGRATION,
     ).update(state=GroupHash.State.UNLOCKED)
+    invalidate_grouphash_cache(project_id)
 
 
 @instrumented_task(name="sentry.tasks.unmerge", queue="unmerge")
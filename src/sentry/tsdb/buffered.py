@@ -0,0 +1,342 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+from celery.signals import worker_process_shutdown
+from django.utils import timezone
+
+from sentry.tsdb.base import BaseTSDB
+from sentry.utils import metrics
+from sentry.utils.imports import import_string
+
+logger = logging.getLogger(__name__)
+
+# Methods that are passed through to the wrapped backend. Writes that depend
+# on data that has already been written see the pending writes flushed first.
+PASSTHROUGH = 0
+FLUSH_PENDING = 1
+
+method_specifications = {
+    "get_range": PASSTHROUGH,
+    "get_sums": PASSTHROUGH,
+    "get_distinct_counts_series": PASSTHROUGH,
+    "get_distinct_counts_totals": PASSTHROUGH,
+    "get_distinct_counts_union": PASSTHROUGH,
+    "get_most_frequent": PASSTHROUGH,
+    "get_most_frequent_series": PASSTHROUGH,
+    "get_frequency_series": PASSTHROUGH,
+    "get_frequency_totals": PASSTHROUGH,
+    "merge": FLUSH_PENDING,
+    "delete": FLUSH_PENDING,
+    "merge_distinct_counts": FLUSH_PENDING,
+    "delete_distinct_counts": FLUSH_PENDING,
+    "merge_frequencies": FLUSH_PENDING,
+    "delete_frequencies": FLUSH_PENDING,
+}
+
+
+def make_method(key, flush_pending):
+    def method(self, *a, **kw):
+        if flush_pending:
+            self.flush_pending()
+        return getattr(self.backend, key)(*a, **kw)
+
+    method.__name__ = key
+    return method
+
+
+class BufferedTSDBMeta(type):
+    def __new__(cls, name, bases, attrs):
+        for key, spec in method_specifications.items():
+            attrs[key] = make_method(key, spec == FLUSH_PENDING)
+        return type.__new__(cls, name, bases, attrs)
+
+
+class BufferedTSDB(BaseTSDB, metaclass=BufferedTSDBMeta):
+    def __init__(
+        self,
+        backend="sentry.tsdb.redis.RedisTSDB",
+        backend_options=None,
+        flush_interval=1.0,
+        max_pending=10000,
+        **options,
+    ):
+        """
+        A TSDB backend that coalesces writes in memory before passing them to
+        the wrapped ``backend``.
+
+        Most writes are ``+1`` increments of the same few counters, and unique
+        values or frequency table items of the same few keys. This backend
+        accumulates them per process: counter increments that end up in the
+        same rollup buckets are summed up, distinct counter values are merged
+        into a set, and frequency table scores are summed up. Pending writes
+        are flushed with one ``incr_multi``, ``record_multi`` and
+        ``record_frequency_multi`` call for each environment (and time bucket,
+        for the latter two) every ``flush_interval`` seconds by a background
+        thread, once there are ``max_pending`` entries, and when the process
+        or worker process exits.
+
+        Writes that fail to be flushed are kept and retried with the next
+        flush, unless more than ``max_retained`` entries are pending.
+
+        Reads are passed through and do not see writes that are still
+        pending. Merges and deletions flush the pending writes first.
+        """
+        self.backend = import_string(backend)(**(backend_options or {}))
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_retained = max_pending * 10
+        super().__init__(**options)
+        # Writes are bucketed by the rollups they are eventually written with
+        self.rollups = self.backend.rollups
+
+        self.__lock = threading.Lock()
+        self.__flusher_pid = None
+        self.__retry_after = 0
+        self.__reset()
+        atexit.register(self.flush_pending)
+        # Celery worker processes exit with `os._exit`, which skips `atexit`.
+        worker_process_shutdown.connect(self.__on_worker_process_shutdown, weak=False)
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self.__after_fork)
+
+    def __reset(self):
+        # environment_id -> (model, key, buckets) -> [timestamp, count]
+        self.__counters = defaultdict(dict)
+        # (environment_id, buckets) -> [timestamp, {(model, key): values}]
+        self.__distinct_counters = {}
+        # (environment_id, buckets) -> [timestamp, {model: {key: {item: score}}}]
+        self.__frequencies = {}
+        self.__pending = 0
+        self.__last_flush = time.monotonic()
+
+    def __after_fork(self):
+        # Writes of the parent are flushed by the parent.
+        self.__lock = threading.Lock()
+        self.__reset()
+
+    def __on_worker_process_shutdown(self, **kwargs):
+        self.flush_pending()
+
+    def __ensure_flusher(self):
+        """
+        Starts the thread that flushes pending writes periodically, once in
+        every process.
+        """
+        pid = os.getpid()
+        if self.__flusher_pid == pid:
+            return
+
+        with self.__lock:
+            if self.__flusher_pid == pid:
+                return
+            self.__flusher_pid = pid
+
+        thread = threading.Thread(
+            target=self.__run_flusher, name="sentry.tsdb.buffered.flush", daemon=True
+        )
+        thread.start()
+
+    def __run_flusher(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush_pending()
+
+    def validate(self):
+        self.backend.validate()
+
+    def get_buckets(self, timestamp):
+        """
+        Returns the epochs of ``timestamp`` for every rollup. Writes with the
+        same buckets go to the same keys and expire at the same time, so they
+        can be combined.
+        """
+        return tuple(self.normalize_to_epoch(timestamp, rollup) for rollup in self.rollups)
+
+    def incr(self, model, key, timestamp=None, count=1, environment_id=None):
+        self.incr_multi([(model, key)], timestamp, count, environment_id)
+
+    def incr_multi(self, items, timestamp=None, count=1, environment_id=None):
+        self.validate_arguments([item[0] for item in items], [environment_id])
+
+        if timestamp is None:
+            timestamp = timezone.now()
+
+        with self.__lock:
+            counters = self.__counters[environment_id]
+            for item in items:
+                if len(item) == 2:
+                    model, key = item
+                    options = {}
+                else:
+                    model, key, options = item
+
+                item_timestamp = options.get("timestamp", timestamp)
+                counter_key = (model, key, self.get_buckets(item_timestamp))
+                counter = counters.get(counter_key)
+                if counter is None:
+                    counters[counter_key] = [item_timestamp, options.get("count", count)]
+                    self.__pending += 1
+                else:
+                    counter[1] += options.get("count", count)
+
+        self.__maybe_flush()
+
+    def record(self, model, key, values, timestamp=None, environment_id=None):
+        self.record_multi(((model, key, values),), timestamp, environment_id)
+
+    def record_multi(self, items, timestamp=None, environment_id=None):
+        self.validate_arguments([model for model, key, values in items], [environment_id])
+
+        if timestamp is None:
+            timestamp = timezone.now()
+
+        with self.__lock:
+            group_key = (environment_id, self.get_buckets(timestamp))
+            pending = self.__distinct_counters.setdefault(group_key, [timestamp, {}])[1]
+            for model, key, values in items:
+                pending_values = pending.get((model, key))
+                if pending_values is None:
+                    pending_values = pending[(model, key)] = set()
+                    self.__pending += 1
+                pending_values.update(values)
+
+        self.__maybe_flush()
+
+    def record_frequency_multi(self, requests, timestamp=None, environment_id=None):
+        self.validate_arguments([model for model, request in requests], [environment_id])
+
+        if timestamp is None:
+            timestamp = timezone.now()
+
+        with self.__lock:
+            group_key = (environment_id, self.get_buckets(timestamp))
+            pending = self.__frequencies.setdefault(group_key, [timestamp, {}])[1]
+            for model, request in requests:
+                pending_keys = pending.setdefault(model, {})
+                for key, items in request.items():
+                    pending_items = pending_keys.get(key)
+                    if pending_items is None:
+                        pending_items = pending_keys[key] = defaultdict(int)
+                        self.__pending += 1
+                    for item, score in items.items():
+                        pending_items[item] += score
+
+        self.__maybe_flush()
+
+    def __maybe_flush(self):
+        self.__ensure_flusher()
+
+        now = time.monotonic()
+        if now < self.__retry_after:
+            # The last flush failed, don't retry it with every write.
+            return
+
+        if self.__pending >= self.max_pending or now - self.__last_flush >= self.flush_interval:
+            self.flush_pending()
+
+    def flush_pending(self):
+        """
+        Writes all pending writes to the wrapped backend. Writes that fail are
+        logged and kept for the next flush.
+        """
+        with self.__lock:
+            counters = self.__counters
+            distinct_counters = self.__distinct_counters
+            frequencies = self.__frequencies
+            pending = self.__pending
+            self.__reset()
+
+        if not pending:
+            return
+
+        metrics.timing("tsdb.buffered.flush-size", pending)
+
+        # Batches are removed once they have been written, so that only the
+        # remaining ones are kept if writing fails.
+        try:
+            with metrics.timer("tsdb.buffered.flush"):
+                for environment_id in list(counters):
+                    items = counters[environment_id]
+                    self.backend.incr_multi(
+                        [
+                            (model, key, {"timestamp": timestamp, "count": count})
+                            for (model, key, _), (timestamp, count) in items.items()
+                        ],
+                        environment_id=environment_id,
+                    )
+                    del counters[environment_id]
+
+                for group_key in list(distinct_counters):
+                    timestamp, items = distinct_counters[group_key]
+                    self.backend.record_multi(
+                        [(model, key, values) for (model, key), values in items.items()],
+                        timestamp=timestamp,
+                        environment_id=group_key[0],
+                    )
+                    del distinct_counters[group_key]
+
+                for group_key in list(frequencies):
+                    timestamp, requests = frequencies[group_key]
+                    self.backend.record_frequency_multi(
+                        [
+                            (model, {key: dict(items) for key, items in request.items()})
+                            for model, request in requests.items()
+                        ],
+                        timestamp=timestamp,
+                        environment_id=group_key[0],
+                    )
+                    del frequencies[group_key]
+        except Exception:
+            logger.exception("tsdb.buffered.flush-failed")
+            self.__restore(counters, distinct_counters, frequencies)
+
+    def __restore(self, counters, distinct_counters, frequencies):
+        """
+        Merges writes that could not be flushed back into the pending writes.
+        """
+        with self.__lock:
+            self.__retry_after = time.monotonic() + self.flush_interval
+
+            if self.__pending >= self.max_retained:
+                metrics.incr("tsdb.buffered.dropped", skip_internal=True)
+                return
+
+            for environment_id, items in counters.items():
+                pending = self.__counters[environment_id]
+                for counter_key, (timestamp, count) in items.items():
+                    counter = pending.get(counter_key)
+                    if counter is None:
+                        pending[counter_key] = [timestamp, count]
+                        self.__pending += 1
+                    else:
+                        counter[1] += count
+
+            for group_key, (timestamp, items) in distinct_counters.items():
+                pending = self.__distinct_counters.setdefault(group_key, [timestamp, {}])[1]
+                for model_key, values in items.items():
+                    pending_values = pending.get(model_key)
+                    if pending_values is None:
+                        pending_values = pending[model_key] = set()
+                        self.__pending += 1
+                    pending_values.update(values)
+
+            for group_key, (timestamp, requests) in frequencies.items():
+                pending = self.__frequencies.setdefault(group_key, [timestamp, {}])[1]
+                for model, request in requests.items():
+                    pending_keys = pending.setdefault(model, {})
+                    for key, items in request.items():
+                        pending_items = pending_keys.get(key)
+                        if pending_items is None:
+                            pending_items = pending_keys[key] = defaultdict(int)
+                            self.__pending += 1
+                        for item, score in items.items():
+                            pending_items[item] += score
+
+    def flush(self):
+        with self.__lock:
+            self.__reset()
+        self.backend.flush()
@@ -8,6 +8,9 @@ from contextlib import contextmanager
 from queue import Full, PriorityQueue
 from time import time
 
+from django.db import connections
+from sentry_sdk import Hub
+
 logger = logging.getLogger(__name__)
 
 
@@ -32,6 +35,22 @@ def execute(function, daemon=True):
     return future
 
 
+def run_in_worker_thread(hub, function, *args, **kwargs):
+    """
+    Calls ``function`` in a worker thread of a thread pool, with a copy of
+    ``hub``, which has to be taken from the thread submitting it.
+
+    Connections are only closed at the end of a request or task in the thread
+    serving it, so the database connections the worker thread has opened are
+    closed once ``function`` returns.
+    """
+    try:
+        with Hub(hub):
+            return function(*args, **kwargs)
+    finally:
+        connections.close_all()
+
+
 @functools.total_ordering
 class PriorityTask(collections.namedtuple("PriorityTask", "priority item")):
     def __eq__(self, b):
@@ -1,3 +1,6 @@
+import threading
+import time
+from collections import OrderedDict
 from collections.abc import Hashable, MutableMapping
 
 __unset__ = object()
@@ -59,3 +62,92 @@ class BidirectionalMapping(MutableMapping):
 
     def inverse(self):
         return self.__inverse.copy()
+
+
+class LRUCache:
+    """\
+    A bounded, thread-safe, in-process cache that evicts the least recently
+    used entry once more than ``maxsize`` entries are stored.
+
+    If ``ttl`` (in seconds) is given, entries additionally expire that long
+    after they have been written. Expired entries are treated as missing and
+    dropped on access.
+    """
+
+    def __init__(self, maxsize, ttl=None):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.__data = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.__data)
+
+    def __contains__(self, key):
+        return self.get(key, __unset__) is not __unset__
+
+    def __get(self, key, now):
+        # Must be called with the lock held.
+        try:
+            expires_at, value = self.__data[key]
+        except KeyError:
+            return __unset__
+
+        if expires_at is not None and expires_at <= now:
+            del self.__data[key]
+            return __unset__
+
+        self.__data.move_to_end(key)
+        return value
+
+    def __set(self, key, value, now):
+        # Must be called with the lock held.
+        expires_at = now + self.ttl if self.ttl is not None else None
+        self.__data[key] = (expires_at, value)
+        self.__data.move_to_end(key)
+        while len(self.__data) > self.maxsize:
+            self.__data.popitem(last=False)
+
+    def get(self, key, default=None):
+        with self.__lock:
+            value = self.__get(key, time.monotonic())
+        return default if value is __unset__ else value
+
+    def get_many(self, keys):
+        """
+        Returns a dictionary of all ``keys`` that are present in the cache.
+        """
+        rv = {}
+        now = time.monotonic()
+        with self.__lock:
+            for key in keys:
+                value = self.__get(key, now)
+                if value is not __unset__:
+                    rv[key] = value
+        return rv
+
+    def set(self, key, value):
+        with self.__lock:
+            self.__set(key, value, time.monotonic())
+
+    def set_many(self, items):
+        now = time.monotonic()
+        with self.__lock:
+            for key, value in items.items():
+                self.__set(key, value, now)
+
+    def delete(self, key):
+        with self.__lock:
+            self.__data.pop(key, None)
+
+    def delete_many(self, keys):
+        with self.__lock:
+            for key in keys:
+                self.__data.pop(key, None)
+
+    def clear(self):
+        with self.__lock:
+            self.__data.clear()
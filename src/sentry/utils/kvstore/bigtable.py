@@ -8,7 +8,7 @@ from typing import Any, Iterator, Mapping, Optional, Sequence, Tuple, cast
 from django.utils import timezone
 from google.api_core import exceptions, retry
 from google.cloud import bigtable
-from google.cloud.bigtable.row import PartialRowData
+from google.cloud.bigtable.row import DirectRow, PartialRowData
 from google.cloud.bigtable.row_set import RowSet
 from google.cloud.bigtable.table import Table
 
@@ -182,9 +182,35 @@ class BigtableKVStorage(KVStorage[str, bytes]):
             return self._set(key, value, ttl)
 
     def _set(self, key: str, value: bytes, ttl: Optional[timedelta] = None) -> None:
+        row = self.__build_row(self._get_table(), key, value, ttl)
+
+        status = row.commit()
+        if status.code != 0:
+            raise BigtableError(status.code, status.message)
+
+    def set_many(self, items: Sequence[Tuple[str, bytes]], ttl: Optional[timedelta] = None) -> None:
+        if not items:
+            return
+        if len(items) == 1:
+            key, value = items[0]
+            return self.set(key, value, ttl)
+
+        table = self._get_table()
+        rows = [self.__build_row(table, key, value, ttl) for key, value in items]
+
+        errors = [status for status in table.mutate_rows(rows) if status.code != 0]
+        if errors:
+            # Report the first failed row, like `set` does.
+            raise BigtableError(
+                errors[0].code, f"{errors[0].message} ({len(errors)} of {len(rows)} rows failed)"
+            )
+
+    def __build_row(
+        self, table: Table, key: str, value: bytes, ttl: Optional[timedelta] = None
+    ) -> DirectRow:
         # XXX: There is a type mismatch here -- ``direct_row`` expects
         # ``bytes`` but we are providing it with ``str``.
-        row = self._get_table().direct_row(key)
+        row = table.direct_row(key)
 
         # Call to delete is just a state mutation, and in this case is just
         # used to clear all columns so the entire row will be replaced.
@@ -242,9 +268,7 @@ class BigtableKVStorage(KVStorage[str, bytes]):
 
         row.set_cell(self.column_family, self.data_column, value, timestamp=ts)
 
-        status = row.commit()
-        if status.code != 0:
-            raise BigtableError(status.code, status.message)
+        return row
 
     def delete(self, key: str) -> None:
         # XXX: There is a type mismatch here -- ``direct_row`` expects
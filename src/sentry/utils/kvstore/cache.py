@@ -31,9 +31,18 @@ class CacheKVStorage(KVStorage[Any, Any]):
     def get(self, key: Any) -> Optional[Any]:
         return self.backend.get(key)
 
+    def get_many(self, keys: Sequence[Any]) -> Iterator[Tuple[Any, Any]]:
+        keys = list(keys)
+        for key, value in zip(keys, self.backend.get_many(keys)):
+            if value is not None:
+                yield key, value
+
     def set(self, key: Any, value: Any, ttl: Optional[timedelta] = None) -> None:
         self.backend.set(key, value, timeout=int(ttl.total_seconds()) if ttl is not None else None)
 
+    def set_many(self, items: Sequence[Tuple[Any, Any]], ttl: Optional[timedelta] = None) -> None:
+        self.backend.set_many(items, timeout=int(ttl.total_seconds()) if ttl is not None else None)
+
     def delete(self, key: Any) -> None:
         self.backend.delete(key)
 
@@ -5,6 +5,7 @@ import logging
 import random
 import re
 from abc import ABC, abstractmethod
+from array import array
 from dataclasses import dataclass
 from datetime import timedelta
 from enum import Enum
@@ -15,8 +16,11 @@ import sentry_sdk
 from sentry import features, nodestore, options, projectoptions
 from sentry.eventstore.models import Event
 from sentry.models import Organization, Project, ProjectOption
+from sentry.signals import project_options_updated
 from sentry.types.issues import GroupType
 from sentry.utils import metrics
+from sentry.utils.cache import memoize
+from sentry.utils.datastructures import LRUCache
 from sentry.utils.event_frames import get_sdk_name
 from sentry.utils.safe import get_path
 
@@ -36,6 +40,16 @@ INTEGRATIONS_OF_INTEREST = [
 ]
 PARAMETERIZED_SQL_QUERY_REGEX = re.compile(r"\?|\$1|%s")
 
+# Project option changes invalidate entries in the process making the change,
+# the TTL bounds how long other processes keep using the previous settings.
+# It also applies to changes to system options and feature flags.
+DETECTION_SETTINGS_CACHE_SIZE = 10_000
+DETECTION_SETTINGS_CACHE_TTL = 60
+
+_detection_settings_cache = LRUCache(
+    DETECTION_SETTINGS_CACHE_SIZE, ttl=DETECTION_SETTINGS_CACHE_TTL
+)
+
 
 class DetectorType(Enum):
     SLOW_SPAN = "slow_span"
@@ -295,11 +309,65 @@ def get_detection_settings(project_id: Optional[str] = None):
     }
 
 
+class ProjectDetectionSettings:
+    def __init__(self, project_id: str, settings: Dict[DetectorType, Any]):
+        self.project_id = project_id
+        # Detector settings, see `get_detection_settings`.
+        self.settings = settings
+
+    @memoize
+    def issue_creation_rates(self) -> Mapping[DetectorType, float]:
+        """
+        Sample rates for creating issues by detector. Empty if the
+        organization does not have performance issues.
+        """
+        return _get_issue_creation_rates(self.project_id)
+
+
+def _get_issue_creation_rates(project_id: str) -> Mapping[DetectorType, float]:
+    project = Project.objects.get_from_cache(id=project_id)
+    organization = Organization.objects.get_from_cache(id=project.organization_id)
+    if not features.has("organizations:performance-issues-ingest", organization):
+        # Only organizations with this non-flagr feature have performance issues created.
+        return {}
+
+    return {
+        detector_type: options.get(system_option)
+        for detector_type, system_option in DETECTOR_TYPE_ISSUE_CREATION_TO_SYSTEM_OPTION.items()
+    }
+
+
+def get_project_detection_settings(project_id: str) -> ProjectDetectionSettings:
+    """
+    Returns the detection settings of the project, cached per process if
+    ``performance.issues.cache-detection-settings`` is enabled. The returned
+    settings are shared and must not be modified.
+    """
+    use_cache = options.get("performance.issues.cache-detection-settings")
+    if use_cache:
+        rv = _detection_settings_cache.get(project_id)
+        if rv is not None:
+            return rv
+
+    rv = ProjectDetectionSettings(project_id, get_detection_settings(project_id))
+    if use_cache:
+        _detection_settings_cache.set(project_id, rv)
+    return rv
+
+
+@project_options_updated.connect(
+    sender=ProjectOption, dispatch_uid="invalidate_detection_settings", weak=False
+)
+def invalidate_detection_settings(project_id, **kwargs):
+    _detection_settings_cache.delete(project_id)
+
+
 def _detect_performance_problems(data: Event, sdk_span: Any) -> List[PerformanceProblem]:
     event_id = data.get("event_id", None)
     project_id = data.get("project")
 
-    detection_settings = get_detection_settings(project_id)
+    project_settings = get_project_detection_settings(project_id)
+    detection_settings = project_settings.settings
     detectors = {
         DetectorType.DUPLICATE_SPANS: DuplicateSpanDetector(detection_settings, data),
         DetectorType.DUPLICATE_SPANS_HASH: DuplicateSpanHashDetector(detection_settings, data),
@@ -316,14 +384,15 @@ def _detect_performance_problems(data: Event, sdk_span: Any) -> List[Performance
         ),
     }
 
-    for _, detector in detectors.items():
-        run_detector_on_data(detector, data)
+    run_detectors_on_data(list(detectors.values()), data)
 
     # Metrics reporting only for detection, not created issues.
     report_metrics_for_detectors(data, event_id, detectors, sdk_span)
 
     # Get list of detectors that are allowed to create issues.
-    allowed_perf_issue_detectors = get_allowed_issue_creation_detectors(project_id)
+    allowed_perf_issue_detectors = get_allowed_issue_creation_detectors(
+        project_id, project_settings
+    )
 
     detected_problems = [
         (i, detector_type)
@@ -356,24 +425,53 @@ def _detect_performance_problems(data: Event, sdk_span: Any) -> List[Performance
 
 
 def run_detector_on_data(detector, data):
+    run_detectors_on_data([detector], data)
+
+
+def run_detectors_on_data(detectors: Sequence[PerformanceDetector], data: Event) -> None:
+    """
+    Walks the spans of the event once, visiting every span only with the
+    detectors that are interested in its op.
+    """
     spans = data.get("spans", [])
-    for span in spans:
-        detector.visit_span(span)
+    features = SpanFeatures(spans)
+
+    # Detectors by op id, the op table is small compared to the spans.
+    detectors_by_op = [
+        [detector for detector in detectors if detector.is_op_allowed(op)] for op in features.ops
+    ]
+
+    for detector in detectors:
+        detector.span_features = features
+
+    try:
+        for idx, span in enumerate(spans):
+            op_id = features.op_ids[idx]
+            if op_id < 0:
+                continue
 
-    detector.on_complete()
+            features.index = idx
+            for detector in detectors_by_op[op_id]:
+                detector.visit_span(span)
+    finally:
+        features.index = -1
+        for detector in detectors:
+            detector.span_features = None
+
+    for detector in detectors:
+        detector.on_complete()
 
 
 # Uses options and flags to determine which orgs and which detectors automatically create performance issues.
-def get_allowed_issue_creation_detectors(project_id: str):
-    project = Project.objects.get_from_cache(id=project_id)
-    organization = Organization.objects.get_from_cache(id=project.organization_id)
-    if not features.has("organizations:performance-issues-ingest", organization):
-        # Only organizations with this non-flagr feature have performance issues created.
-        return {}
+def get_allowed_issue_creation_detectors(
+    project_id: str, project_settings: Optional[ProjectDetectionSettings] = None
+):
+    if project_settings is None:
+        project_settings = get_project_detection_settings(project_id)
+    rates = project_settings.issue_creation_rates
 
     allowed_detectors = set()
-    for detector_type, system_option in DETECTOR_TYPE_ISSUE_CREATION_TO_SYSTEM_OPTION.items():
-        rate = options.get(system_option)
+    for detector_type, rate in rates.items():
         if rate and rate > random.random():
             allowed_detectors.add(detector_type)
 
@@ -451,6 +549,43 @@ def get_span_duration(span: Span):
     )
 
 
+class SpanFeatures:
+    """
+    Values of every span of an event that are needed by several detectors,
+    computed once per event. ``op_ids`` indexes into the interned ``ops`` and
+    is -1 for spans without an op, which no detector looks at.
+
+    While spans are walked, ``index`` points at the span being visited.
+    """
+
+    def __init__(self, spans: TransactionSpans):
+        self.spans = spans
+        self.ops: List[str] = []
+        self.op_ids = array("i")
+        self.durations: List[timedelta] = []
+        self.index = -1
+
+        op_ids: Dict[str, int] = {}
+        for span in spans:
+            op = span.get("op", None)
+            if op:
+                op_id = op_ids.get(op)
+                if op_id is None:
+                    op_id = op_ids[op] = len(self.ops)
+                    self.ops.append(op)
+            else:
+                op_id = -1
+            self.op_ids.append(op_id)
+            self.durations.append(get_span_duration(span))
+
+    def get_duration(self, span: Span) -> Optional[timedelta]:
+        """The precomputed duration of the span being visited, if ``span`` is it."""
+        index = self.index
+        if index >= 0 and self.spans[index] is span:
+            return self.durations[index]
+        return None
+
+
 class PerformanceDetector(ABC):
     """
     Classes of this type have their visit functions called as the event is walked once and will store a performance issue if one is detected.
@@ -459,6 +594,8 @@ class PerformanceDetector(ABC):
     def __init__(self, settings: Dict[str, Any], event: Event):
         self.settings = settings[self.settings_key]
         self._event = event
+        self._settings_by_op: Dict[str, Optional[Tuple[Any, Dict[str, Any]]]] = {}
+        self.span_features: Optional[SpanFeatures] = None
         self.init()
 
     @abstractmethod
@@ -471,18 +608,46 @@ class PerformanceDetector(ABC):
             return True
         return next((op for op in allowed_span_ops if span_op.startswith(op)), False)
 
+    def _settings_for_op(self, op: str):
+        try:
+            return self._settings_by_op[op]
+        except KeyError:
+            pass
+
+        rv = None
+        for setting in self.settings:
+            op_prefix = self.find_span_prefix(setting, op)
+            if op_prefix:
+                rv = (op_prefix, setting)
+                break
+
+        self._settings_by_op[op] = rv
+        return rv
+
+    def is_op_allowed(self, op: str) -> bool:
+        """Whether spans with this op can be relevant to the detector. Spans
+        with other ops are not visited."""
+        return self._settings_for_op(op) is not None
+
+    def get_span_duration(self, span: Span) -> timedelta:
+        if self.span_features is not None:
+            duration = self.span_features.get_duration(span)
+            if duration is not None:
+                return duration
+        return get_span_duration(span)
+
     def settings_for_span(self, span: Span):
         op = span.get("op", None)
         span_id = span.get("span_id", None)
         if not op or not span_id:
             return None
 
-        span_duration = get_span_duration(span)
-        for setting in self.settings:
-            op_prefix = self.find_span_prefix(setting, op)
-            if op_prefix:
-                return op, span_id, op_prefix, span_duration, setting
-        return None
+        settings = self._settings_for_op(op)
+        if settings is None:
+            return None
+
+        op_prefix, setting = settings
+        return op, span_id, op_prefix, self.get_span_duration(span), setting
 
     def event(self) -> Event:
         return self._event
@@ -721,7 +886,6 @@ class LongTaskSpanDetector(PerformanceDetector):
         if not fingerprint:
             return
 
-        span_duration = get_span_duration(span)
         self.cumulative_duration += span_duration
         self.spans_involved.append(span_id)
 
@@ -757,6 +921,9 @@ class RenderBlockingAssetSpanDetector(PerformanceDetector):
             if fcp >= fcp_minimum_threshold and fcp < fcp_maximum_threshold:
                 self.fcp = fcp
 
+    def is_op_allowed(self, op: str) -> bool:
+        return bool(self.fcp) and op in self.settings.get("allowed_span_ops")
+
     def visit_span(self, span: Span):
         if not self.fcp:
             return
@@ -786,7 +953,7 @@ class RenderBlockingAssetSpanDetector(PerformanceDetector):
         if span_end_timestamp >= fcp_timestamp:
             return False
 
-        span_duration = get_span_duration(span)
+        span_duration = self.get_span_duration(span)
         fcp_ratio_threshold = self.settings.get("fcp_ratio_threshold")
         return span_duration / self.fcp > fcp_ratio_threshold
 
@@ -940,6 +1107,10 @@ class NPlusOneDBSpanDetector(PerformanceDetector):
                 self.source_span = None
                 self._maybe_use_as_source(span)
 
+    def is_op_allowed(self, op: str) -> bool:
+        # Every span either is part of an N+1 or breaks it up.
+        return True
+
     def on_complete(self) -> None:
         self._maybe_store_problem()
 
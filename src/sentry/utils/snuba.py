@@ -23,6 +23,7 @@ from sentry_sdk import Hub
 from snuba_sdk import Request
 from snuba_sdk.legacy import json_to_snql
 
+from sentry import options
 from sentry.models import (
     Environment,
     Group,
@@ -753,29 +754,48 @@ def _apply_cache_and_build_results(
     query_param_list = list(enumerate(snuba_param_list))
 
     results = []
+    lock_keys: List[str] = []
 
-    if use_cache:
+    serve_stale = _serves_stale_results(referrer)
+    if use_cache or serve_stale:
         cache_keys = [get_cache_key(query_params[0]) for _, query_params in query_param_list]
         cache_data = cache.get_many(cache_keys)
         to_query: List[Tuple[int, SnubaQueryBody, Optional[str]]] = []
+        metric_tags = {"referrer": referrer} if referrer else None
         for (query_pos, query_params), cache_key in zip(query_param_list, cache_keys):
             cached_result = cache_data.get(cache_key)
-            metric_tags = {"referrer": referrer} if referrer else None
             if cached_result is None:
                 metrics.incr("snuba.query_cache.miss", tags=metric_tags)
                 to_query.append((query_pos, query_params, cache_key))
             else:
                 metrics.incr("snuba.query_cache.hit", tags=metric_tags)
                 results.append((query_pos, json.loads(cached_result)))
+
+        coalesce = options.get("snuba.query-cache.coalesce")
+        if to_query and (coalesce or serve_stale):
+            to_query, lock_keys = _coalesce_cache_misses(
+                to_query, results, metric_tags, coalesce, serve_stale
+            )
     else:
         to_query = [(query_pos, query_params, None) for query_pos, query_params in query_param_list]
 
-    if to_query:
-        query_results = _bulk_snuba_query([item[1] for item in to_query], headers)
-        for result, (query_pos, _, cache_key) in zip(query_results, to_query):
-            if cache_key:
-                cache.set(cache_key, json.dumps(result), settings.SENTRY_SNUBA_CACHE_TTL_SECONDS)
-            results.append((query_pos, result))
+    try:
+        if to_query:
+            query_results = _bulk_snuba_query([item[1] for item in to_query], headers)
+            for result, (query_pos, _, cache_key) in zip(query_results, to_query):
+                if cache_key:
+                    serialized = json.dumps(result)
+                    cache.set(cache_key, serialized, settings.SENTRY_SNUBA_CACHE_TTL_SECONDS)
+                    if serve_stale:
+                        cache.set(
+                            _get_stale_cache_key(cache_key),
+                            serialized,
+                            settings.SENTRY_SNUBA_CACHE_STALE_TTL_SECONDS,
+                        )
+                results.append((query_pos, result))
+    finally:
+        if lock_keys:
+            cache.delete_many(lock_keys)
 
     # Sort so that we get the results back in the original param list order
     results.sort()
@@ -783,6 +803,103 @@ def _apply_cache_and_build_results(
     return [result[1] for result in results]
 
 
+def _get_lock_cache_key(cache_key: str) -> str:
+    return f"{cache_key}:lock"
+
+
+def _get_stale_cache_key(cache_key: str) -> str:
+    return f"{cache_key}:stale"
+
+
+def _serves_stale_results(referrer: Optional[str]) -> bool:
+    if not referrer:
+        return False
+    return any(
+        referrer.startswith(prefix) for prefix in options.get("snuba.query-cache.stale-referrers")
+    )
+
+
+def _coalesce_cache_misses(
+    to_query: List[Tuple[int, SnubaQueryBody, Optional[str]]],
+    results: List[Tuple[int, Any]],
+    metric_tags: Optional[Mapping[str, str]],
+    coalesce: bool,
+    serve_stale: bool,
+) -> Tuple[List[Tuple[int, SnubaQueryBody, Optional[str]]], List[str]]:
+    """
+    Makes sure only one worker runs a query that is missing from the cache.
+
+    The worker that gets the lock of a query runs it. Other workers serve the
+    last result of the query if ``serve_stale`` and there is one, otherwise
+    wait for the result of the worker that holds the lock if ``coalesce``.
+    Waiting stops once the lock is released without a result or the wait time
+    is over, in which case the worker runs the query itself.
+
+    Results from the cache are added to ``results``. Returns the queries this
+    worker has to run, and the locks it has to release afterwards.
+    """
+    rv = []
+    lock_keys = []
+    waiting = []
+
+    stale_data = (
+        cache.get_many([_get_stale_cache_key(cache_key) for _, _, cache_key in to_query])
+        if serve_stale
+        else {}
+    )
+
+    for item in to_query:
+        query_pos, _, cache_key = item
+        lock_key = _get_lock_cache_key(cache_key)
+        if lock_key in lock_keys:
+            # The same query is part of this batch more than once.
+            rv.append(item)
+            continue
+
+        if cache.add(lock_key, 1, settings.SENTRY_SNUBA_CACHE_LOCK_TTL_SECONDS):
+            lock_keys.append(lock_key)
+            rv.append(item)
+            continue
+
+        stale_result = stale_data.get(_get_stale_cache_key(cache_key))
+        if stale_result is not None:
+            metrics.incr("snuba.query_cache.stale_hit", tags=metric_tags)
+            results.append((query_pos, json.loads(stale_result)))
+        elif coalesce:
+            waiting.append(item)
+        else:
+            rv.append(item)
+
+    deadline = time.time() + settings.SENTRY_SNUBA_CACHE_COALESCE_WAIT_SECONDS
+    while waiting and time.time() < deadline:
+        time.sleep(settings.SENTRY_SNUBA_CACHE_COALESCE_POLL_SECONDS)
+
+        keys = []
+        for _, _, cache_key in waiting:
+            keys += [cache_key, _get_lock_cache_key(cache_key)]
+        cache_data = cache.get_many(keys)
+
+        still_waiting = []
+        for item in waiting:
+            query_pos, _, cache_key = item
+            cached_result = cache_data.get(cache_key)
+            if cached_result is not None:
+                metrics.incr("snuba.query_cache.coalesced", tags=metric_tags)
+                results.append((query_pos, json.loads(cached_result)))
+            elif cache_data.get(_get_lock_cache_key(cache_key)) is None:
+                # The query failed or its result was already evicted.
+                rv.append(item)
+            else:
+                still_waiting.append(item)
+        waiting = still_waiting
+
+    if waiting:
+        metrics.incr("snuba.query_cache.coalesce_timeout", amount=len(waiting), tags=metric_tags)
+        rv.extend(waiting)
+
+    return rv, lock_keys
+
+
 def _bulk_snuba_query(
     snuba_param_list: Sequence[SnubaQueryBody],
     headers: Mapping[str, str],
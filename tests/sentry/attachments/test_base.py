@@ -1,6 +1,8 @@
 import copy
 
-from sentry.attachments.base import BaseAttachmentCache, CachedAttachment
+import pytest
+
+from sentry.attachments.base import BaseAttachmentCache, CachedAttachment, MissingAttachmentChunks
 
 
 class InMemoryCache:
@@ -13,11 +15,16 @@ class InMemoryCache:
         self.data = {}
         #: Used to check for consistent usage of `raw` param
         self.raw_map = {}
+        self.get_many_calls = 0
 
     def get(self, key, raw=False):
         assert key not in self.raw_map or raw == self.raw_map[key]
         return copy.deepcopy(self.data.get(key))
 
+    def get_many(self, keys, raw=False):
+        self.get_many_calls += 1
+        return [self.get(key, raw=raw) for key in keys]
+
     def set(self, key, value, timeout=None, raw=False):
         # Attachment chunks MUST be bytestrings. Josh please don't change this
         # to unicode.
@@ -110,3 +117,56 @@ def test_basic_rate_limited():
     assert att2.id == att.id == 0
     assert att2.data == att.data == b"Hello World! Bye."
     assert att2.rate_limited is True
+
+
+def test_chunked_stream():
+    data = InMemoryCache()
+    cache = BaseAttachmentCache(data)
+
+    cache.set_chunk("c:foo", 123, 0, b"Hello World! ")
+    cache.set_chunk("c:foo", 123, 1, b"")
+    cache.set_chunk("c:foo", 123, 2, b"Bye.")
+
+    att = CachedAttachment(key="c:foo", id=123, name="lol.txt", content_type="text/plain", chunks=3)
+    cache.set("c:foo", [att])
+
+    (att2,) = cache.get("c:foo")
+    assert data.get_many_calls == 0
+    stream = att2.open()
+    assert stream.read(5) == b"Hello"
+    assert stream.read(10) == b" World! By"
+    assert stream.read() == b"e."
+    assert stream.read() == b""
+    assert data.get_many_calls == 1
+
+    # All chunks are fetched at once
+    assert att2.data == b"Hello World! Bye."
+    assert data.get_many_calls == 2
+
+
+def test_chunked_stream_batches():
+    data = InMemoryCache()
+    cache = BaseAttachmentCache(data)
+
+    for chunk_index in range(5):
+        cache.set_chunk("c:foo", 123, chunk_index, b"%d" % chunk_index)
+
+    att = CachedAttachment(key="c:foo", id=123, cache=cache, chunks=5)
+    assert b"".join(cache.iter_chunks(att, batch_size=2)) == b"01234"
+    assert data.get_many_calls == 3
+
+
+def test_chunked_stream_missing_chunks():
+    data = InMemoryCache()
+    cache = BaseAttachmentCache(data)
+
+    cache.set_chunk("c:foo", 123, 0, b"Hello World! ")
+
+    att = CachedAttachment(key="c:foo", id=123, cache=cache, chunks=2)
+    with pytest.raises(MissingAttachmentChunks):
+        att.open().read()
+
+
+def test_unchunked_stream():
+    att = CachedAttachment(name="lol.txt", content_type="text/plain", data=b"Hello World! Bye.")
+    assert att.open().read() == b"Hello World! Bye."
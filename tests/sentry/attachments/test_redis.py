@@ -1,4 +1,5 @@
 import zlib
+from contextlib import contextmanager
 from unittest import mock
 
 import pytest
@@ -9,13 +10,49 @@ from sentry.utils.imports import import_string
 KEY_FMT = "c:1:%s"
 
 
+class FakePromise:
+    def __init__(self, value):
+        self.value = value
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.keys = []
+
+    def get(self, key):
+        self.keys.append(key)
+
+    def execute(self):
+        self.client.round_trips += 1
+        return [self.client.data.get(key) for key in self.keys]
+
+
+class FakeMappingClient:
+    def __init__(self, client):
+        self.client = client
+
+    def get(self, key):
+        return FakePromise(self.client.data.get(key))
+
+
 class FakeClient:
     def __init__(self):
         self.data = {}
+        self.round_trips = 0
 
     def get(self, key):
+        self.round_trips += 1
         return self.data[key]
 
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    @contextmanager
+    def map(self):
+        self.round_trips += 1
+        yield FakeMappingClient(self)
+
 
 @pytest.fixture
 def mock_client():
@@ -83,4 +120,7 @@ def test_chunked(mocked_attachment_cache, mock_client):
         "name": "foo.txt",
         "content_type": "text/plain",
     }
+    round_trips = mock_client.round_trips
     assert attachment.data == b"Hello World! This attachment is chunked up."
+    assert mock_client.round_trips == round_trips + 1
+    assert attachment.open().read() == b"Hello World! This attachment is chunked up."
@@ -1,3 +1,4 @@
+import math
 import pickle
 from datetime import datetime
 from unittest import mock
@@ -103,6 +104,67 @@ class RedisBufferTest(TestCase):
         group = Group.objects.get_from_cache(id=self.group.id)
         assert group.times_seen == orig_times_seen + times_seen_incr
 
+    def test_incr_typed_encoding(self):
+        now = datetime(2017, 5, 3, 6, 6, 6, tzinfo=timezone.utc)
+        client = self.buf.cluster.get_routing_client()
+        filters = {"pk": 1}
+        key = self.buf._make_key(Group, filters=filters)
+        with self.options({"buffer.typed-encoding": True}):
+            self.buf.incr(
+                Group, {"times_seen": 1}, filters, extra={"last_seen": now, "data": {"a": 1}}
+            )
+        result = {force_text(k): v for k, v in client.hgetall(key).items()}
+        assert result["f"] == b'{"pk":["i","1"]}'
+        assert result["e+last_seen"] == b'["d","1493791566.000000"]'
+        # Values without a typed encoding are still pickled
+        assert pickle.loads(result["e+data"]) == {"a": 1}
+
+        with mock.patch("sentry.buffer.base.Buffer.process") as process:
+            self.buf.process(key)
+        process.assert_called_once_with(
+            Group, {"times_seen": 1}, filters, {"last_seen": now, "data": {"a": 1}}, None
+        )
+
+    @freeze_time()
+    def test_bulk_flush(self):
+        other_group = self.create_group(project=self.project)
+        groups = [self.group, other_group]
+        orig_times_seen = {
+            group.id: Group.objects.get_from_cache(id=group.id).times_seen for group in groups
+        }
+        now = timezone.now()
+        for i, group in enumerate(groups):
+            self.buf.incr(Group, {"times_seen": i + 1}, {"pk": group.id}, {"last_seen": now})
+
+        with self.options({"buffer.bulk-flush": True}), self.tasks(), mock.patch(
+            "sentry.buffer", self.buf
+        ), mock.patch("sentry.buffer.base.Buffer.process") as process, mock.patch.object(
+            Group.objects, "uncache_objects", wraps=Group.objects.uncache_objects
+        ) as uncache_objects:
+            self.buf.process_pending()
+
+        # Both updates have been applied with one statement
+        assert not process.called
+        # and the cached groups have been dropped at once
+        uncache_objects.assert_called_once()
+        assert sorted(uncache_objects.call_args[0][0]) == sorted(group.id for group in groups)
+        for i, group in enumerate(groups):
+            group = Group.objects.get_from_cache(id=group.id)
+            assert group.times_seen == orig_times_seen[group.id] + i + 1
+            assert group.last_seen == now
+            assert group.score == round(math.log10(group.times_seen) * 600 + int(now.timestamp()))
+
+        client = self.buf.cluster.get_routing_client()
+        assert client.zrange("b:p", 0, -1) == []
+
+    @mock.patch("sentry.buffer.base.Buffer.process")
+    def test_bulk_flush_signal_only(self, process):
+        self.buf.incr(Group, {"times_seen": 1}, {"pk": self.group.id}, signal_only=True)
+        key = self.buf._make_key(Group, {"pk": self.group.id})
+        with self.options({"buffer.bulk-flush": True}):
+            self.buf.process(batch_keys=[key])
+        process.assert_called_once_with(Group, {"times_seen": 1}, {"pk": self.group.id}, {}, True)
+
     def test_get(self):
         model = mock.Mock()
         model.__name__ = "Mock"
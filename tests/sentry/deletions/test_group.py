@@ -1,7 +1,8 @@
+from concurrent.futures import Future
 from unittest import mock
 from uuid import uuid4
 
-from sentry import nodestore
+from sentry import deletions, nodestore
 from sentry.deletions.defaults.group import EventDataDeletionTask
 from sentry.eventstore.models import Event
 from sentry.models import (
@@ -82,8 +83,8 @@ class DeleteGroupTest(TestCase, SnubaTestCase):
         self.node_id2 = Event.generate_node_id(self.project.id, self.event_id2)
         self.node_id3 = Event.generate_node_id(self.project.id, self.event_id3)
 
+    @mock.patch.object(EventDataDeletionTask, "DEFAULT_CHUNK_SIZE", 1)  # test chunking logic
     def test_simple(self):
-        EventDataDeletionTask.DEFAULT_CHUNK_SIZE = 1  # test chunking logic
         group = self.event.group
         assert nodestore.get(self.node_id)
         assert nodestore.get(self.node_id2)
@@ -113,3 +114,93 @@ class DeleteGroupTest(TestCase, SnubaTestCase):
             delete_groups(object_ids=[group.id])
 
         assert nodestore_delete_multi.call_count == 0
+
+    def test_bulk_relations(self):
+        group = self.event.group
+        other_group = Group.objects.exclude(id=group.id).get(project=self.project)
+
+        with self.options(
+            {"deletions.groups.bulk-relations": True, "deletions.max-concurrent-relations": 1}
+        ), mock.patch(
+            "sentry.nodestore.delete_multi", wraps=nodestore.delete_multi
+        ) as nodestore_delete_multi, self.tasks():
+            delete_groups(object_ids=[group.id, other_group.id])
+
+        # The events of both groups are deleted at once
+        assert nodestore_delete_multi.call_count == 1
+        assert sorted(nodestore_delete_multi.call_args[0][0]) == sorted(
+            [self.node_id, self.node_id2, self.node_id3]
+        )
+        assert not nodestore.get(self.node_id)
+        assert not nodestore.get(self.node_id3)
+
+        assert not UserReport.objects.filter(group_id=group.id).exists()
+        assert not UserReport.objects.filter(event_id=self.event.event_id).exists()
+        assert not EventAttachment.objects.filter(event_id=self.event.event_id).exists()
+        assert not GroupAssignee.objects.filter(group_id=group.id).exists()
+        assert not GroupMeta.objects.filter(group_id=group.id).exists()
+        assert not GroupHash.objects.filter(group_id__in=[group.id, other_group.id]).exists()
+        assert not Group.objects.filter(id__in=[group.id, other_group.id]).exists()
+
+    def test_bulk_relations_concurrently(self):
+        group = self.event.group
+        other_group = Group.objects.exclude(id=group.id).get(project=self.project)
+
+        # Relations are deleted in this thread, which is the only one that sees
+        # the rows of the test transaction.
+        with self.options(
+            {"deletions.groups.bulk-relations": True, "deletions.max-concurrent-relations": 4}
+        ), mock.patch(
+            "sentry.deletions.base.ThreadPoolExecutor", side_effect=InlineExecutor
+        ) as executor, mock.patch(
+            "django.db.connections.close_all"
+        ), self.tasks():
+            delete_groups(object_ids=[group.id, other_group.id])
+
+        # Only the group related models other than GroupHash share a stage
+        assert executor.call_count == 1
+        assert executor.call_args[1] == {"max_workers": 4}
+
+        assert not nodestore.get(self.node_id)
+        assert not nodestore.get(self.node_id3)
+        assert not UserReport.objects.filter(group_id=group.id).exists()
+        assert not EventAttachment.objects.filter(event_id=self.event.event_id).exists()
+        assert not GroupAssignee.objects.filter(group_id=group.id).exists()
+        assert not GroupMeta.objects.filter(group_id=group.id).exists()
+        assert not GroupHash.objects.filter(group_id__in=[group.id, other_group.id]).exists()
+        assert not Group.objects.filter(id__in=[group.id, other_group.id]).exists()
+
+    def test_child_relation_stages(self):
+        group = self.event.group
+        with self.options({"deletions.groups.bulk-relations": True}):
+            task = deletions.get(model=Group, query={"id__in": [group.id]})
+        stages = task.get_child_relation_stages(task.get_child_relations_bulk([group]))
+
+        assert [r.params["model"] for r in stages[0]] == [GroupHash]
+        assert GroupHash not in [r.params["model"] for r in stages[1]]
+        assert UserReport in [r.params["model"] for r in stages[1]]
+        assert [r.task for r in stages[2]] == [EventDataDeletionTask]
+        assert len(stages) == 3
+
+
+class InlineExecutor:
+    """
+    Runs the functions submitted to it right away, in the calling thread.
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
@@ -33,8 +33,10 @@ from sentry.event_manager import (
     EventUser,
     HashDiscarded,
     _get_event_instance,
+    _save_aggregate,
     _save_grouphash_and_group,
     has_pending_commit_resolution,
+    save_error_events,
 )
 from sentry.eventstore.models import Event
 from sentry.grouping.utils import hash_from_values
@@ -2903,3 +2905,97 @@ class TestSaveGroupHashAndGroup(TransactionTestCase):
         group_3 = _save_grouphash_and_group(self.project, event, "new_hash")
         assert group_2.id != group_3.id
         assert Group.objects.filter(grouphash__hash=group_hash).count() == 1
+
+
+@region_silo_test
+class SaveErrorEventsTest(TestCase, SnubaTestCase):
+    def make_job(self, **kwargs):
+        manager = EventManager(make_event(**kwargs))
+        manager.normalize()
+        return {
+            "data": manager.get_data(),
+            "project_id": self.project.id,
+            "raw": False,
+            "start_time": time(),
+            "cache_key": None,
+        }
+
+    def test_same_group(self):
+        jobs = [self.make_job(message="foo", fingerprint=["a"]) for _ in range(3)]
+        saved_jobs = save_error_events(jobs, {self.project.id: self.project})
+
+        assert len(saved_jobs) == 3
+        group_ids = {job["event"].group_id for job in saved_jobs}
+        assert len(group_ids) == 1
+        assert [job["groups"][0].is_new for job in saved_jobs] == [True, False, False]
+        assert [job["groups"][0].is_new_group_environment for job in saved_jobs] == [
+            True,
+            False,
+            False,
+        ]
+
+        for job in saved_jobs:
+            event = job["event"]
+            node_id = Event.generate_node_id(self.project.id, event.event_id)
+            assert nodestore.get(node_id)["event_id"] == event.event_id
+
+    def test_different_groups_and_releases(self):
+        jobs = [
+            self.make_job(message="foo", fingerprint=["a"], release="1.0", environment="prod"),
+            self.make_job(message="bar", fingerprint=["b"], release="1.0", environment="prod"),
+            self.make_job(message="baz", fingerprint=["b"], release="2.0", environment="dev"),
+        ]
+        saved_jobs = save_error_events(jobs, {self.project.id: self.project})
+
+        group_a, group_b, group_b2 = (job["event"].group_id for job in saved_jobs)
+        assert group_a != group_b
+        assert group_b == group_b2
+        assert saved_jobs[0]["release"] == saved_jobs[1]["release"]
+        assert saved_jobs[0]["environment"] == saved_jobs[1]["environment"]
+        assert GroupRelease.objects.filter(group_id=group_b).count() == 2
+        assert GroupEnvironment.objects.filter(group_id=group_b).count() == 2
+
+    def test_discarded_hash(self):
+        manager = EventManager(make_event(message="foo", fingerprint=["a"]))
+        manager.normalize()
+        group = manager.save(self.project.id).group
+
+        tombstone = GroupTombstone.objects.create(
+            project_id=group.project_id,
+            level=group.level,
+            message=group.message,
+            culprit=group.culprit,
+            data=group.data,
+            previous_group_id=group.id,
+        )
+        GroupHash.objects.filter(group=group).update(group=None, group_tombstone_id=tombstone.id)
+
+        jobs = [
+            self.make_job(message="foo", fingerprint=["a"]),
+            self.make_job(message="bar", fingerprint=["b"]),
+        ]
+        saved_jobs = save_error_events(jobs, {self.project.id: self.project})
+
+        assert saved_jobs == [jobs[1]]
+        assert isinstance(jobs[0]["hash_discarded"], HashDiscarded)
+
+    def test_failed_job(self):
+        jobs = [
+            self.make_job(message="foo", fingerprint=["a"]),
+            self.make_job(message="bar", fingerprint=["b"]),
+        ]
+
+        save_aggregate = _save_aggregate
+        error = ValueError("boom")
+
+        def fail_first(event, **kwargs):
+            if event is jobs[0]["event"]:
+                raise error
+            return save_aggregate(event=event, **kwargs)
+
+        with mock.patch("sentry.event_manager._save_aggregate", side_effect=fail_first):
+            saved_jobs = save_error_events(jobs, {self.project.id: self.project})
+
+        assert saved_jobs == [jobs[1]]
+        assert jobs[0]["save_error"] is error
+        assert jobs[1]["event"].group_id
@@ -1,6 +1,14 @@
 import copy
+from unittest import mock
 
-from sentry.eventstore.compressor import assemble, deduplicate
+from sentry.eventstore.compressor import (
+    PATCHSETS_KEY,
+    _extra_keys_cache,
+    assemble,
+    assemble_nodes,
+    deduplicate,
+    get_extra_key_node_id,
+)
 
 
 def _assert_roundtrip(data, assert_extra_keys=None):
@@ -52,3 +60,84 @@ def test_basic():
             }
         },
     )
+
+
+def test_shared_interfaces():
+    _assert_roundtrip({"modules": None, "sdk": {}})
+
+    modules = {"foo": "1.0"}
+    sdk = {"name": "sentry.python", "version": "1.0.0"}
+    data, extra_keys = deduplicate({"modules": modules, "sdk": sdk, "message": "hello"})
+    assert data == {
+        "message": "hello",
+        PATCHSETS_KEY: [
+            ["modules", mock.ANY, None],
+            ["sdk", mock.ANY, None],
+        ],
+    }
+    assert sorted(extra_keys.values(), key=len) == [modules, sdk]
+
+    _assert_roundtrip({"modules": modules, "sdk": sdk})
+
+
+def test_contexts():
+    _assert_roundtrip({"contexts": None})
+    _assert_roundtrip({"contexts": {"trace": {"trace_id": "a" * 32}}})
+
+    contexts = {
+        "device": {"model": "iPhone14,5", "arch": "arm64e", "battery_level": 42},
+        "os": {"name": "iOS", "version": "16.0"},
+        "runtime": {"name": "CPython", "version": "3.8.13"},
+        "trace": {"trace_id": "a" * 32},
+    }
+    data, extra_keys = deduplicate({"contexts": contexts})
+    ((key, checksum, inlined),) = data[PATCHSETS_KEY]
+    assert inlined == {"device": {"battery_level": 42}, "trace": {"trace_id": "a" * 32}}
+    assert extra_keys[checksum] == {
+        "device": {"model": "iPhone14,5", "arch": "arm64e"},
+        "os": {"name": "iOS", "version": "16.0"},
+        "runtime": {"name": "CPython", "version": "3.8.13"},
+    }
+
+    # The input is not modified
+    assert contexts["device"]["model"] == "iPhone14,5"
+
+    _assert_roundtrip({"contexts": contexts})
+
+
+def test_assemble_nodes():
+    _extra_keys_cache.clear()
+
+    modules = {"foo": "1.0"}
+    items = {}
+    extra_nodes = {}
+    for id, project_id in (("a", 1), ("b", 1), ("e", 2)):
+        items[id], extra_keys = deduplicate({"id": id, "project": project_id, "modules": modules})
+        for checksum, value in extra_keys.items():
+            extra_nodes[get_extra_key_node_id(project_id, checksum)] = value
+    items["c"] = {"id": "c"}
+    items["d"] = None
+
+    # Projects do not share their shared parts
+    assert len(extra_nodes) == 2
+
+    get_multi = mock.Mock(side_effect=lambda ids: {id: extra_nodes[id] for id in ids})
+    assert assemble_nodes(copy.deepcopy(items), get_multi) == {
+        "a": {"id": "a", "project": 1, "modules": modules},
+        "b": {"id": "b", "project": 1, "modules": modules},
+        "e": {"id": "e", "project": 2, "modules": modules},
+        "c": {"id": "c"},
+        "d": None,
+    }
+    assert get_multi.call_count == 1
+    assert sorted(get_multi.call_args[0][0]) == sorted(extra_nodes)
+
+    # Shared parts are cached in the process
+    get_multi.reset_mock()
+    assembled = assemble_nodes(copy.deepcopy(items), get_multi)
+    assert assembled["a"]["modules"] == modules
+    assert not get_multi.called
+
+    # Assembled nodes do not share the cached values
+    assembled["a"]["modules"]["bar"] = "2.0"
+    assert assemble_nodes(copy.deepcopy(items), get_multi)["b"]["modules"] == modules
@@ -442,3 +442,65 @@ def test_app_no_matches(frame):
     enhancements = Enhancements.from_config_string("app:no +app")
     enhancements.apply_modifications_to_frame([frame], "native", None)
     assert frame.get("in_app")
+
+
+def test_literal_and_prefix_patterns():
+    enhancement = Enhancements.from_config_string(
+        """
+        function:main                  +app
+        module:foo.*                   +app
+        function:?oo                   +app
+    """
+    )
+    literal_rule, prefix_rule, wildcard_rule = enhancement.rules
+
+    assert _get_matching_frame_actions(literal_rule, [{"function": "main"}], "python")
+    assert not _get_matching_frame_actions(literal_rule, [{"function": "mainloop"}], "python")
+    assert not _get_matching_frame_actions(literal_rule, [{"function": "Main"}], "python")
+
+    assert _get_matching_frame_actions(prefix_rule, [{"module": "foo.bar"}], "python")
+    assert not _get_matching_frame_actions(prefix_rule, [{"module": "bar.foo.baz"}], "python")
+    assert not _get_matching_frame_actions(prefix_rule, [{"module": None}], "python")
+
+    assert _get_matching_frame_actions(wildcard_rule, [{"function": "foo"}], "python")
+    assert not _get_matching_frame_actions(wildcard_rule, [{"function": "fooo"}], "python")
+
+
+def test_guard_ignores_mutable_attributes():
+    # The first rule changes `in_app`, which the second rule matches on. The
+    # second rule must see the modified value.
+    enhancements = Enhancements.from_config_string(
+        """
+        function:foo                   +app
+        function:foo app:yes           category=bar
+    """
+    )
+    frame = {"function": "foo", "in_app": False}
+    enhancements.apply_modifications_to_frame([frame], "native", None)
+    assert frame["in_app"]
+    assert frame["data"]["category"] == "bar"
+
+
+def test_guard_shared_between_rules():
+    enhancements = Enhancements.from_config_string(
+        """
+        module:foo.* function:a        +app
+        module:foo.* function:b        -app
+    """
+    )
+    first, second = enhancements.rules
+    assert first._guard is second._guard
+
+    frames = [
+        {"module": "foo.x", "function": "a", "in_app": False},
+        {"module": "foo.y", "function": "b", "in_app": True},
+        {"module": "bar.z", "function": "a", "in_app": False},
+    ]
+    enhancements.apply_modifications_to_frame(frames, "python", None)
+    assert [frame["in_app"] for frame in frames] == [True, False, False]
+
+
+def test_loads_cached():
+    enhancements = Enhancements.from_config_string("function:foo +app")
+    data = enhancements.dumps()
+    assert Enhancements.loads(data) is Enhancements.loads(data)
@@ -0,0 +1,46 @@
+from sentry.grouping.grouphash_cache import (
+    _local_cache,
+    get_grouphashes_many,
+    invalidate_grouphash_cache,
+)
+from sentry.models import GroupHash
+from sentry.testutils import TestCase
+from sentry.testutils.helpers import override_options
+
+
+@override_options({"store.use-grouphash-cache": True})
+class GroupHashCacheTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        _local_cache.clear()
+
+    def test_resolves_from_cache(self):
+        group = self.create_group(project=self.project)
+        grouphash = GroupHash.objects.create(project=self.project, hash="a" * 32, group=group)
+
+        grouphashes = get_grouphashes_many({self.project.id: ["a" * 32, "b" * 32]})
+        assert grouphashes[self.project.id]["a" * 32].id == grouphash.id
+        assert "b" * 32 not in grouphashes[self.project.id]
+
+        with self.assertNumQueries(0):
+            grouphashes = get_grouphashes_many({self.project.id: ["a" * 32]})
+        assert grouphashes[self.project.id]["a" * 32].group_id == group.id
+
+    def test_unassigned_grouphashes_are_not_cached(self):
+        GroupHash.objects.create(project=self.project, hash="a" * 32)
+        get_grouphashes_many({self.project.id: ["a" * 32]})
+
+        with self.assertNumQueries(1):
+            get_grouphashes_many({self.project.id: ["a" * 32]})
+
+    def test_invalidate(self):
+        group = self.create_group(project=self.project)
+        other_group = self.create_group(project=self.project)
+        GroupHash.objects.create(project=self.project, hash="a" * 32, group=group)
+        get_grouphashes_many({self.project.id: ["a" * 32]})
+
+        GroupHash.objects.filter(project=self.project, hash="a" * 32).update(group=other_group)
+        invalidate_grouphash_cache(self.project.id)
+
+        grouphashes = get_grouphashes_many({self.project.id: ["a" * 32]})
+        assert grouphashes[self.project.id]["a" * 32].group_id == other_group.id
@@ -1601,6 +1601,50 @@ class ProcessUpdateTest(ProcessUpdateBaseClass):
             incident, [self.action], [(150.0, IncidentStatus.CLOSED)]
         )
 
+    def test_comparison_alert_stored_values(self):
+        rule = self.comparison_rule_above
+        rule.update(comparison_delta=60)
+        trigger = self.trigger
+
+        with self.options({"incidents.store-comparison-values": True}), patch.object(
+            SubscriptionProcessor, "query_comparison_aggregate", return_value=None
+        ) as query_comparison_aggregate:
+            # The update from a minute ago has not been seen, so Snuba is queried
+            processor = self.send_update(rule, 4, timedelta(minutes=-3), subscription=self.sub)
+            self.assert_trigger_counts(processor, trigger, 0, 0)
+            self.assert_no_active_incident(rule)
+            assert query_comparison_aggregate.call_count == 1
+
+            # Compared to the previous update, 6/4 == 150%, but we want > 150%
+            processor = self.send_update(rule, 6, timedelta(minutes=-2), subscription=self.sub)
+            self.assert_no_active_incident(rule)
+
+            # Compared to the previous update, 10/6 == 166% > 150%
+            processor = self.send_update(rule, 10, timedelta(minutes=-1), subscription=self.sub)
+            assert query_comparison_aggregate.call_count == 1
+            incident = self.assert_active_incident(rule)
+            self.assert_trigger_exists_with_status(incident, trigger, TriggerStatus.ACTIVE)
+
+            # There is a gap of a minute, so Snuba is queried again
+            processor = self.send_update(rule, 10, timedelta(minutes=1), subscription=self.sub)
+            assert query_comparison_aggregate.call_count == 2
+
+    def test_comparison_alert_stored_values_error(self):
+        rule = self.comparison_rule_above
+        rule.update(comparison_delta=60)
+
+        with self.options({"incidents.store-comparison-values": True}), patch(
+            "sentry.incidents.subscription_processor.get_and_store_comparison_value",
+            side_effect=Exception("boom"),
+        ), patch.object(
+            SubscriptionProcessor, "query_comparison_aggregate", return_value=4
+        ) as query_comparison_aggregate:
+            # Compared to the queried value, 10/4 == 250% > 150%
+            self.send_update(rule, 10, timedelta(minutes=-1), subscription=self.sub)
+            assert query_comparison_aggregate.call_count == 1
+            incident = self.assert_active_incident(rule)
+            self.assert_trigger_exists_with_status(incident, self.trigger, TriggerStatus.ACTIVE)
+
 
 class MetricsCrashRateAlertProcessUpdateTest(ProcessUpdateBaseClass, BaseMetricsTestCase):
     entity_subscription_metrics = patcher("sentry.snuba.entity_subscription.metrics")
@@ -9,10 +9,12 @@ from sentry.event_manager import EventManager
 from sentry.ingest.ingest_consumer import (
     process_attachment_chunk,
     process_event,
+    process_event_batch,
     process_individual_attachment,
     process_userreport,
 )
 from sentry.models import EventAttachment, EventUser, File, UserReport
+from sentry.testutils.helpers import override_options
 from sentry.utils import json
 
 
@@ -29,6 +31,13 @@ def save_event_transaction(monkeypatch):
     return mock
 
 
+@pytest.fixture
+def save_event_transactions(monkeypatch):
+    mock = Mock()
+    monkeypatch.setattr("sentry.ingest.ingest_consumer.save_event_transactions", mock)
+    return mock
+
+
 @pytest.fixture
 def preprocess_event(monkeypatch):
     calls = []
@@ -119,6 +128,78 @@ def test_transactions_spawn_save_event_transaction(
     )
 
 
+@pytest.mark.django_db
+def test_process_event_batch(
+    default_project,
+    task_runner,
+    preprocess_event,
+    save_event_transaction,
+    save_event_transactions,
+):
+    project_id = default_project.id
+    now = datetime.datetime.now()
+    start_time = time.time() - 3600
+
+    payloads = [get_normalized_event({"message": "hello world"}, default_project)]
+    for _ in range(3):
+        transaction = {
+            "type": "transaction",
+            "timestamp": now.isoformat(),
+            "start_timestamp": now.isoformat(),
+            "spans": [],
+            "contexts": {
+                "trace": {
+                    "parent_span_id": "8988cec7cc0779c1",
+                    "type": "trace",
+                    "op": "foobar",
+                    "trace_id": "a7d67cf796774551a95be6543cacd459",
+                    "span_id": "babaae0d4b7512d9",
+                    "status": "ok",
+                }
+            },
+        }
+        payloads.append(get_normalized_event(transaction, default_project))
+
+    messages = [
+        {
+            "payload": json.dumps(payload),
+            "start_time": start_time,
+            "event_id": payload["event_id"],
+            "project_id": project_id,
+            "remote_addr": "127.0.0.1",
+        }
+        for payload in payloads
+    ]
+
+    with override_options({"ingest-consumer.transaction-batch-size": 2}):
+        # The duplicate of the error event is dropped
+        process_event_batch(messages + messages[:1], projects={project_id: default_project})
+
+    (kwargs,) = preprocess_event
+    assert kwargs["cache_key"] == f"e:{payloads[0]['event_id']}:{project_id}"
+    assert kwargs["data"] == payloads[0]
+
+    assert not save_event_transaction.delay.called
+    assert [call[1]["events"] for call in save_event_transactions.delay.call_args_list] == [
+        [
+            dict(
+                cache_key=f"e:{payload['event_id']}:{project_id}",
+                data=None,
+                start_time=start_time,
+                event_id=payload["event_id"],
+                project_id=project_id,
+            )
+            for payload in batch
+        ]
+        for batch in (payloads[1:3], payloads[3:])
+    ]
+
+    # All events have been seen now
+    process_event_batch(messages, projects={project_id: default_project})
+    assert len(preprocess_event) == 1
+    assert save_event_transactions.delay.call_count == 2
+
+
 @pytest.mark.django_db
 @pytest.mark.parametrize("missing_chunks", (True, False))
 def test_with_attachments(default_project, task_runner, missing_chunks, monkeypatch, django_cache):
@@ -1,6 +1,6 @@
 from unittest import TestCase
 
-from sentry.lang.javascript.cache import SourceCache
+from sentry.lang.javascript.cache import ParsedArtifactCache, SourceCache
 
 
 class BasicCacheTest(TestCase):
@@ -34,3 +34,30 @@ class BasicCacheTest(TestCase):
         # fall back to utf-8
         cache.add(url, "foobar".encode("utf-32"), encoding="utf-32")
         assert cache.get(url)[0] == "foobar"
+
+
+class ParsedArtifactCacheTest(TestCase):
+    def test_evicts_by_size(self):
+        cache = ParsedArtifactCache(10)
+
+        cache.set("a", "A", 4)
+        cache.set("b", "B", 4)
+        assert cache.get("a") == "A"
+
+        # "b" is the least recently used entry
+        cache.set("c", "C", 4)
+        assert cache.get("b") is None
+        assert cache.get("a") == "A"
+        assert cache.get("c") == "C"
+        assert cache.size == 8
+
+        cache.set("a", "A2", 2)
+        assert cache.get("a") == "A2"
+        assert cache.size == 6
+
+    def test_too_large(self):
+        cache = ParsedArtifactCache(10)
+        cache.set("a", "A", 4)
+        cache.set("b", "B", 11)
+        assert cache.get("b") is None
+        assert cache.get("a") == "A"
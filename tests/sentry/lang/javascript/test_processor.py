@@ -9,9 +9,11 @@ from unittest.mock import ANY, MagicMock, call, patch
 import pytest
 import responses
 from requests.exceptions import RequestException
+from symbolic import SourceMapCache as SmCache
 
 from sentry import http, options
 from sentry.event_manager import get_tag
+from sentry.lang.javascript.cache import ParsedArtifactCache
 from sentry.lang.javascript.errormapping import REACT_MAPPING_URL, rewrite_exception
 from sentry.lang.javascript.processor import (
     CACHE_CONTROL_MAX,
@@ -1160,6 +1162,24 @@ class FetchSourcemapTest(TestCase):
         with pytest.raises(UnparseableSourcemap):
             fetch_sourcemap("http://example.com")
 
+    @patch("sentry.lang.javascript.processor.get_parsed_artifact_cache")
+    def test_parsed_artifact_cache(self, get_parsed_artifact_cache):
+        get_parsed_artifact_cache.return_value = ParsedArtifactCache(1024 * 1024)
+
+        with patch(
+            "sentry.lang.javascript.processor.SmCache.from_bytes", wraps=SmCache.from_bytes
+        ) as from_bytes:
+            smap_view = fetch_sourcemap(base64_sourcemap, source=b"foo")
+            assert fetch_sourcemap(base64_sourcemap, source=b"foo") is smap_view
+            assert from_bytes.call_count == 1
+
+            # The sourcemap is parsed again for another minified source
+            fetch_sourcemap(base64_sourcemap, source=b"bar")
+            assert from_bytes.call_count == 2
+
+        with pytest.raises(UnparseableSourcemap):
+            fetch_sourcemap("data:application/json;base64,xxx")
+
 
 class TrimLineTest(unittest.TestCase):
     long_line = "The public is more familiar with bad design than good design. It is, in effect, conditioned to prefer bad design, because that is what it lives with. The new becomes threatening, the old reassuring."
@@ -1509,3 +1529,61 @@ class CacheSourceTest(TestCase):
         # now we have an error
         assert len(processor.cache.get_errors(abs_path)) == 1
         assert processor.cache.get_errors(abs_path)[0] == {"url": map_url, "type": "js_no_source"}
+
+    @patch("sentry.lang.javascript.processor.fetch_file")
+    def test_populate_source_cache_concurrently(self, mock_fetch_file):
+        def fetch_file(url, **kwargs):
+            if url.endswith(("missing.js", ".map")):
+                raise http.CannotFetch({"type": EventError.JS_MISSING_SOURCE, "url": url})
+            if url.endswith("broken.js"):
+                body = b"foo\n//# sourceMappingURL=broken.js.map"
+            else:
+                body = b"foo\n//# sourceMappingURL=" + base64_sourcemap.encode("utf-8")
+            return http.UrlResult(url, {}, body, 200, None)
+
+        mock_fetch_file.side_effect = fetch_file
+
+        project = self.create_project()
+        processor = JavaScriptStacktraceProcessor(data={}, stacktrace_infos=None, project=project)
+
+        abs_paths = ["app:///a.js", "app:///b.js", "app:///broken.js", "app:///node_modules/x.js"]
+        with override_options({"sourcemaps.fetch-concurrency": 4}):
+            processor.populate_source_cache([{"abs_path": abs_path} for abs_path in abs_paths])
+
+        for abs_path in ("app:///a.js", "app:///b.js"):
+            assert processor.cache.get(abs_path)
+            assert processor.cache.get_errors(abs_path) == []
+            sourcemap_url, sourcemap_view = processor.sourcemaps.get_link(abs_path)
+            assert sourcemap_url == base64_sourcemap
+            assert sourcemap_view
+
+        assert processor.cache.get("app:///broken.js")
+        assert processor.cache.get_errors("app:///broken.js") == [
+            {"type": EventError.JS_MISSING_SOURCE, "url": "app:///broken.js.map"}
+        ]
+
+        # missing node_modules files are not an error
+        assert processor.cache.get("app:///node_modules/x.js") is None
+        assert processor.cache.get_errors("app:///node_modules/x.js") == []
+
+    @patch("sentry.lang.javascript.processor.fetch_file")
+    def test_populate_source_cache_concurrently_max_fetches(self, mock_fetch_file):
+        mock_fetch_file.side_effect = lambda url, **kwargs: http.UrlResult(
+            url, {}, b"foo", 200, None
+        )
+
+        project = self.create_project()
+        processor = JavaScriptStacktraceProcessor(data={}, stacktrace_infos=None, project=project)
+        processor.max_fetches = 2
+
+        abs_paths = ["app:///a.js", "app:///b.js", "app:///c.js"]
+        with override_options({"sourcemaps.fetch-concurrency": 4}):
+            processor.populate_source_cache([{"abs_path": abs_path} for abs_path in abs_paths])
+
+        assert mock_fetch_file.call_count == 2
+        errors = [processor.cache.get_errors(abs_path) for abs_path in abs_paths]
+        assert sorted(errors, key=len) == [
+            [],
+            [],
+            [{"type": EventError.JS_TOO_MANY_REMOTE_SOURCES}],
+        ]
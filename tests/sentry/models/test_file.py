@@ -1,4 +1,5 @@
 import os
+import tempfile
 from io import BytesIO
 from unittest.mock import patch
 
@@ -6,6 +7,7 @@ import pytest
 from django.core.files.base import ContentFile
 from django.db import DatabaseError
 
+from sentry.filestore.cache import TEMP_PREFIX, FileBlobCache
 from sentry.models import File, FileBlob, FileBlobIndex
 from sentry.testutils import TestCase
 
@@ -164,3 +166,74 @@ class FileTest(TestCase):
 
         f = file.getfile(prefetch=True)
         assert f.read() == random_data
+
+    def test_read_ahead(self):
+        bytes = BytesIO(b"abcdefghijklmnopqrstuvwxyz")
+        file1 = File.objects.create(name="baz.js", type="default", size=26)
+        file1.putfile(bytes, 5)
+
+        with self.options({"filestore.read-ahead-blobs": 2}):
+            with file1.getfile() as fp:
+                assert fp.read(7) == b"abcdefg"
+                assert fp.read() == b"hijklmnopqrstuvwxyz"
+
+                fp.seek(12)
+                assert fp.tell() == 12
+                assert fp.read(3) == b"mno"
+
+                fp.seek(1)
+                assert fp.read(5) == b"bcdef"
+
+    def test_blob_cache(self):
+        file1 = File.objects.create(name="baz.js", type="default", size=7)
+        file1.putfile(ContentFile(b"foo bar"), 3)
+
+        with tempfile.TemporaryDirectory() as cache_dir, self.settings(
+            SENTRY_FILEBLOB_CACHE_DIR=cache_dir
+        ), patch.object(
+            FileBlob, "getfile", autospec=True, side_effect=FileBlob.getfile
+        ) as getfile:
+            for _ in range(2):
+                with file1.getfile() as fp:
+                    assert fp.read() == b"foo bar"
+
+            assert getfile.call_count == 3
+            assert sum(len(names) for _, _, names in os.walk(cache_dir)) == 3
+
+    def test_blob_cache_trim(self):
+        file1 = File.objects.create(name="baz.js", type="default", size=7)
+        file1.putfile(ContentFile(b"foo bar"), 3)
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            blob_cache = FileBlobCache(cache_dir, max_size=4)
+            blobs = [
+                idx.blob for idx in FileBlobIndex.objects.filter(file=file1).order_by("offset")
+            ]
+            for i, blob in enumerate(blobs):
+                with blob_cache.open(blob) as f:
+                    f.read()
+                os.utime(blob_cache._get_path(blob.checksum), (i, i))
+
+            # The least recently used blob is removed
+            blob_cache.trim()
+            assert not os.path.exists(blob_cache._get_path(blobs[0].checksum))
+            assert os.path.exists(blob_cache._get_path(blobs[1].checksum))
+            assert os.path.exists(blob_cache._get_path(blobs[2].checksum))
+
+    def test_blob_cache_trim_temp_files(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            blob_cache = FileBlobCache(cache_dir, max_size=1024)
+            directory = os.path.join(cache_dir, "ab")
+            os.makedirs(directory)
+            paths = []
+            for name in ("stale", "fresh"):
+                path = os.path.join(directory, f"{TEMP_PREFIX}{name}")
+                with open(path, "wb") as f:
+                    f.write(b"foo")
+                paths.append(path)
+            os.utime(paths[0], (0, 0))
+
+            # Temporary files left behind by dead processes are removed
+            blob_cache.trim()
+            assert not os.path.exists(paths[0])
+            assert os.path.exists(paths[1])
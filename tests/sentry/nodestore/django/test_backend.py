@@ -51,6 +51,23 @@ class TestDjangoNodeStorage:
             b'{"foo":"bar"}'
         )
 
+    def test_set_binary_format(self):
+        ns = DjangoNodeStorage(binary_format=True)
+        ns.set_subkeys(
+            "d2502ebbd7df41ceba8d3275595cac33", {None: {"foo": "bar"}, "unprocessed": {"foo": 1}}
+        )
+
+        node = Node.objects.get(id="d2502ebbd7df41ceba8d3275595cac33")
+        assert node.data == ""
+        assert bytes(node.data_bytes).startswith(b"\x00SNB")
+
+        assert ns.get(node.id) == {"foo": "bar"}
+        assert ns.get(node.id, subkey="unprocessed") == {"foo": 1}
+
+        # legacy nodes can still be read
+        Node.objects.create(id="5394aa025b8e401ca6bc3ddee3130edc", data=compress(b'{"foo": "baz"}'))
+        assert ns.get("5394aa025b8e401ca6bc3ddee3130edc") == {"foo": "baz"}
+
     def test_delete(self):
         node = Node.objects.create(id="d2502ebbd7df41ceba8d3275595cac33", data=b'{"foo": "bar"}')
 
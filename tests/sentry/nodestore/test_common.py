@@ -3,9 +3,11 @@ Testsuite of backend-independent nodestore tests. Add your backend to the
 `ns` fixture to have it tested.
 """
 from contextlib import nullcontext
+from unittest import mock
 
 import pytest
 
+from sentry.eventstore import compressor
 from sentry.nodestore.django.backend import DjangoNodeStorage
 from tests.sentry.nodestore.bigtable.test_backend import (
     MockedBigtableNodeStorage,
@@ -14,14 +16,24 @@ from tests.sentry.nodestore.bigtable.test_backend import (
 
 
 @pytest.fixture(
-    params=["bigtable-mocked", "bigtable-real", pytest.param("django", marks=pytest.mark.django_db)]
+    params=[
+        "bigtable-mocked",
+        "bigtable-mocked-binary",
+        "bigtable-real",
+        pytest.param("django", marks=pytest.mark.django_db),
+        pytest.param("django-binary", marks=pytest.mark.django_db),
+    ]
 )
 def ns(request):
     # backends are returned from context managers to support teardown when required
     backends = {
         "bigtable-mocked": lambda: nullcontext(MockedBigtableNodeStorage(project="test")),
+        "bigtable-mocked-binary": lambda: nullcontext(
+            MockedBigtableNodeStorage(project="test", binary_format=True)
+        ),
         "bigtable-real": lambda: get_temporary_bigtable_nodestorage(),
         "django": lambda: nullcontext(DjangoNodeStorage()),
+        "django-binary": lambda: nullcontext(DjangoNodeStorage(binary_format=True)),
     }
 
     ctx = backends[request.param]()
@@ -91,3 +103,59 @@ def test_set_subkeys(ns):
     ns.delete("node_1")
     assert ns.get("node_1") is None
     assert ns.get("node_1", subkey="other") is None
+
+
+def test_set_subkeys_multi(ns):
+    ns.set_subkeys_multi(
+        {
+            "a" * 32: {None: {"foo": "a"}, "unprocessed": {"foo": "ua"}},
+            "b" * 32: {None: {"foo": "b"}},
+        }
+    )
+
+    assert ns.get_multi(["a" * 32, "b" * 32]) == {"a" * 32: {"foo": "a"}, "b" * 32: {"foo": "b"}}
+    assert ns.get("a" * 32, subkey="unprocessed") == {"foo": "ua"}
+    assert ns.get("b" * 32, subkey="unprocessed") is None
+
+
+def test_set_subkeys_multi_deduplicated(ns):
+    compressor._extra_keys_cache.clear()
+
+    modules = {"foo": "1.0", "bar": "2.0"}
+    a = {"foo": "a", "project": 1, "modules": modules}
+    b = {"foo": "b", "project": 1, "modules": modules}
+    d = {"foo": "d", "project": 2, "modules": modules}
+    e = {"foo": "e", "modules": modules}
+    nodes = {
+        "a" * 32: {None: a, "unprocessed": {"foo": "ua"}},
+        "b" * 32: {None: b},
+        "d" * 32: {None: d},
+        "e" * 32: {None: e},
+    }
+    ns.set_subkeys_multi_deduplicated(nodes)
+
+    raw = ns._get_multi(["a" * 32])["a" * 32]
+    assert "modules" not in raw
+    (patchset,) = raw[compressor.PATCHSETS_KEY]
+    extra_node_id = compressor.get_extra_key_node_id(1, patchset[1])
+    assert ns.get(extra_node_id) == modules
+
+    # Shared parts are stored for every project, nodes without one are not deduplicated
+    assert ns.get(compressor.get_extra_key_node_id(2, patchset[1])) == modules
+    assert ns._get_multi(["e" * 32])["e" * 32] == e
+
+    assert ns.get_multi(["a" * 32, "b" * 32, "d" * 32, "e" * 32]) == {
+        "a" * 32: a,
+        "b" * 32: b,
+        "d" * 32: d,
+        "e" * 32: e,
+    }
+    assert ns.get("a" * 32) == a
+    assert ns.get("a" * 32, subkey="unprocessed") == {"foo": "ua"}
+
+    # Shared parts are written again, so that they outlive the new nodes
+    with mock.patch.object(ns, "set_subkeys_multi", wraps=ns.set_subkeys_multi) as set_multi:
+        ns.set_subkeys_multi_deduplicated(
+            {"c" * 32: {None: {"foo": "c", "project": 1, "modules": modules}}}
+        )
+    assert extra_node_id in set_multi.call_args[0][0]
@@ -0,0 +1,28 @@
+import pytest
+
+from sentry.nodestore.format import NodeFormatError, encode, is_binary_node, read_section
+
+
+def test_roundtrip():
+    payload = b'{"message":"' + b"hello world " * 20 + b'"}'
+    value = encode({None: payload, "unprocessed": b"{}"})
+
+    assert is_binary_node(value)
+    assert read_section(value) == payload
+    assert read_section(value, "unprocessed") == b"{}"
+    assert read_section(value, "missing") is None
+
+
+def test_legacy_nodes_are_not_binary():
+    assert not is_binary_node(b'{"foo":"bar"}\nunprocessed\n{}')
+    assert not is_binary_node(b"\x80\x03}q\x00.")
+
+
+def test_truncated():
+    value = encode({None: b'{"foo":"bar"}'})
+
+    with pytest.raises(NodeFormatError):
+        read_section(value[:8])
+
+    with pytest.raises(NodeFormatError):
+        read_section(value[:-2])
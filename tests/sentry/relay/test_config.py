@@ -11,7 +11,7 @@ from sentry.dynamic_sampling.latest_release_booster import (
 )
 from sentry.models import ProjectKey
 from sentry.models.transaction_threshold import TransactionMetric
-from sentry.relay.config import get_project_config
+from sentry.relay.config import get_project_config, get_project_configs
 from sentry.testutils.factories import Factories
 from sentry.testutils.helpers import Feature
 from sentry.testutils.helpers.options import override_options
@@ -620,3 +620,23 @@ def test_accept_transaction_names(default_project, org_sample):
             if org_sample
             else "strict"
         )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("full", [False, True], ids=["slim_config", "full_config"])
+def test_get_project_configs(default_project, default_projectkey, full):
+    other_key = ProjectKey.objects.create(project=default_project)
+    keys = [default_projectkey, other_key]
+
+    configs = get_project_configs(default_project, keys, full_config=full)
+
+    assert set(configs) == {key.public_key for key in keys}
+    for key in keys:
+        cfg = configs[key.public_key].to_dict()
+        expected = get_project_config(default_project, full_config=full, project_keys=[key])
+        expected = expected.to_dict()
+        for cfg_key in ("lastChange", "lastFetch", "rev"):
+            cfg.pop(cfg_key)
+            expected.pop(cfg_key)
+        assert cfg == expected
+        assert [k["publicKey"] for k in cfg["publicKeys"]] == [key.public_key]
@@ -24,3 +24,14 @@ def test_read_write():
     my_key = "fake-dsn-1"
     cache.set_many({my_key: "my-value"})
     assert cache.get(my_key) == "my-value"
+
+
+@pytest.mark.django_db
+def test_get_many():
+    cache = redis.RedisProjectConfigCache()
+    cache.set_many({"fake-dsn-1": {"a": 1}, "fake-dsn-2": {"b": 2}})
+    assert cache.get_many(["fake-dsn-1", "fake-dsn-2", "fake-dsn-3"]) == {
+        "fake-dsn-1": {"a": 1},
+        "fake-dsn-2": {"b": 2},
+        "fake-dsn-3": None,
+    }
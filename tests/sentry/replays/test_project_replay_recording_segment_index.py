@@ -1,10 +1,14 @@
 import uuid
 import zlib
 from io import BytesIO
+from unittest import mock
 
 from django.urls import reverse
 
 from sentry.models import File
+from sentry.replays.endpoints.project_replay_recording_segment_index import (
+    ProjectReplayRecordingSegmentIndexEndpoint,
+)
 from sentry.replays.models import ReplayRecordingSegment
 from sentry.testutils import APITestCase, TransactionTestCase
 from sentry.testutils.silo import region_silo_test
@@ -183,3 +187,45 @@ class DownloadSegmentsTestCase(TransactionTestCase):
         assert b'[[{"test":"hello 1"}],[{"test":"hello 2"}]]' == b"".join(
             response.streaming_content
         )
+
+    def test_index_download_many_segments(self):
+        # More segments than are fetched at once, with files created out of order.
+        for i in reversed(range(0, 10)):
+            f = File.objects.create(name=f"rr:{i}", type="replay.recording")
+            payload = f'[{{"test":"hello {i}"}}]'.encode()
+            f.putfile(BytesIO(zlib.compress(payload) if i % 2 else payload))
+            ReplayRecordingSegment.objects.create(
+                replay_id=self.replay_id,
+                project_id=self.project.id,
+                segment_id=i,
+                file_id=f.id,
+            )
+
+        with self.feature("organizations:session-replay"):
+            response = self.client.get(self.url + "?download")
+
+        assert response.status_code == 200
+        expected = ",".join(f'[{{"test":"hello {i}"}}]' for i in range(0, 10))
+        assert f"[{expected}]".encode() == b"".join(response.streaming_content)
+
+    def test_index_download_aborted(self):
+        fetched = []
+
+        def get_chunked_blob_from_indexes(file_blob_indexes):
+            segment = BytesIO(b'[{"test":"hello"}]')
+            fetched.append(segment)
+            return segment
+
+        files = [mock.Mock(file_blob_indexes=[]) for _ in range(10)]
+        with mock.patch(
+            "sentry.replays.endpoints.project_replay_recording_segment_index.get_chunked_blob_from_indexes",
+            get_chunked_blob_from_indexes,
+        ):
+            generator = ProjectReplayRecordingSegmentIndexEndpoint().segment_generator(files)
+            assert next(generator) == b"["
+            assert next(generator) == b'[{"test":"hello"}]'
+            # The client went away
+            generator.close()
+
+        assert fetched
+        assert all(segment.closed for segment in fetched)
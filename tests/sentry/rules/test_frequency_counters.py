@@ -0,0 +1,123 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.utils import timezone
+from freezegun import freeze_time
+
+from sentry.models import Rule
+from sentry.rules.conditions.event_frequency import EventFrequencyCondition
+from sentry.rules.frequency_counters import (
+    get_group_event_count,
+    incr_group_event_count,
+    reset_group_event_count,
+)
+from sentry.testutils.cases import RuleTestCase, TestCase
+
+
+class FrequencyCountersTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.now = timezone.now().replace(microsecond=0)
+
+    def test_counts(self):
+        with freeze_time(self.now):
+            assert get_group_event_count(1, None, self.now, self.now) is None
+            for _ in range(3):
+                incr_group_event_count(1, 5, self.now)
+            incr_group_event_count(1, None, self.now)
+            incr_group_event_count(2, None, self.now)
+
+        end = self.now + timedelta(minutes=10)
+        with freeze_time(end):
+            incr_group_event_count(1, 5, end)
+
+            assert get_group_event_count(1, None, self.now, end) == 5
+            assert get_group_event_count(1, 5, self.now, end) == 4
+            assert get_group_event_count(1, 6, self.now, end) == 0
+            assert get_group_event_count(1, None, end - timedelta(minutes=1), end) == 1
+            assert get_group_event_count(2, None, self.now, end) == 1
+
+            # The group has not been counted before
+            assert get_group_event_count(1, None, self.now - timedelta(minutes=1), end) is None
+
+    def test_reset(self):
+        with freeze_time(self.now):
+            incr_group_event_count(1, None, self.now)
+            incr_group_event_count(2, None, self.now)
+            reset_group_event_count(1)
+
+            assert get_group_event_count(1, None, self.now, self.now) is None
+            assert get_group_event_count(2, None, self.now, self.now) == 1
+
+        # Counting starts over with the next event
+        end = self.now + timedelta(minutes=1)
+        with freeze_time(end):
+            incr_group_event_count(1, None, end)
+            assert get_group_event_count(1, None, self.now, end) is None
+            assert get_group_event_count(1, None, end, end) == 1
+
+    def test_window_too_old(self):
+        with freeze_time(self.now):
+            incr_group_event_count(1, None, self.now)
+
+        end = self.now + timedelta(hours=2)
+        with freeze_time(end):
+            incr_group_event_count(1, None, end)
+            assert get_group_event_count(1, None, end - timedelta(minutes=30), end) == 1
+            assert get_group_event_count(1, None, self.now, end) is None
+
+    def test_hour_window(self):
+        with freeze_time(self.now):
+            incr_group_event_count(1, None, self.now)
+
+        end = self.now + timedelta(hours=1, microseconds=500000)
+        with freeze_time(end):
+            incr_group_event_count(1, None, end)
+            assert get_group_event_count(1, None, end - timedelta(hours=1), end) == 2
+
+    def test_old_events(self):
+        with freeze_time(self.now):
+            incr_group_event_count(1, None, self.now - timedelta(hours=2))
+            incr_group_event_count(1, None, self.now + timedelta(hours=2))
+            start = self.now - timedelta(minutes=5)
+            assert get_group_event_count(1, None, start, self.now) is None
+
+        with freeze_time(self.now + timedelta(minutes=5)):
+            # Events from the future are counted as of now
+            assert get_group_event_count(1, None, self.now, self.now) == 1
+
+
+class EventFrequencyCountersTest(RuleTestCase):
+    rule_cls = EventFrequencyCondition
+
+    def test_passes_from_counters(self):
+        event = self.store_event(data={}, project_id=self.project.id)
+        tsdb = mock.Mock()
+        rule = self.get_rule(
+            data={"interval": "5m", "value": 2}, rule=Rule(environment_id=None), tsdb=tsdb
+        )
+
+        start = timezone.now() - timedelta(minutes=10)
+        with freeze_time(start):
+            incr_group_event_count(event.group_id, None, start)
+
+        with self.options({"rules.frequency-counters": True}):
+            for _ in range(3):
+                incr_group_event_count(event.group_id, None, timezone.now())
+            self.assertPasses(rule, event)
+
+        assert not tsdb.get_sums.called
+
+    def test_falls_back_on_cold_start(self):
+        event = self.store_event(data={}, project_id=self.project.id)
+        tsdb = mock.Mock()
+        tsdb.get_sums.return_value = {event.group_id: 3}
+        rule = self.get_rule(
+            data={"interval": "5m", "value": 2}, rule=Rule(environment_id=None), tsdb=tsdb
+        )
+
+        with self.options({"rules.frequency-counters": True}):
+            incr_group_event_count(event.group_id, None, timezone.now())
+            self.assertPasses(rule, event)
+
+        assert tsdb.get_sums.called
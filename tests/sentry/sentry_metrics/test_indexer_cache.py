@@ -1,8 +1,11 @@
+from unittest import mock
+
 import pytest
 from django.conf import settings
 
 from sentry.sentry_metrics.configuration import UseCaseKey
-from sentry.sentry_metrics.indexer.cache import StringIndexerCache
+from sentry.sentry_metrics.indexer.cache import CachingIndexer, StringIndexerCache
+from sentry.testutils.helpers import override_options
 from sentry.utils.cache import cache
 from sentry.utils.hashlib import md5_text
 
@@ -71,3 +74,63 @@ def test_separate_namespacing() -> None:
     indexer_cache.set("a", 2, UseCaseKey.PERFORMANCE.value)
     assert indexer_cache.get("a", UseCaseKey.RELEASE_HEALTH.value) == 1
     assert indexer_cache.get("a", UseCaseKey.PERFORMANCE.value) == 2
+
+
+def test_local_cache(use_case_id: str) -> None:
+    local_cache = StringIndexerCache(
+        **settings.SENTRY_STRING_INDEXER_CACHE_OPTIONS,
+        partition_key=_PARTITION_KEY,
+        local_cache_size=10,
+    )
+    with override_options({"sentry-metrics.indexer.local-cache": True}):
+        cache.clear()
+        local_cache.set_many({"1:a": 1, "1:b": 2}, use_case_id)
+
+        # Served from the local cache even after the shared cache lost it
+        cache.clear()
+        assert local_cache.get("1:a", use_case_id) == 1
+        assert local_cache.get_many(["1:a", "1:b", "1:c"], use_case_id) == {
+            "1:a": 1,
+            "1:b": 2,
+            "1:c": None,
+        }
+        assert local_cache.get_string(1, 2, use_case_id) == "b"
+        assert local_cache.get_string(2, 2, use_case_id) is None
+
+        local_cache.delete("1:a", use_case_id)
+        assert local_cache.get("1:a", use_case_id) is None
+        assert local_cache.get_string(1, 1, use_case_id) is None
+
+
+def test_local_cache_disabled(use_case_id: str) -> None:
+    local_cache = StringIndexerCache(
+        **settings.SENTRY_STRING_INDEXER_CACHE_OPTIONS,
+        partition_key=_PARTITION_KEY,
+        local_cache_size=10,
+    )
+    cache.clear()
+    local_cache.set("1:a", 1, use_case_id)
+    cache.clear()
+    assert local_cache.get("1:a", use_case_id) is None
+    assert local_cache.get_string(1, 1, use_case_id) is None
+
+
+def test_reverse_resolve_local_cache() -> None:
+    local_cache = StringIndexerCache(
+        **settings.SENTRY_STRING_INDEXER_CACHE_OPTIONS,
+        partition_key=_PARTITION_KEY,
+        local_cache_size=10,
+    )
+    indexer = mock.Mock()
+    indexer.reverse_resolve.return_value = "a"
+    caching_indexer = CachingIndexer(local_cache, indexer)
+
+    with override_options({"sentry-metrics.indexer.local-cache": True}):
+        assert caching_indexer.reverse_resolve(UseCaseKey.RELEASE_HEALTH, 1, 1) == "a"
+        assert caching_indexer.reverse_resolve(UseCaseKey.RELEASE_HEALTH, 1, 1) == "a"
+        assert indexer.reverse_resolve.call_count == 1
+
+        # The reverse lookup also populates the forward direction
+        cache.clear()
+        assert caching_indexer.resolve(UseCaseKey.RELEASE_HEALTH, 1, "a") == 1
+        assert indexer.resolve.call_count == 0
@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+
+import pytz
+from django.core.cache import cache
+
+from sentry.snuba.timeseries_cache import get_bucketed_timeseries, get_query_fingerprint
+from sentry.testutils import TestCase
+
+ROLLUP = 3600
+
+
+class BucketedTimeseriesTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.now = datetime.utcnow().replace(tzinfo=pytz.utc)
+        self.fingerprint = get_query_fingerprint({"project_id": [self.project.id]}, query="")
+        self.calls = []
+        self.version = 1
+
+    def run_queries(self, ranges):
+        self.calls.append(ranges)
+        results = []
+        for start, end in ranges:
+            data = []
+            bucket = int(start.timestamp()) // ROLLUP * ROLLUP
+            while bucket < end.timestamp():
+                data.append({"time": bucket, "count": self.version})
+                bucket += ROLLUP
+            results.append({"data": data, "meta": [{"name": "count", "type": "UInt64"}]})
+        return results
+
+    def query(self, start, end):
+        return get_bucketed_timeseries(self.fingerprint, start, end, ROLLUP, self.run_queries)
+
+    def test_only_queries_open_buckets(self):
+        start = self.now - timedelta(days=1)
+        first = self.query(start, self.now)
+        assert self.calls == [[(start, self.now)]]
+        times = [row["time"] for row in first["data"]]
+        assert times == sorted(times)
+        assert len(times) == len(set(times)) == 25
+
+        self.version = 2
+        second = self.query(start, self.now)
+        assert second["meta"] == first["meta"]
+        assert [row["time"] for row in second["data"]] == times
+
+        # Only the partial first bucket and the open buckets are queried again
+        head, tail = self.calls[1]
+        assert head[0] == start
+        assert head[1].timestamp() == times[1]
+        assert tail[1] == self.now
+        fresh = [row["time"] for row in second["data"] if row["count"] == 2]
+        assert fresh[0] == times[0]
+        assert all(time >= tail[0].timestamp() for time in fresh[1:])
+        assert len(fresh) < len(times)
+
+    def test_string_times(self):
+        def run_queries(ranges):
+            results = self.run_queries(ranges)
+            for result in results:
+                for row in result["data"]:
+                    row["time"] = datetime.fromtimestamp(row["time"], tz=pytz.utc).isoformat()
+            return results
+
+        start = self.now - timedelta(days=1)
+        first = get_bucketed_timeseries(self.fingerprint, start, self.now, ROLLUP, run_queries)
+        second = get_bucketed_timeseries(self.fingerprint, start, self.now, ROLLUP, run_queries)
+        assert [row["time"] for row in first["data"]] == [row["time"] for row in second["data"]]
+        # Times are returned as Snuba returns them, whether they are cached or not
+        assert all(isinstance(row["time"], str) for row in second["data"])
+
+    def test_no_closed_buckets(self):
+        start = self.now - timedelta(minutes=1)
+        self.query(start, self.now)
+        self.query(start, self.now)
+        assert self.calls == [[(start, self.now)], [(start, self.now)]]
+
+    def test_fingerprint_ignores_time_range(self):
+        params = {"project_id": [1], "start": self.now, "end": self.now}
+        assert get_query_fingerprint(params, query="") == get_query_fingerprint(
+            dict(params, start=self.now - timedelta(days=1), project_objects=[self.project]),
+            query="",
+        )
+        assert get_query_fingerprint(params, query="") != get_query_fingerprint(
+            params, query="event.type:error"
+        )
@@ -0,0 +1,78 @@
+from unittest import mock
+
+from sentry.stacktraces import processing
+from sentry.stacktraces.processing import StacktraceProcessor, process_stacktraces
+from sentry.testutils import TestCase
+from sentry.utils.cache import cache
+
+
+class CachingProcessor(StacktraceProcessor):
+    def __init__(self, *args, **kwargs):
+        StacktraceProcessor.__init__(self, *args, **kwargs)
+        self.processed = []
+
+    def handles_frame(self, frame, stacktrace_info):
+        return True
+
+    def preprocess_frame(self, processable_frame):
+        processable_frame.set_cache_key_from_values([processable_frame["function"]])
+
+    def process_frame(self, processable_frame, processing_task):
+        if processable_frame.cache_hit:
+            value = processable_frame.cache_value
+        else:
+            self.processed.append(processable_frame["function"])
+            function = processable_frame["function"]
+            value = None if function == "unknown" else f"resolved_{function}"
+            processable_frame.set_cache_value(value)
+
+        if value is None:
+            return None
+        return [dict(processable_frame.frame, function=value)], None, None
+
+
+class FrameCacheTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        processing._local_frame_cache.clear()
+
+    def process(self, functions):
+        data = {
+            "project": self.project.id,
+            "platform": "python",
+            "stacktrace": {"frames": [{"function": function} for function in functions]},
+        }
+        processors = []
+
+        def make_processors(data, infos):
+            processors.append(CachingProcessor(data, infos, project=self.project))
+            return processors
+
+        data = process_stacktraces(data, make_processors=make_processors) or data
+        return [frame["function"] for frame in data["stacktrace"]["frames"]], processors[0]
+
+    def test_caches_frames(self):
+        functions = ["foo", "bar", "foo", "unknown"]
+        with mock.patch.object(
+            cache, "get_many", wraps=cache.get_many
+        ) as get_many, mock.patch.object(cache, "set_many", wraps=cache.set_many) as set_many:
+            result, processor = self.process(functions)
+
+        assert result == ["resolved_foo", "resolved_bar", "resolved_foo", "unknown"]
+        assert sorted(processor.processed) == ["bar", "foo", "foo", "unknown"]
+        assert get_many.call_count == 1
+        # Resolved and unresolved frames are cached with different timeouts
+        assert set_many.call_count == 2
+
+        with mock.patch.object(cache, "get_many", wraps=cache.get_many) as get_many:
+            result, processor = self.process(functions)
+        assert result == ["resolved_foo", "resolved_bar", "resolved_foo", "unknown"]
+        assert processor.processed == []
+        # All frames come from the local cache
+        assert not get_many.called
+
+        processing._local_frame_cache.clear()
+        result, processor = self.process(functions + ["baz"])
+        assert result == ["resolved_foo", "resolved_bar", "resolved_foo", "unknown", "resolved_baz"]
+        assert processor.processed == ["baz"]
@@ -8,6 +8,7 @@ from unittest.mock import Mock, patch
 import pytz
 from django.test import override_settings
 from django.utils import timezone
+from freezegun import freeze_time
 
 from sentry import buffer
 from sentry.buffer.redis import RedisBuffer
@@ -28,6 +29,8 @@ from sentry.models import (
 from sentry.models.activity import ActivityIntegration
 from sentry.ownership.grammar import Matcher, Owner, Rule, dump_schema
 from sentry.rules import init_registry
+from sentry.rules.conditions.event_frequency import EventFrequencyCondition
+from sentry.rules.frequency_counters import get_group_event_count, incr_group_event_count
 from sentry.tasks.merge import merge_groups
 from sentry.tasks.post_process import post_process_group
 from sentry.testutils import SnubaTestCase, TestCase
@@ -290,6 +293,60 @@ class RuleProcessorTestMixin(BasePostProgressGroupMixin):
         )
 
 
+class FrequencyCountersTestMixin(BasePostProgressGroupMixin):
+    def test_frequency_counters(self):
+        now = timezone.now().replace(microsecond=0)
+        with freeze_time(now), self.options({"rules.frequency-counters": True}):
+            for i in range(2):
+                event = self.create_event(
+                    data={"fingerprint": ["group1"]}, project_id=self.project.id
+                )
+                self.call_post_process_group(
+                    is_new=i == 0,
+                    is_regression=False,
+                    is_new_group_environment=i == 0,
+                    cache_key=write_event_to_cache(event),
+                    group_id=event.group_id,
+                )
+            tsdb = Mock()
+            tsdb.get_sums.return_value = {event.group_id: 5}
+            condition = EventFrequencyCondition(self.project, tsdb=tsdb)
+            assert condition.query(event, now, now, environment_id=None) == 2
+            assert not tsdb.get_sums.called
+
+            # Events that could not be counted make frequency conditions query Snuba
+            event = self.create_event(data={"fingerprint": ["group1"]}, project_id=self.project.id)
+            with patch(
+                "sentry.rules.frequency_counters.incr_group_event_count",
+                side_effect=Exception("boom"),
+            ):
+                self.call_post_process_group(
+                    is_new=False,
+                    is_regression=False,
+                    is_new_group_environment=False,
+                    cache_key=write_event_to_cache(event),
+                    group_id=event.group_id,
+                )
+            assert condition.query(event, now, now, environment_id=None) == 5
+            assert tsdb.get_sums.called
+
+    def test_frequency_counters_disabled(self):
+        now = timezone.now().replace(microsecond=0)
+        with freeze_time(now):
+            event = self.create_event(data={"fingerprint": ["group1"]}, project_id=self.project.id)
+            incr_group_event_count(event.group_id, None, now)
+
+            # Events that are not counted reset the counters of their group
+            self.call_post_process_group(
+                is_new=False,
+                is_regression=False,
+                is_new_group_environment=False,
+                cache_key=write_event_to_cache(event),
+                group_id=event.group_id,
+            )
+            assert get_group_event_count(event.group_id, None, now, now) is None
+
+
 class ServiceHooksTestMixin(BasePostProgressGroupMixin):
     @patch("sentry.tasks.servicehooks.process_service_hook")
     def test_service_hook_fires_on_new_event(self, mock_process_service_hook):
@@ -1075,6 +1132,7 @@ class PostProcessGroupErrorTest(
     TestCase,
     AssignmentTestMixin,
     CorePostProcessGroupTestMixin,
+    FrequencyCountersTestMixin,
     InboxTestMixin,
     ResourceChangeBoundsTestMixin,
     RuleProcessorTestMixin,
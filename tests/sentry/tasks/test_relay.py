@@ -9,10 +9,12 @@ from sentry.relay.projectconfig_cache.redis import RedisProjectConfigCache
 from sentry.relay.projectconfig_debounce_cache.redis import RedisProjectConfigDebounceCache
 from sentry.tasks.relay import (
     build_project_config,
+    compute_configs,
     invalidate_project_config,
     schedule_build_project_config,
     schedule_invalidate_project_config,
 )
+from sentry.testutils.factories import Factories
 
 
 def _cache_keys_for_project(project):
@@ -79,6 +81,7 @@ def redis_cache(monkeypatch):
     monkeypatch.setattr("sentry.relay.projectconfig_cache.set_many", cache.set_many)
     monkeypatch.setattr("sentry.relay.projectconfig_cache.delete_many", cache.delete_many)
     monkeypatch.setattr("sentry.relay.projectconfig_cache.get", cache.get)
+    monkeypatch.setattr("sentry.relay.projectconfig_cache.get_many", cache.get_many)
 
     return cache
 
@@ -427,6 +430,40 @@ class TestInvalidationTask:
             assert new_cfg != cfg
 
 
+@pytest.mark.django_db
+def test_compute_configs_org(
+    default_project, default_projectkey, default_organization, redis_cache, django_cache
+):
+    other_project = Factories.create_project(organization=default_organization)
+    other_key = ProjectKey.objects.create(project=other_project)
+    uncached_key = ProjectKey.objects.create(project=other_project)
+    disabled_key = ProjectKey.objects.create(
+        project=other_project, status=ProjectKeyStatus.INACTIVE
+    )
+    redis_cache.set_many(
+        {
+            default_projectkey.public_key: "dummy",
+            other_key.public_key: "dummy",
+            disabled_key.public_key: "dummy",
+        }
+    )
+
+    configs = compute_configs(organization_id=default_organization.id)
+
+    assert set(configs) == {
+        default_projectkey.public_key,
+        other_key.public_key,
+        disabled_key.public_key,
+    }
+    assert uncached_key.public_key not in configs
+    assert configs[default_projectkey.public_key]["projectId"] == default_project.id
+    assert configs[other_key.public_key]["projectId"] == other_project.id
+    assert [key["publicKey"] for key in configs[other_key.public_key]["publicKeys"]] == [
+        other_key.public_key
+    ]
+    assert configs[disabled_key.public_key] == {"disabled": True}
+
+
 @pytest.mark.django_db
 def test_invalidate_hierarchy(
     monkeypatch,
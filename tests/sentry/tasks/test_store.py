@@ -2,6 +2,7 @@ from time import time
 from unittest import mock
 
 import pytest
+from celery.exceptions import SoftTimeLimitExceeded
 from django.test.utils import override_settings
 
 from sentry import quotas
@@ -11,6 +12,7 @@ from sentry.tasks.store import (
     preprocess_event,
     process_event,
     save_event,
+    save_event_transactions,
     time_synthetic_monitoring_event,
 )
 
@@ -300,6 +302,21 @@ def test_scrubbing_after_processing(
     )
 
 
+@mock.patch("sentry.tasks.store._do_save_event")
+def test_save_event_transactions_out_of_time(mock_do_save_event):
+    events = [{"cache_key": f"e:{i}", "project_id": 1} for i in range(4)]
+    mock_do_save_event.side_effect = [ValueError(), None, SoftTimeLimitExceeded()]
+
+    with mock.patch.object(save_event_transactions, "delay") as delay, pytest.raises(
+        SoftTimeLimitExceeded
+    ):
+        save_event_transactions(events=events)
+
+    # Failed transactions are skipped, the ones not started yet are saved later
+    assert mock_do_save_event.call_count == 3
+    delay.assert_called_once_with(events=events[3:])
+
+
 def test_time_synthetic_monitoring_event_in_save_event_disabled(mock_metrics_timing):
     data = {"project": 1}
     with override_settings(SENTRY_SYNTHETIC_MONITORING_PROJECT_ID=None):
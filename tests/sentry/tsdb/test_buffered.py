@@ -0,0 +1,143 @@
+import time
+from datetime import datetime, timedelta
+from unittest import mock
+
+import pytz
+
+from sentry.testutils import TestCase
+from sentry.tsdb.base import ONE_HOUR, ONE_MINUTE, TSDBModel
+from sentry.tsdb.buffered import BufferedTSDB
+
+
+class BufferedTSDBTest(TestCase):
+    def setUp(self):
+        self.db = BufferedTSDB(
+            backend="sentry.tsdb.inmemory.InMemoryTSDB",
+            backend_options={"rollups": ((10, 30), (ONE_MINUTE, 120), (ONE_HOUR, 24))},
+            flush_interval=60,
+        )
+        self.now = datetime(2022, 10, 1, 12, 30, 5, tzinfo=pytz.utc)
+
+    def test_rollups(self):
+        assert self.db.get_rollups() == self.db.backend.get_rollups()
+
+    def test_incr_coalesces(self):
+        with mock.patch.object(
+            self.db.backend, "incr_multi", wraps=self.db.backend.incr_multi
+        ) as incr_multi:
+            for _ in range(3):
+                self.db.incr_multi(
+                    [(TSDBModel.project, 1), (TSDBModel.group, 2)], timestamp=self.now
+                )
+            self.db.incr(TSDBModel.project, 1, timestamp=self.now + timedelta(seconds=1))
+            self.db.incr(TSDBModel.project, 1, timestamp=self.now + timedelta(seconds=10))
+            self.db.incr(TSDBModel.project, 1, timestamp=self.now, environment_id=1)
+
+            # Nothing has been written yet
+            assert not incr_multi.called
+            assert self.db.get_sums(TSDBModel.project, [1], self.now, self.now) == {1: 0}
+
+            self.db.flush_pending()
+
+        assert incr_multi.call_count == 2
+        (items,), _ = incr_multi.call_args_list[0]
+        assert sorted((model.value, key, options["count"]) for model, key, options in items) == [
+            (TSDBModel.project.value, 1, 1),
+            (TSDBModel.project.value, 1, 4),
+            (TSDBModel.group.value, 2, 3),
+        ]
+
+        end = self.now + timedelta(seconds=10)
+        assert self.db.get_sums(TSDBModel.project, [1], self.now, end) == {1: 6}
+        assert self.db.get_sums(TSDBModel.group, [2], self.now, end) == {2: 3}
+        assert self.db.get_sums(TSDBModel.project, [1], self.now, end, environment_id=1) == {1: 1}
+
+        # Nothing is left to flush
+        with mock.patch.object(self.db.backend, "incr_multi") as incr_multi:
+            self.db.flush_pending()
+        assert not incr_multi.called
+
+    def test_record_coalesces(self):
+        model = TSDBModel.users_affected_by_group
+        with mock.patch.object(
+            self.db.backend, "record_multi", wraps=self.db.backend.record_multi
+        ) as record_multi:
+            self.db.record(model, 1, ["foo", "bar"], timestamp=self.now)
+            self.db.record_multi([(model, 1, ["bar", "baz"])], timestamp=self.now)
+            self.db.flush_pending()
+
+        assert record_multi.call_count == 1
+        assert self.db.get_distinct_counts_totals(model, [1], self.now, self.now) == {1: 3}
+
+    def test_record_frequency_coalesces(self):
+        model = TSDBModel.frequent_environments_by_group
+        with mock.patch.object(
+            self.db.backend, "record_frequency_multi", wraps=self.db.backend.record_frequency_multi
+        ) as record_frequency_multi:
+            for _ in range(3):
+                self.db.record_frequency_multi([(model, {1: {"a": 1, "b": 2}})], timestamp=self.now)
+            self.db.flush_pending()
+
+        assert record_frequency_multi.call_count == 1
+        assert record_frequency_multi.call_args[0][0] == [(model, {1: {"a": 3, "b": 6}})]
+        assert self.db.get_frequency_totals(model, {1: ["a", "b"]}, self.now, self.now) == {
+            1: {"a": 3.0, "b": 6.0}
+        }
+
+    def test_flush_when_full(self):
+        self.db.max_pending = 2
+        self.db.incr(TSDBModel.project, 1, timestamp=self.now)
+        self.db.incr(TSDBModel.project, 1, timestamp=self.now)
+        assert self.db.get_sums(TSDBModel.project, [1], self.now, self.now) == {1: 0}
+        self.db.incr(TSDBModel.project, 2, timestamp=self.now)
+        assert self.db.get_sums(TSDBModel.project, [1, 2], self.now, self.now) == {1: 2, 2: 1}
+
+    def test_delete_flushes_pending(self):
+        self.db.incr(TSDBModel.project, 1, timestamp=self.now)
+        self.db.incr(TSDBModel.project, 2, timestamp=self.now)
+        self.db.delete([TSDBModel.project], [1], start=self.now, end=self.now)
+        assert self.db.get_sums(TSDBModel.project, [1, 2], self.now, self.now) == {1: 0, 2: 1}
+
+    def test_failed_flush_is_retained(self):
+        self.db.incr(TSDBModel.project, 1, timestamp=self.now)
+        self.db.record(TSDBModel.users_affected_by_group, 1, ["a"], timestamp=self.now)
+        self.db.record_frequency_multi(
+            [(TSDBModel.frequent_environments_by_group, {1: {"a": 1}})], timestamp=self.now
+        )
+
+        with mock.patch.object(
+            self.db.backend, "record_multi", side_effect=Exception("boom")
+        ), mock.patch("sentry.tsdb.buffered.logger") as logger:
+            self.db.flush_pending()
+        assert logger.exception.called
+
+        # Counters were written, the rest is kept and merged with newer writes
+        assert self.db.get_sums(TSDBModel.project, [1], self.now, self.now) == {1: 1}
+        self.db.record(TSDBModel.users_affected_by_group, 1, ["b"], timestamp=self.now)
+        self.db.record_frequency_multi(
+            [(TSDBModel.frequent_environments_by_group, {1: {"a": 1}})], timestamp=self.now
+        )
+        self.db.flush_pending()
+
+        assert self.db.get_distinct_counts_totals(
+            TSDBModel.users_affected_by_group, [1], self.now, self.now
+        ) == {1: 2}
+        assert self.db.get_frequency_totals(
+            TSDBModel.frequent_environments_by_group, {1: ["a"]}, self.now, self.now
+        ) == {1: {"a": 2.0}}
+        assert self.db.get_sums(TSDBModel.project, [1], self.now, self.now) == {1: 1}
+
+    def test_flush_in_background(self):
+        db = BufferedTSDB(
+            backend="sentry.tsdb.inmemory.InMemoryTSDB",
+            backend_options={"rollups": ((10, 30), (ONE_MINUTE, 120), (ONE_HOUR, 24))},
+            flush_interval=0.01,
+        )
+        with mock.patch.object(db, "flush_pending", wraps=db.flush_pending) as flush_pending:
+            db.incr(TSDBModel.project, 1, timestamp=self.now)
+            for _ in range(100):
+                if db.get_sums(TSDBModel.project, [1], self.now, self.now) == {1: 1}:
+                    break
+                time.sleep(0.01)
+        assert flush_pending.called
+        assert db.get_sums(TSDBModel.project, [1], self.now, self.now) == {1: 1}
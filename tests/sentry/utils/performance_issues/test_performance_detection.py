@@ -17,11 +17,23 @@ from sentry.types.issues import GroupType
 from sentry.utils.performance_issues.performance_detection import (
     DETECTOR_TYPE_TO_GROUP_TYPE,
     DetectorType,
+    DuplicateSpanDetector,
     EventPerformanceProblem,
+    LongTaskSpanDetector,
+    NPlusOneDBSpanDetector,
+    NPlusOneSpanDetector,
     PerformanceProblem,
+    SequentialSlowSpanDetector,
+    SlowSpanDetector,
     _detect_performance_problems,
+    _detection_settings_cache,
+    _get_issue_creation_rates,
     detect_performance_problems,
+    get_detection_settings,
+    get_project_detection_settings,
     prepare_problem_for_grouping,
+    run_detector_on_data,
+    run_detectors_on_data,
 )
 from sentry.utils.performance_issues.performance_span_issue import PerformanceSpanProblem
 
@@ -85,6 +97,34 @@ class PerformanceDetectionTest(unittest.TestCase):
         self.features_mock.side_effect = has_feature
         self.addCleanup(patch_features.stop)
 
+    def test_single_pass_matches_separate_passes(self):
+        detector_classes = [
+            DuplicateSpanDetector,
+            LongTaskSpanDetector,
+            NPlusOneDBSpanDetector,
+            NPlusOneSpanDetector,
+            SequentialSlowSpanDetector,
+            SlowSpanDetector,
+        ]
+        settings = get_detection_settings()
+        for event in EVENTS.values():
+            combined = [cls(settings, event) for cls in detector_classes]
+            run_detectors_on_data(combined, event)
+
+            for cls, detector in zip(detector_classes, combined):
+                separate = cls(settings, event)
+                run_detector_on_data(separate, event)
+                assert detector.stored_problems.keys() == separate.stored_problems.keys()
+
+    def test_single_pass_skips_disallowed_ops(self):
+        event = create_event([create_span("db", 2000.0, "SELECT 1"), create_span("ui", 2000.0)])
+        detector = SlowSpanDetector(get_detection_settings(), event)
+
+        with patch.object(detector, "visit_span") as visit_span:
+            run_detectors_on_data([detector], event)
+
+        assert [c.args[0]["op"] for c in visit_span.call_args_list] == ["db"]
+
     @patch("sentry.utils.performance_issues.performance_detection._detect_performance_problems")
     def test_options_disabled(self, mock):
         event = {}
@@ -953,6 +993,52 @@ class DetectorTypeToGroupTypeTest(unittest.TestCase):
             ), f"{detector_type} must have a corresponding entry in DETECTOR_TYPE_TO_GROUP_TYPE"
 
 
+@region_silo_test
+class ProjectDetectionSettingsTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        _detection_settings_cache.clear()
+        self.addCleanup(_detection_settings_cache.clear)
+
+    def get_duration_threshold(self):
+        settings = get_project_detection_settings(self.project.id).settings
+        return settings[DetectorType.N_PLUS_ONE_DB_QUERIES]["duration_threshold"]
+
+    @override_options({"performance.issues.cache-detection-settings": True})
+    def test_cached(self):
+        settings = get_project_detection_settings(self.project.id)
+        assert get_project_detection_settings(self.project.id) is settings
+
+    @override_options({"performance.issues.cache-detection-settings": True})
+    def test_invalidated_on_project_option_change(self):
+        assert self.get_duration_threshold() == 100.0
+
+        self.project.update_option(
+            "sentry:performance_issue_settings", {"n_plus_one_db_duration_threshold": 1000}
+        )
+        assert self.get_duration_threshold() == 1000
+
+        self.project.delete_option("sentry:performance_issue_settings")
+        assert self.get_duration_threshold() == 100.0
+
+    def test_not_cached_when_disabled(self):
+        settings = get_project_detection_settings(self.project.id)
+        assert get_project_detection_settings(self.project.id) is not settings
+
+    def test_fetched_once_per_event(self):
+        event = dict(EVENTS["n-plus-one-in-django-index-view"], project=self.project.id)
+        module = "sentry.utils.performance_issues.performance_detection"
+        with patch(
+            f"{module}.get_detection_settings", wraps=get_detection_settings
+        ) as detection_settings, patch(
+            f"{module}._get_issue_creation_rates", wraps=_get_issue_creation_rates
+        ) as issue_creation_rates:
+            _detect_performance_problems(event, Mock())
+
+        assert detection_settings.call_count == 1
+        assert issue_creation_rates.call_count == 1
+
+
 @region_silo_test
 class EventPerformanceProblemTest(TestCase):
     def test_save_and_fetch(self):
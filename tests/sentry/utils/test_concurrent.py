@@ -6,6 +6,7 @@ from threading import Event
 from unittest import mock
 
 import pytest
+from sentry_sdk import Hub
 
 from sentry.utils.concurrent import (
     FutureSet,
@@ -13,6 +14,7 @@ from sentry.utils.concurrent import (
     ThreadedExecutor,
     TimedFuture,
     execute,
+    run_in_worker_thread,
 )
 
 
@@ -23,6 +25,19 @@ def test_execute():
         assert execute(mock.Mock(side_effect=Exception("Boom!"))).result()
 
 
+@mock.patch("django.db.connections.close_all")
+def test_run_in_worker_thread(close_all):
+    hub = Hub(Hub.current)
+    function = mock.Mock(side_effect=lambda value: (Hub.current.client, value))
+    assert execute(lambda: run_in_worker_thread(hub, function, 1)).result() == (hub.client, 1)
+    assert close_all.call_count == 1
+
+    function.side_effect = Exception("Boom!")
+    with pytest.raises(Exception):
+        execute(lambda: run_in_worker_thread(hub, function, 1)).result()
+    assert close_all.call_count == 2
+
+
 def test_future_set_callback_success():
     future_set = FutureSet([Future() for i in range(3)])
 
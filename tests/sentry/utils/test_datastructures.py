@@ -1,6 +1,8 @@
+from unittest import mock
+
 import pytest
 
-from sentry.utils.datastructures import BidirectionalMapping
+from sentry.utils.datastructures import BidirectionalMapping, LRUCache
 
 
 def test_bidirectional_mapping():
@@ -30,3 +32,39 @@ def test_bidirectional_mapping():
     del value["c"]
 
     assert len(value) == len(value.inverse()) == 2
+
+
+def test_lru_cache():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    # "b" was the least recently used entry
+    assert "b" not in cache
+    assert cache.get_many(["a", "b", "c"]) == {"a": 1, "c": 3}
+    assert len(cache) == 2
+
+    cache.set_many({"d": 4})
+    assert cache.get("a") is None
+    assert cache.get("a", 5) == 5
+
+    cache.delete("c")
+    assert cache.get_many(["c", "d"]) == {"d": 4}
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_lru_cache_ttl():
+    cache = LRUCache(maxsize=10, ttl=60)
+
+    with mock.patch("time.monotonic", return_value=100):
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+
+    with mock.patch("time.monotonic", return_value=160):
+        assert cache.get("a") is None
+        assert len(cache) == 0
@@ -4,15 +4,21 @@ from unittest import mock
 
 import pytest
 import pytz
+from django.core.cache import cache
 from django.utils import timezone
 
 from sentry.models import GroupRelease, Project, Release
 from sentry.testutils import TestCase
+from sentry.testutils.helpers import override_options
 from sentry.utils.snuba import (
     Dataset,
     SnubaQueryParams,
     UnqualifiedQueryError,
+    _apply_cache_and_build_results,
+    _get_lock_cache_key,
+    _get_stale_cache_key,
     _prepare_query_params,
+    get_cache_key,
     get_json_type,
     get_query_params_to_update_for_projects,
     get_snuba_column_name,
@@ -374,3 +380,78 @@ class QuantizeTimeTest(unittest.TestCase):
                 break
 
         assert i != j
+
+
+class QueryCacheTest(TestCase):
+    query = ({"query": "MATCH (events) SELECT count()"}, lambda x: x, lambda x: x)
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.cache_key = get_cache_key(self.query[0])
+
+    @mock.patch("sentry.utils.snuba._bulk_snuba_query")
+    def test_cached(self, bulk_snuba_query):
+        bulk_snuba_query.return_value = [{"data": [1]}]
+        assert _apply_cache_and_build_results([self.query], use_cache=True) == [{"data": [1]}]
+        assert _apply_cache_and_build_results([self.query], use_cache=True) == [{"data": [1]}]
+        assert bulk_snuba_query.call_count == 1
+
+    @override_options({"snuba.query-cache.coalesce": True})
+    @mock.patch("sentry.utils.snuba._bulk_snuba_query")
+    def test_coalesce_releases_lock(self, bulk_snuba_query):
+        bulk_snuba_query.return_value = [{"data": [1]}]
+        assert _apply_cache_and_build_results([self.query], use_cache=True) == [{"data": [1]}]
+        assert cache.get(_get_lock_cache_key(self.cache_key)) is None
+
+        cache.delete(self.cache_key)
+        bulk_snuba_query.side_effect = Exception("boom")
+        with pytest.raises(Exception):
+            _apply_cache_and_build_results([self.query], use_cache=True)
+        assert cache.get(_get_lock_cache_key(self.cache_key)) is None
+
+    @override_options({"snuba.query-cache.coalesce": True})
+    @mock.patch("sentry.utils.snuba.time.sleep")
+    @mock.patch("sentry.utils.snuba._bulk_snuba_query")
+    def test_coalesce_waits_for_lock_holder(self, bulk_snuba_query, sleep):
+        cache.add(_get_lock_cache_key(self.cache_key), 1)
+
+        def finish_query(seconds):
+            cache.set(self.cache_key, '{"data": [2]}')
+
+        sleep.side_effect = finish_query
+        assert _apply_cache_and_build_results([self.query], use_cache=True) == [{"data": [2]}]
+        assert bulk_snuba_query.call_count == 0
+
+    @override_options({"snuba.query-cache.coalesce": True})
+    @mock.patch("sentry.utils.snuba.time.sleep")
+    @mock.patch("sentry.utils.snuba._bulk_snuba_query")
+    def test_coalesce_runs_query_when_lock_released(self, bulk_snuba_query, sleep):
+        cache.add(_get_lock_cache_key(self.cache_key), 1)
+        sleep.side_effect = lambda seconds: cache.delete(_get_lock_cache_key(self.cache_key))
+        bulk_snuba_query.return_value = [{"data": [3]}]
+
+        assert _apply_cache_and_build_results([self.query], use_cache=True) == [{"data": [3]}]
+        assert bulk_snuba_query.call_count == 1
+
+    @override_options({"snuba.query-cache.stale-referrers": ["api.dashboards."]})
+    @mock.patch("sentry.utils.snuba._bulk_snuba_query")
+    def test_stale_while_revalidate(self, bulk_snuba_query):
+        referrer = "api.dashboards.widget.line-chart"
+        bulk_snuba_query.return_value = [{"data": [1]}]
+
+        # Stale referrers always use the cache.
+        assert _apply_cache_and_build_results([self.query], referrer=referrer) == [{"data": [1]}]
+        assert cache.get(_get_stale_cache_key(self.cache_key)) is not None
+
+        # Another worker is refreshing the expired result, serve the stale one.
+        cache.delete(self.cache_key)
+        cache.add(_get_lock_cache_key(self.cache_key), 1)
+        bulk_snuba_query.return_value = [{"data": [2]}]
+        assert _apply_cache_and_build_results([self.query], referrer=referrer) == [{"data": [1]}]
+        assert bulk_snuba_query.call_count == 1
+
+        # Nobody is refreshing, refresh.
+        cache.delete(_get_lock_cache_key(self.cache_key))
+        assert _apply_cache_and_build_results([self.query], referrer=referrer) == [{"data": [2]}]
+        assert bulk_snuba_query.call_count == 2
@@ -1,3 +1,4 @@
+import threading
 import time
 from datetime import timedelta
 from unittest import mock
@@ -226,3 +227,51 @@ class StreamGroupSerializerTestCase(APITestCase, SnubaTestCase):
         assert result[0]["sessionCount"] == 2
         # No sessions in project2
         assert result[1]["sessionCount"] is None
+
+    def test_concurrent_snuba_queries(self):
+        group = self.group
+        now = timezone.now()
+        serializer = StreamGroupSerializerSnuba(
+            stats_period="14d", start=now - timedelta(days=1), end=now, expand=["sessions"]
+        )
+        seen_stats = {
+            "data": [
+                {
+                    "group_id": group.id,
+                    "times_seen": 3,
+                    "first_seen": iso_format(now),
+                    "last_seen": iso_format(now),
+                    "count": 2,
+                }
+            ]
+        }
+        threads = set()
+
+        def get_range(**kwargs):
+            threads.add(threading.get_ident())
+            return {group.id: [(0, 3)]}
+
+        with mock.patch.object(
+            StreamGroupSerializerSnuba,
+            "_execute_error_seen_stats_query",
+            return_value=seen_stats,
+        ) as seen_stats_query, mock.patch(
+            "sentry.api.serializers.models.group_stream.snuba_tsdb.get_range",
+            side_effect=get_range,
+        ), mock.patch(
+            "sentry.api.serializers.models.group_stream.release_health.get_num_sessions_per_project",
+            return_value=[(group.project_id, 5)],
+        ) as get_num_sessions, self.options(
+            {"serializers.group.concurrent-snuba-queries": True}
+        ):
+            result = serialize([group], serializer=serializer)
+
+        # Time range and lifetime seen stats
+        assert seen_stats_query.call_count == 2
+        assert get_num_sessions.call_count == 1
+        assert threads and threading.get_ident() not in threads
+        assert result[0]["count"] == "3"
+        assert result[0]["userCount"] == 2
+        assert result[0]["lifetime"]["count"] == "3"
+        assert result[0]["stats"] == {"14d": [(0, 3)]}
+        assert result[0]["sessionCount"] == 5
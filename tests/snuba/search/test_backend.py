@@ -1426,6 +1426,42 @@ class EventsSnubaSearchTest(SharedSnubaTest):
         finally:
             options.set("snuba.search.max-pre-snuba-candidates", prev_max_pre)
 
+    def test_pipelined_chunks(self):
+        with self.options(
+            {
+                "snuba.search.max-pre-snuba-candidates": 1,
+                "snuba.search.pipelined-chunks": True,
+            }
+        ):
+            results = self.make_query()
+            assert set(results) == {self.group1, self.group2}
+
+            results = self.make_query(search_filter_query="foo")
+            assert set(results) == {self.group1}
+
+            results = self.backend.query([self.project], limit=1, sort_by="date")
+            assert set(results) == {self.group1}
+            assert results.next.has_results
+
+            results = self.backend.query(
+                [self.project], cursor=results.next, limit=1, sort_by="date"
+            )
+            assert set(results) == {self.group2}
+            assert results.prev.has_results
+            assert not results.next.has_results
+
+    def test_pipelined_chunks_out_of_time(self):
+        # The first chunk is used however long it takes
+        with self.options(
+            {
+                "snuba.search.max-pre-snuba-candidates": 1,
+                "snuba.search.pipelined-chunks": True,
+                "snuba.search.max-total-chunk-time-seconds": 0,
+            }
+        ):
+            results = self.make_query()
+            assert set(results) == {self.group1, self.group2}
+
     def test_optimizer_enabled(self):
         prev_optimizer_enabled = options.get("snuba.search.pre-snuba-candidates-optimizer")
         options.set("snuba.search.pre-snuba-candidates-optimizer", True)